@@ -1,68 +1,37 @@
-import sqlite3
+# backend/db.py
+"""Accesso al DB per il frontend: tutto passa da DBManager e dallo schema migrato."""
+from core import journal
+from db.db_manager import DBManager, DB_PATH_DEFAULT
 
-def init_db():
-    conn = sqlite3.connect("contaIDE.db")
-    cur = conn.cursor()
-    cur.executescript("""
-    CREATE TABLE IF NOT EXISTS accounts (
-        id INTEGER PRIMARY KEY,
-        code TEXT UNIQUE,
-        name TEXT,
-        type TEXT
-    );
-    CREATE TABLE IF NOT EXISTS entries (
-        id INTEGER PRIMARY KEY,
-        date TEXT,
-        causale TEXT,
-        description TEXT
-    );
-    CREATE TABLE IF NOT EXISTS entry_lines (
-        id INTEGER PRIMARY KEY,
-        entry_id INTEGER,
-        account_id INTEGER,
-        dare REAL,
-        avere REAL,
-        FOREIGN KEY(entry_id) REFERENCES entries(id),
-        FOREIGN KEY(account_id) REFERENCES accounts(id)
-    );
-    CREATE TABLE IF NOT EXISTS journal_entries (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        data TEXT,
-        protocollo TEXT,
-        documento TEXT,
-        data_documento TEXT,
-        cliente_fornitore TEXT,
-        descrizione TEXT,
-        conto TEXT,
-        importo REAL
-    );
-    """)
-    conn.commit()
 
-    # Inserisci sample se tabella vuota
-    cur.execute("SELECT COUNT(*) FROM journal_entries")
-    if cur.fetchone()[0] == 0:
-        sample_entries = [
-            ("2025-01-01", "001", "FAT-123", "2025-01-01", "Cliente Rossi", "Vendita merci", "4000 Vendite", 1000.00),
-            ("2025-01-02", "002", "FAT-124", "2025-01-02", "Fornitore Bianchi", "Acquisto materiali", "2000 Acquisti", 500.00),
-            ("2025-01-03", "003", "FAT-125", "2025-01-03", "Cliente Verdi", "Incasso fattura", "1000 Cassa", 750.00),
-        ]
-        cur.executemany("""
-            INSERT INTO journal_entries 
-            (data, protocollo, documento, data_documento, cliente_fornitore, descrizione, conto, importo)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, sample_entries)
-        conn.commit()
+def init_db(path: str = DB_PATH_DEFAULT, progress=None):
+    """Apre il file contabile e lo porta all'ultima versione dello schema."""
+    DBManager.configure(path)
+    DBManager.initialize(progress=progress)
+    return DBManager.connect()
 
-    return conn
 
-def get_journal_entries():
-    conn = sqlite3.connect("contaIDE.db")
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT data, protocollo, documento, data_documento, cliente_fornitore, descrizione, conto, importo
-        FROM journal_entries
-    """)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+def get_journal_page(after=None, limit=journal.JOURNAL_PAGE_SIZE):
+    """
+    Pagina della prima nota per la vista a caricamento progressivo:
+    (righe, cursore_successivo), vedi core.journal.get_journal_page.
+    """
+    return journal.get_journal_page(after=after, limit=limit)
+
+
+def get_journal_since(after_entry_id):
+    """Righe delle entry registrate dopo after_entry_id (vedi core.journal.get_journal_since)."""
+    return journal.get_journal_since(after_entry_id)
+
+
+def last_entry_id():
+    return journal.last_entry_id()
+
+
+def add_posting_listener(listener):
+    """listener(entry_ids) dopo ogni registrazione sul DB corrente, nel thread che registra."""
+    DBManager.current().add_posting_listener(listener)
+
+
+def remove_posting_listener(listener):
+    DBManager.current().remove_posting_listener(listener)
@@ -1,9 +1,13 @@
 # backend/dsl_parser.py
 import re
+import sqlite3
+from datetime import date
+from core.account_index import get_account_index
+from core.trial_balance import TrialBalanceService, format_trial_balance
 
 COMMANDS = [
     "scrivi", "saldo", "movimenti", "mastrino", "bilancio",
-    "conti", "causali", "aiuto", "split", "unsplit",
+    "conti", "causali", "aiuto", "split", "unsplit", "output",
 ]
 
 def parse_command(cmd: str):
@@ -22,6 +26,39 @@ def _extract_two_ints(text: str):
         return int(nums[0]), int(nums[1])
     return None
 
+def suggest_accounts(prefix: str, limit: int = 20):
+    """Codici conto per l'autocompletamento (dall'indice in memoria)."""
+    try:
+        return [a.code for a in get_account_index().search(prefix, limit=limit)]
+    except sqlite3.Error:
+        return []
+
+def _list_accounts(prefix: str):
+    try:
+        accounts = get_account_index().search(prefix) if prefix else \
+            list(get_account_index().accounts().values())
+    except sqlite3.Error as e:
+        return f"❌ Errore database: {e}"
+    if not accounts:
+        return f"❌ Nessun conto trovato per '{prefix}'."
+    return "\n".join(f"{a.code}  {a.name} ({a.account_class})" for a in accounts)
+
+def _trial_balance(args_text: str):
+    # bilancio [dal] [al] - default: anno corrente
+    args = args_text.split()
+    year = date.today().year
+    from_date = args[0] if len(args) > 0 else f"{year}-01-01"
+    to_date = args[1] if len(args) > 1 else f"{from_date[:4]}-12-31"
+    try:
+        date.fromisoformat(from_date)
+        date.fromisoformat(to_date)
+    except ValueError:
+        return "❌ Errore: usa date nel formato AAAA-MM-GG (es. 'bilancio 2025-01-01 2025-12-31')."
+    try:
+        return format_trial_balance(TrialBalanceService().compute(from_date, to_date))
+    except sqlite3.Error as e:
+        return f"❌ Errore database: {e}"
+
 def execute_command(text: str):
     text = text.strip()
     if not text:
@@ -43,11 +80,18 @@ def execute_command(text: str):
             return {"action": "split", "left": left, "right": right}
         return "❌ Errore: usa due numeri di tab (es. 'split 1 3')."
 
+    # output [pagina]: pagine dell'ultima uscita troppo lunga per il terminale
+    if cmd == "output":
+        args = args_text.split()
+        if args and not args[0].isdigit():
+            return "❌ Errore: usa un numero di pagina (es. 'output 2')."
+        return {"action": "output", "page": int(args[0]) if args else None}
+
     # base commands (placeholders)
     if cmd == "saldo":
         return "Saldo Cassa: 0"
     elif cmd == "bilancio":
-        return "Bilancio vuoto"
+        return _trial_balance(args_text)
     elif cmd == "aiuto":
         args = args_text.split()
         if args:
@@ -59,6 +103,9 @@ def execute_command(text: str):
         else:
             return "Comandi disponibili: " + ", ".join(COMMANDS)
 
+    elif cmd == "conti":
+        return _list_accounts(args_text)
+
     elif cmd in COMMANDS:
         return f"Eseguito comando: {cmd}"
 
@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+from collections.abc import Mapping
 
 # Carica dataset esterno (JSON) con tips
 def load_tips():
@@ -21,7 +23,48 @@ SYNONYMS = {
     "giroconti": "giroconto"
 }
 
-TIPS = load_tips()
+
+class _LazyTips(Mapping):
+    """
+    I tips come dizionario, letti da help_tips.json al primo accesso e non
+    all'import: l'avvio della GUI non aspetta il file. preload() li carica
+    in anticipo (es. da un thread di avvio).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+
+    def _tips(self) -> dict:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = load_tips()
+        return self._data
+
+    def preload(self) -> dict:
+        return self._tips()
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self._tips()[key]
+
+    def __iter__(self):
+        return iter(self._tips())
+
+    def __len__(self):
+        return len(self._tips())
+
+
+# Compatibilità: TIPS si usa ancora come un dizionario
+TIPS = _LazyTips()
+
+def preload_tips() -> list:
+    """Carica i tips (se non già caricati) e restituisce le chiavi, per i completer."""
+    return list(TIPS.preload())
 
 def get_help_text(query: str) -> str:
     query = query.strip().lower()
@@ -0,0 +1,74 @@
+# benchmarks/bench_companies.py
+"""
+Cambio di azienda fra molti DB: riconfigurazione di DBManager (chiusura,
+apertura, initialize, piano dei conti ricaricato) contro DatabaseRegistry.
+
+    python -m benchmarks.bench_companies [--companies N] [--switches N] [--max-open N]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.account_index import get_account_index
+from db.database import DatabaseRegistry
+from db.db_manager import DBManager
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def _reconfigure(path: Path):
+    DBManager.configure(str(path))
+    DBManager.initialize()
+    get_account_index().get("1431")
+
+
+def run(companies: int = 50, switches: int = 500, max_open: int = 32, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"azienda_{i:03d}.db" for i in range(companies)]
+        for path in paths:
+            _reconfigure(path)
+        DBManager.close()
+        order = [rng.choice(paths) for _ in range(switches)]
+
+        configure_ms = [_timed(lambda: _reconfigure(path)) for path in order]
+        DBManager.close()
+
+        registry = DatabaseRegistry(max_open=max_open)
+        registry_ms = [_timed(lambda: get_account_index(registry.get(str(path))).get("1431"))
+                       for path in order]
+        stats = registry.stats()
+        registry.close_all()
+    return {
+        "configure": (statistics.median(configure_ms), max(configure_ms)),
+        "registry": (statistics.median(registry_ms), max(registry_ms)),
+        "hit_rate": stats.hits / max(1, stats.hits + stats.misses),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--switches", type=int, default=500)
+    parser.add_argument("--max-open", type=int, default=32)
+    args = parser.parse_args(argv)
+    result = run(args.companies, args.switches, args.max_open)
+    print(f"Cambio azienda ({args.companies} DB, {args.switches} cambi, max_open {args.max_open})"
+          " — mediana / max in ms")
+    for name in ("configure", "registry"):
+        median, worst = result[name]
+        print(f"  {name:<10} {median:8.3f} {worst:8.3f}")
+    print(f"  registro: {result['hit_rate']:.0%} di DB già aperti")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# benchmarks/bench_startup.py
+"""
+Tempo di avvio del DB: file nuovo, riapertura di un file aggiornato (percorso
+rapido con impronta) e inizializzazione completa forzata.
+
+    python -m benchmarks.bench_startup [--runs N] [--profile default]
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from db.db_manager import DBManager
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def _open(path: Path, profile: str, force: bool = False):
+    DBManager.close()
+    DBManager.configure(str(path), profile=profile)
+    DBManager.initialize(force=force)
+
+
+def run(runs: int = 20, profile: str = "default") -> dict:
+    results = {"new": [], "reopen": [], "forced": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / "template.db"
+        _open(template, profile)
+        DBManager.close()
+        for i in range(runs):
+            path = Path(tmp) / f"new_{i}.db"
+            results["new"].append(_timed(lambda: _open(path, profile)))
+            DBManager.close()
+            copy = Path(tmp) / f"copy_{i}.db"
+            shutil.copy(template, copy)
+            results["reopen"].append(_timed(lambda: _open(copy, profile)))
+            results["forced"].append(_timed(lambda: _open(copy, profile, force=True)))
+            DBManager.close()
+    return {name: (statistics.median(ms), max(ms)) for name, ms in results.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--profile", default="default")
+    args = parser.parse_args(argv)
+    print(f"Avvio DB ({args.runs} prove, profilo {args.profile}) — mediana / max in ms")
+    for name, (median, worst) in run(args.runs, args.profile).items():
+        print(f"  {name:<8} {median:8.2f} {worst:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
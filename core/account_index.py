@@ -0,0 +1,116 @@
+# core/account_index.py
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from db.database import Database
+from db.db_manager import DBManager
+
+_GENERATION_SQL = "SELECT generation FROM cache_generations WHERE name = 'accounts'"
+_ACCOUNTS_SQL = "SELECT code, name, class, parent_code FROM accounts ORDER BY code"
+
+
+@dataclass(frozen=True)
+class AccountInfo:
+    code: str
+    name: str
+    account_class: Optional[str]
+    parent_code: Optional[str]
+
+
+class AccountIndex:
+    """
+    Indice in memoria del piano dei conti (codice, nome, classe, padre).
+
+    Viene caricato una sola volta e ricaricato solo quando la tabella accounts
+    cambia. Il controllo di freschezza è a due livelli:
+      1. se né total_changes della connessione né PRAGMA data_version sono
+         cambiati, nessuno ha scritto sul DB e l'indice è valido;
+      2. altrimenti si legge il contatore 'accounts' in cache_generations,
+         incrementato dai trigger su INSERT/UPDATE/DELETE di accounts.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db          # None: il DB corrente di DBManager
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_changes = None
+        self._data_version = None
+        self._generation = None
+        self._accounts: Dict[str, AccountInfo] = {}
+        self._children: Dict[Optional[str], List[str]] = {}
+        self._codes: List[str] = []
+
+    # --- Freschezza --------------------------------------------------------
+
+    def _generation_in_db(self, conn) -> int:
+        row = conn.execute(_GENERATION_SQL).fetchone()
+        return row[0] if row else 0
+
+    def _refresh(self):
+        db = self._db or DBManager.current()
+        conn = db.connect()
+        with self._lock:
+            same_conn = conn is self._conn
+            data_version = db.data_version(conn)
+            if (same_conn and conn.total_changes == self._total_changes
+                    and data_version == self._data_version):
+                return
+
+            generation = self._generation_in_db(conn)
+            if not same_conn or generation != self._generation:
+                self._load(conn)
+            self._conn = conn
+            self._generation = generation
+            self._total_changes = conn.total_changes
+            self._data_version = data_version
+
+    def _load(self, conn):
+        rows = conn.execute(_ACCOUNTS_SQL).fetchall()
+        accounts = {}
+        children: Dict[Optional[str], List[str]] = {}
+        for r in rows:
+            accounts[r["code"]] = AccountInfo(r["code"], r["name"], r["class"], r["parent_code"])
+            children.setdefault(r["parent_code"], []).append(r["code"])
+        # swap atomico: i lettori vedono sempre uno stato completo
+        self._accounts, self._children, self._codes = accounts, children, [r["code"] for r in rows]
+
+    def invalidate(self):
+        with self._lock:
+            self._conn = None
+
+    # --- API ---------------------------------------------------------------
+
+    def __contains__(self, code: str) -> bool:
+        self._refresh()
+        return code in self._accounts
+
+    def get(self, code: str) -> Optional[AccountInfo]:
+        self._refresh()
+        return self._accounts.get(code)
+
+    def codes(self) -> List[str]:
+        """Tutti i codici in ordine crescente."""
+        self._refresh()
+        return self._codes
+
+    def accounts(self) -> Dict[str, AccountInfo]:
+        self._refresh()
+        return self._accounts
+
+    def children(self, code: Optional[str]) -> List[str]:
+        """Figli diretti di un conto (None -> conti radice)."""
+        self._refresh()
+        return self._children.get(code, [])
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[AccountInfo]:
+        """Conti il cui codice inizia con prefix o il cui nome contiene prefix."""
+        self._refresh()
+        needle = prefix.strip().lower()
+        found = [a for code, a in self._accounts.items()
+                 if code.startswith(needle) or needle in a.name.lower()]
+        return found[:limit] if limit is not None else found
+
+
+def get_account_index(db: Optional[Database] = None) -> AccountIndex:
+    """Indice del piano dei conti del DB (default: quello di DBManager), uno per DB."""
+    return (db or DBManager.current()).cache("account_index", AccountIndex)
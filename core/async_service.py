@@ -0,0 +1,196 @@
+# core/async_service.py
+"""
+Facciata non bloccante sui servizi del libro giornale.
+
+Ogni chiamata va in coda per tipo di operazione ed è eseguita da un pool di
+thread dimensionato sul pool di connessioni del DB; il chiamante riceve
+subito un concurrent.futures.Future:
+
+    svc = AsyncLedgerService()
+    fut = svc.get_account_balance("1431", "2025-01-01", "2025-12-31")
+    fut.add_done_callback(...)                      # thread qualsiasi (Qt: frontend.async_bridge)
+    saldo = await asyncio.wrap_future(fut)          # asyncio
+
+Tipi di operazione e concorrenza massima di default:
+  "read"   letture brevi (saldi, pagine, una entry)    max_readers del DB
+  "report" letture lunghe (mastrini interi, bilancio)  metà dei lettori, almeno 1
+  "write"  registrazioni, storni, chiusure             1 (il writer è uno solo)
+Le operazioni in coda e non ancora partite si annullano con future.cancel()
+o in blocco con cancel_pending(); una query già in esecuzione arriva in fondo.
+"""
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from core.balance_tree import BalanceTreeService
+from core.ledger_service import LEDGER_PAGE_SIZE, LedgerService
+from core.models import EntryDTO, LedgerCursor
+from core.period_service import PeriodService
+from core.trial_balance import TrialBalanceService
+from db.database import Database
+from db.db_manager import DBManager
+from db.report_session import ReportSession
+
+READ, REPORT, WRITE = "read", "report", "write"
+
+_Job = Tuple[Future, Callable, tuple, dict, Optional[ReportSession]]
+
+
+def default_limits(db: Database) -> Dict[str, int]:
+    return {READ: db.max_readers, REPORT: max(1, db.max_readers // 2), WRITE: 1}
+
+
+class AsyncLedgerService:
+
+    def __init__(self, db: Optional[Database] = None, limits: Optional[Dict[str, int]] = None):
+        self._db = db or DBManager.current()
+        self.limits = {**default_limits(self._db), **(limits or {})}
+        if any(n < 1 for n in self.limits.values()):
+            raise ValueError("I limiti di concorrenza devono essere >= 1")
+        self.ledger = LedgerService(self._db)
+        self.periods = PeriodService(self._db)
+        self.trial_balance_service = TrialBalanceService(self._db)
+        self.balance_tree_service = BalanceTreeService(self._db)
+        self._executor = ThreadPoolExecutor(max_workers=sum(self.limits.values()),
+                                            thread_name_prefix="contaide-db")
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Job]] = {kind: deque() for kind in self.limits}
+        self._running: Dict[str, int] = {kind: 0 for kind in self.limits}
+        self._closed = False
+
+    # --- Coda --------------------------------------------------------------
+
+    def submit(self, kind: str, fn: Callable, *args,
+               session: Optional[ReportSession] = None, **kwargs) -> Future:
+        """
+        Mette in coda fn(*args, **kwargs) come operazione di tipo kind.
+        Con session la chiamata gira legata a quella sessione di report.
+        """
+        if kind not in self._queues:
+            raise ValueError(f"Tipo di operazione sconosciuto: {kind!r}")
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AsyncLedgerService chiuso")
+            self._queues[kind].append((future, fn, args, kwargs, session))
+        self._pump(kind)
+        return future
+
+    def _pump(self, kind: str):
+        """Avvia job di kind finché ci sono posti liberi sotto il limite."""
+        while True:
+            with self._lock:
+                if self._running[kind] >= self.limits[kind] or not self._queues[kind]:
+                    return
+                job = self._queues[kind].popleft()
+                # False: annullato mentre era in coda, non occupa un posto
+                if not job[0].set_running_or_notify_cancel():
+                    continue
+                self._running[kind] += 1
+            self._executor.submit(self._run, kind, job)
+
+    def _run(self, kind: str, job: _Job):
+        future, fn, args, kwargs, session = job
+        try:
+            if session is not None:
+                with session.bind():
+                    result = fn(*args, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._running[kind] -= 1
+            self._pump(kind)
+
+    def cancel_pending(self, kind: Optional[str] = None) -> int:
+        """Annulla le operazioni in coda (di un tipo o tutte); restituisce quante."""
+        kinds = [kind] if kind else list(self._queues)
+        cancelled = 0
+        with self._lock:
+            for k in kinds:
+                while self._queues[k]:
+                    cancelled += self._queues[k].popleft()[0].cancel()
+        return cancelled
+
+    def pending(self, kind: str) -> int:
+        with self._lock:
+            return len(self._queues[kind])
+
+    def running(self, kind: str) -> int:
+        with self._lock:
+            return self._running[kind]
+
+    def close(self, wait: bool = True):
+        """Annulla quanto è in coda e attende (wait=True) le operazioni in corso."""
+        with self._lock:
+            self._closed = True
+        self.cancel_pending()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # --- Letture -----------------------------------------------------------
+
+    def get_account_balance(self, account_code: str, from_date: str, to_date: str) -> Future:
+        return self.submit(READ, self.ledger.get_account_balance, account_code, from_date, to_date)
+
+    def get_opening_balance(self, account_code: str, from_date: str) -> Future:
+        return self.submit(READ, self.ledger.get_opening_balance, account_code, from_date)
+
+    def get_account_ledger_page(self, account_code: str, from_date: str, to_date: str,
+                                after: Optional[LedgerCursor] = None,
+                                limit: int = LEDGER_PAGE_SIZE) -> Future:
+        return self.submit(READ, self.ledger.get_account_ledger_page,
+                           account_code, from_date, to_date, after=after, limit=limit)
+
+    def get_entry(self, entry_id: int, entry_date: Optional[str] = None) -> Future:
+        return self.submit(READ, self.ledger.get_entry, entry_id, entry_date)
+
+    # --- Report ------------------------------------------------------------
+
+    def get_account_ledger(self, account_code: str, from_date: str, to_date: str,
+                           session: Optional[ReportSession] = None) -> Future:
+        return self.submit(REPORT, self.ledger.get_account_ledger,
+                           account_code, from_date, to_date, session=session)
+
+    def trial_balance(self, from_date: str, to_date: str, include_empty: bool = False,
+                      session: Optional[ReportSession] = None) -> Future:
+        return self.submit(REPORT, self.trial_balance_service.compute,
+                           from_date, to_date, include_empty, session=session)
+
+    def balance_tree(self, from_date: str, to_date: str) -> Future:
+        """Totali per nodo del bilancio ad albero (BalanceTreeService.nodes, in cache per versione)."""
+        return self.submit(REPORT, self.balance_tree_service.nodes, from_date, to_date)
+
+    # --- Scritture ---------------------------------------------------------
+
+    def post(self, entry: EntryDTO, user_id: str) -> Future:
+        return self.submit(WRITE, self.ledger.engine.post, entry, user_id)
+
+    def post_many(self, entries: Iterable[EntryDTO], user_id: str, **kwargs) -> Future:
+        return self.submit(WRITE, self.ledger.engine.post_many, list(entries), user_id, **kwargs)
+
+    def reverse_entry(self, entry_id: int, user_id: str) -> Future:
+        return self.submit(WRITE, self.ledger.reverse_entry, entry_id, user_id)
+
+    def reverse_entries(self, user_id: str, **selection) -> Future:
+        return self.submit(WRITE, self.ledger.reverse_entries, user_id, **selection)
+
+    def close_month(self, year: int, month: int, user_id: str) -> Future:
+        return self.submit(WRITE, self.periods.close_month, year, month, user_id)
+
+    def reopen_month(self, year: int, month: int, user_id: str) -> Future:
+        return self.submit(WRITE, self.periods.reopen_month, year, month, user_id)
+
+    def close_year(self, year: int, user_id: str) -> Future:
+        return self.submit(WRITE, self.periods.close_year, year, user_id)
@@ -0,0 +1,134 @@
+# core/audit.py
+"""
+Formato compatto dei payload di audit_log e lettura dei record.
+
+Formato 2 (BLOB): JSON minimale compresso con zlib e un dizionario predefinito
+(i payload sono piccoli, il dizionario porta le chiavi ricorrenti). Ogni riga
+compare una sola volta come [conto, dare_cents, avere_cents]; i campi vuoti
+dell'entry non vengono scritti. Il payload si costruisce prima di aprire la
+transazione di registrazione.
+
+Formato 1 (TEXT): il json.dumps(entry.__dict__, default=str) delle versioni
+precedenti, con importi in euro, ancora leggibile con decode_payload().
+"""
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Union
+
+from core.models import EntryDTO
+from core.money import Money
+from db.database import Database
+from db.db_manager import DBManager
+
+FORMAT_VERSION = 2
+
+# Non modificare: i payload di formato 2 si decomprimono solo con questo dizionario.
+# Un dizionario diverso richiede un nuovo FORMAT_VERSION.
+_ZDICT = (
+    b'{"v":2,"entry":{"date":"20","documento":"","document_date":"20",'
+    b'"cliente_fornitore":"","descrizione":"STORNO ENTRY ","reversal_of":,'
+    b'"client_reference_id":"","taxable_amount":,"vat_rate":,"vat_amount":,'
+    b'"is_sale":false},"lines":[["1431",0,0],["4100",0,0]],"user":"","ts":"20-T:.+00:00"}'
+)
+_COMPRESS_LEVEL = 6
+
+_READ_SQL = """
+    SELECT id, entry_id, action, user_id, payload, created_at
+    FROM audit_log WHERE entry_id = ? ORDER BY id
+"""
+_PAGE_SQL = """
+    SELECT id, entry_id, action, user_id, payload, created_at
+    FROM audit_log WHERE id > ? ORDER BY id LIMIT ?
+"""
+
+
+@dataclass
+class AuditRecord:
+    id: int
+    entry_id: Optional[int]
+    action: str
+    user_id: Optional[str]
+    created_at: Optional[str]
+    entry: dict = field(default_factory=dict)     # campi di EntryDTO senza le righe
+    lines: List[dict] = field(default_factory=list)   # {"account", "dare", "avere"} in Money
+    user: Optional[str] = None
+    timestamp: Optional[str] = None
+    format: int = FORMAT_VERSION
+
+
+def encode_payload(entry: EntryDTO, user_id: str, timestamp: Optional[str] = None) -> bytes:
+    body = {
+        "v": FORMAT_VERSION,
+        "entry": {k: v for k, v in entry.__dict__.items() if k != "lines" and v is not None},
+        "lines": [[line.account_id, int(line.dare), int(line.avere)] for line in entry.lines],
+        "user": user_id,
+        "ts": timestamp or datetime.now(timezone.utc).isoformat(),
+    }
+    raw = json.dumps(body, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    compressor = zlib.compressobj(_COMPRESS_LEVEL, zdict=_ZDICT)
+    return compressor.compress(raw) + compressor.flush()
+
+
+def decode_payload(payload: Union[bytes, str, None]) -> dict:
+    """Payload di audit (formato 1 o 2) -> {"format", "entry", "lines", "user", "timestamp"}."""
+    if payload is None:
+        return {"format": None, "entry": {}, "lines": [], "user": None, "timestamp": None}
+    if isinstance(payload, (bytes, memoryview)):
+        decompressor = zlib.decompressobj(zdict=_ZDICT)
+        body = json.loads(decompressor.decompress(bytes(payload)) + decompressor.flush())
+        return {
+            "format": body.get("v", FORMAT_VERSION),
+            "entry": body.get("entry", {}),
+            "lines": [{"account": a, "dare": Money(d), "avere": Money(av)} for a, d, av in body["lines"]],
+            "user": body.get("user"),
+            "timestamp": body.get("ts"),
+        }
+    return _decode_legacy(payload)
+
+
+def _legacy_amount(value) -> Money:
+    # il formato 1 ha sempre importi in euro: numeri come li passava il chiamante
+    # (100 = 100,00 euro) o Decimal scritti come stringa da default=str ("10.1")
+    return Money.of(value)
+
+
+def _decode_legacy(payload: str) -> dict:
+    body = json.loads(payload)
+    entry = {k: v for k, v in body.get("entry", {}).items() if k != "lines" and v is not None}
+    lines = [{"account": line.get("account_id"),
+              "dare": _legacy_amount(line.get("dare")),
+              "avere": _legacy_amount(line.get("avere"))}
+             for line in body.get("lines", [])]
+    return {"format": 1, "entry": entry, "lines": lines,
+            "user": body.get("user"), "timestamp": body.get("timestamp")}
+
+
+def _record(row) -> AuditRecord:
+    decoded = decode_payload(row["payload"])
+    return AuditRecord(
+        id=row["id"], entry_id=row["entry_id"], action=row["action"], user_id=row["user_id"],
+        created_at=row["created_at"], entry=decoded["entry"], lines=decoded["lines"],
+        user=decoded["user"], timestamp=decoded["timestamp"], format=decoded["format"],
+    )
+
+
+def get_audit_records(entry_id: int, db: Optional[Database] = None) -> List[AuditRecord]:
+    """Record di audit di una entry, in ordine di scrittura."""
+    with (db or DBManager.current()).reader() as conn:
+        return [_record(r) for r in conn.execute(_READ_SQL, (entry_id,)).fetchall()]
+
+
+def iter_audit(after_id: int = 0, page_size: int = 1000,
+               db: Optional[Database] = None) -> Iterator[AuditRecord]:
+    """Tutto audit_log a pagine (keyset su id), decodificato."""
+    db = db or DBManager.current()
+    while True:
+        with db.reader() as conn:
+            rows = conn.execute(_PAGE_SQL, (after_id, page_size)).fetchall()
+        for row in rows:
+            yield _record(row)
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["id"]
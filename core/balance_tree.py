@@ -0,0 +1,60 @@
+# core/balance_tree.py
+"""
+Bilancio navigabile per la vista ad albero (drill-down conto → mastrino → entry).
+
+I totali di tutti i nodi di un intervallo escono da un solo calcolo di
+TrialBalanceService (saldi mensili + giorni di bordo, rollup lungo
+parent_code) e restano in una ReportCache del DB con chiave (da, a) e la
+versione del libro giornale. Espandere un nodo, richiuderlo o tornare allo
+stesso intervallo legge solo dalla cache: entry_lines si interroga di nuovo
+solo dopo una registrazione.
+"""
+from typing import Dict, List, Optional
+
+from core.account_index import get_account_index
+from core.report_cache import ReportCache, ledger_version
+from core.trial_balance import TrialBalanceRow, TrialBalanceService
+from db.database import Database
+from db.db_manager import DBManager
+
+# intervalli di date tenuti in memoria per DB
+CACHED_RANGES = 8
+
+
+class BalanceTreeService:
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+
+    @property
+    def db(self) -> Database:
+        return self._db or DBManager.current()
+
+    def cache(self) -> ReportCache:
+        return self.db.cache("balance_tree", lambda db: ReportCache(max_entries=CACHED_RANGES))
+
+    def nodes(self, from_date: str, to_date: str) -> Dict[str, TrialBalanceRow]:
+        """Totali (già sommati sui figli) di ogni conto del piano, per codice. Da non modificare."""
+        cache = self.cache()
+        # versione letta prima del calcolo: una registrazione nel mezzo rende
+        # la voce già vecchia, mai una voce vecchia con la versione nuova
+        version = ledger_version(self.db)
+        nodes = cache.get((from_date, to_date), version)
+        if nodes is None:
+            tb = TrialBalanceService(self.db).compute(from_date, to_date, include_empty=True)
+            nodes = {row.code: row for row in tb.rows}
+            cache.put((from_date, to_date), version, nodes)
+        return nodes
+
+    def children(self, code: Optional[str], from_date: str, to_date: str,
+                 include_empty: bool = False) -> List[TrialBalanceRow]:
+        """Figli diretti di un conto (None -> radici) con i loro totali, in ordine di codice."""
+        nodes = self.nodes(from_date, to_date)
+        rows = [nodes[c] for c in get_account_index(self.db).children(code) if c in nodes]
+        return rows if include_empty else [r for r in rows if r.dare or r.avere]
+
+    def node(self, code: str, from_date: str, to_date: str) -> Optional[TrialBalanceRow]:
+        return self.nodes(from_date, to_date).get(code)
+
+    def is_leaf(self, code: str) -> bool:
+        return not get_account_index(self.db).children(code)
@@ -0,0 +1,179 @@
+# core/balances.py
+"""
+Saldi mensili materializzati per conto (tabella account_period_balances).
+
+Il PostingEngine aggiorna la tabella nella stessa transazione delle righe;
+rebuild() la ricostruisce da zero a partire da entry_lines. Le query di saldo
+combinano i mesi interi della tabella con i soli giorni di bordo letti da
+entry_lines, così il costo non cresce con la storia del conto. I mesi degli
+esercizi archiviati (db.archive) restano nella tabella; i giorni di bordo in
+un anno archiviato si leggono dal suo file.
+
+Uso da riga di comando:
+    python -m core.balances [percorso_db]
+"""
+import sys
+from datetime import date, timedelta
+from typing import Collection, Iterable, Optional, Tuple
+from core.money import Money
+from db import archive
+from db.db_manager import DBManager
+
+_UPSERT_SQL = """
+    INSERT INTO account_period_balances (account_code, period, dare_cents, avere_cents)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(account_code, period) DO UPDATE SET
+        dare_cents = dare_cents + excluded.dare_cents,
+        avere_cents = avere_cents + excluded.avere_cents
+"""
+
+# le righe degli esercizi archiviati non sono più in entry_lines: i loro mesi restano
+_CLEAR_SQL = """
+    DELETE FROM account_period_balances
+    WHERE CAST(substr(period, 1, 4) AS INTEGER) NOT IN (SELECT year FROM archives)
+"""
+
+_REBUILD_SQL = """
+    INSERT INTO account_period_balances (account_code, period, dare_cents, avere_cents)
+    SELECT el.account_code, substr(e.date, 1, 7), SUM(el.dare_cents), SUM(el.avere_cents)
+    FROM entry_lines el
+    JOIN entries e ON e.id = el.entry_id
+    GROUP BY el.account_code, substr(e.date, 1, 7)
+"""
+
+DateRange = Tuple[str, str]
+
+
+def add_lines(cur, dated_lines: Iterable[Tuple[str, str, int, int]]):
+    """
+    Somma righe (date, account_code, dare_cents, avere_cents) ai saldi mensili.
+    Le righe sono aggregate per (conto, mese) prima dell'upsert.
+    """
+    deltas = {}
+    for day, account_code, dare, avere in dated_lines:
+        key = (account_code, day[:7])
+        d, a = deltas.get(key, (0, 0))
+        deltas[key] = (d + dare, a + avere)
+    cur.executemany(_UPSERT_SQL, [
+        (account_code, period, d, a)
+        for (account_code, period), (d, a) in deltas.items()
+    ])
+
+
+def rebuild(cur):
+    """Ricostruisce account_period_balances da entry_lines (dentro una transazione)."""
+    cur.execute(_CLEAR_SQL)
+    cur.execute(_REBUILD_SQL)
+
+
+def split_range(from_date: str, to_date: str) -> Tuple[Optional[DateRange], Optional[DateRange], Optional[DateRange]]:
+    """
+    Divide [from_date, to_date] in (bordo iniziale, mesi interi, bordo finale).
+    I bordi sono intervalli di date, i mesi interi un intervallo 'YYYY-MM'.
+    """
+    start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    if start > end:
+        return None, None, None
+
+    first_full = start if start.day == 1 else _next_month(start)
+    after_end = end + timedelta(days=1)
+    last_full_end = end if after_end.day == 1 else end.replace(day=1) - timedelta(days=1)
+
+    if first_full > last_full_end:
+        return (from_date, to_date), None, None
+
+    head = (from_date, (first_full - timedelta(days=1)).isoformat()) if start < first_full else None
+    tail = ((last_full_end + timedelta(days=1)).isoformat(), to_date) if last_full_end < end else None
+    months = (first_full.isoformat()[:7], last_full_end.isoformat()[:7])
+    return head, months, tail
+
+
+def _next_month(d: date) -> date:
+    return date(d.year + 1, 1, 1) if d.month == 12 else date(d.year, d.month + 1, 1)
+
+
+def movements_sql(from_date: str, to_date: str, account_code: Optional[str] = None,
+                  archived: Collection[int] = ()) -> Tuple[str, list]:
+    """
+    Sottoquery (account_code, dare_cents, avere_cents) i cui totali danno i movimenti tra
+    from_date e to_date inclusi: mesi interi da account_period_balances, giorni
+    di bordo da entry_lines. Con account_code limita la lettura a quel conto.
+    archived: anni i cui giorni di bordo si leggono dall'archivio collegato.
+    Restituisce (sql, parametri); sql è None se l'intervallo è vuoto.
+    """
+    head, months, tail = split_range(from_date, to_date)
+    account_filter = " AND account_code = ?" if account_code is not None else ""
+    line_filter = " AND el.account_code = ?" if account_code is not None else ""
+    account_param = [account_code] if account_code is not None else []
+    parts, params = [], []
+    if months:
+        parts.append(f"""
+            SELECT account_code, dare_cents, avere_cents FROM account_period_balances
+            WHERE period BETWEEN ? AND ?{account_filter}""")
+        params += [*months, *account_param]
+    for edge in (head, tail):
+        if not edge:
+            continue
+        for schema, start, end in archive.segments(*edge, archived):
+            # entries guida il join: i bordi coprono al massimo un mese ciascuno
+            parts.append(archive.qualify(f"""
+            SELECT el.account_code, el.dare_cents, el.avere_cents
+            FROM entries e CROSS JOIN entry_lines el ON el.entry_id = e.id
+            WHERE e.date BETWEEN ? AND ?{line_filter}""", schema))
+            params += [start, end, *account_param]
+    if not parts:
+        return None, []
+    return " UNION ALL ".join(parts), params
+
+
+def account_balance_sql(account_code: str, from_date: str, to_date: str,
+                        archived: Collection[int] = ()) -> Tuple[str, list]:
+    sql, params = movements_sql(from_date, to_date, account_code, archived)
+    if sql is None:
+        return None, []
+    return f"SELECT SUM(dare_cents), SUM(avere_cents) FROM ({sql})", params
+
+
+def totals_sql(from_date: str, to_date: str, archived: Collection[int] = ()) -> Tuple[str, list]:
+    sql, params = movements_sql(from_date, to_date, archived=archived)
+    if sql is None:
+        return None, []
+    return f"""
+        SELECT account_code, SUM(dare_cents) AS dare, SUM(avere_cents) AS avere
+        FROM ({sql}) GROUP BY account_code
+    """, params
+
+
+def account_balance(cur, account_code: str, from_date: str, to_date: str) -> Tuple[Money, Money]:
+    """(dare, avere) del conto tra from_date e to_date inclusi."""
+    sql, params = account_balance_sql(account_code, from_date, to_date,
+                                      archive.archived_years(cur.connection))
+    if sql is None:
+        return Money(0), Money(0)
+    cur.execute(sql, params)
+    row = cur.fetchone()
+    return Money(row[0] or 0), Money(row[1] or 0)
+
+
+def totals_by_account(cur, from_date: str, to_date: str) -> dict:
+    """{account_code: (dare_cents, avere_cents)} per tutti i conti movimentati, in una sola query."""
+    sql, params = totals_sql(from_date, to_date, archive.archived_years(cur.connection))
+    if sql is None:
+        return {}
+    cur.execute(sql, params)
+    return {r["account_code"]: (r["dare"] or 0, r["avere"] or 0) for r in cur.fetchall()}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        DBManager.configure(argv[0])
+    with DBManager.transaction() as cur:
+        rebuild(cur)
+        cur.execute("SELECT COUNT(*) FROM account_period_balances")
+        print(f"Saldi mensili ricostruiti: {cur.fetchone()[0]} righe")
+    DBManager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# core/journal.py
+"""
+Prima nota a pagine: tutte le righe di tutte le entry in ordine
+(date, entry_id, line_id), lette con un cursore keyset.
+
+Ogni pagina costa come la sua dimensione, qualunque sia la posizione nel
+giornale: la vista della GUI (frontend.journal_model) chiede la pagina
+successiva solo quando l'utente scorre fino in fondo.
+
+Dopo una registrazione la vista non ricarica: get_journal_since() legge le
+sole entry con id oltre l'ultimo visto (gli id crescono con l'inserimento,
+anche per date retrodatate) e la vista le inserisce al loro posto.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from core.account_index import AccountInfo, get_account_index
+from core.models import JournalCursor
+from core.money import Money
+from db import archive
+from db.database import Database
+from db.db_manager import DBManager
+
+JOURNAL_PAGE_SIZE = 500
+_OPEN_START, _OPEN_END = "0001-01-01", "9999-12-31"
+
+_JOURNAL_PAGE_SQL = """
+    SELECT e.id AS entry_id, el.id AS line_id, e.date, e.protocol, e.document,
+           e.document_date, e.party, e.description, e.reversal_of,
+           el.account_code, el.dare_cents, el.avere_cents,
+           EXISTS (SELECT 1 FROM entries r WHERE r.reversal_of = e.id) AS reversed
+    FROM entries e
+    CROSS JOIN entry_lines el ON el.entry_id = e.id
+    WHERE e.date BETWEEN ? AND ?
+      AND (e.date, e.id, el.id) > (?, ?, ?)
+    ORDER BY e.date ASC, e.id ASC, el.id ASC
+    LIMIT ?
+"""
+_SINCE_SQL = """
+    SELECT e.id AS entry_id, el.id AS line_id, e.date, e.protocol, e.document,
+           e.document_date, e.party, e.description, e.reversal_of,
+           el.account_code, el.dare_cents, el.avere_cents,
+           EXISTS (SELECT 1 FROM entries r WHERE r.reversal_of = e.id) AS reversed
+    FROM entries e
+    CROSS JOIN entry_lines el ON el.entry_id = e.id
+    WHERE e.id > ?
+    ORDER BY e.id ASC, el.id ASC
+"""
+_LAST_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM entries"
+
+
+def journal_row(r, accounts: Dict[str, AccountInfo]) -> dict:
+    """Riga della prima nota; importo in centesimi, positivo in dare e negativo in avere."""
+    info = accounts.get(r["account_code"])
+    return {
+        "entry_id": r["entry_id"], "line_id": r["line_id"], "date": r["date"],
+        "protocol": r["protocol"], "document": r["document"],
+        "document_date": r["document_date"], "party": r["party"],
+        "description": r["description"], "reversal_of": r["reversal_of"],
+        "reversed": bool(r["reversed"]),
+        "account_code": r["account_code"],
+        "account_name": info.name if info else "",
+        "importo": Money(r["dare_cents"] - r["avere_cents"]),
+    }
+
+
+def get_journal_page(after: Optional[JournalCursor] = None, limit: int = JOURNAL_PAGE_SIZE,
+                     from_date: str = _OPEN_START, to_date: str = _OPEN_END,
+                     db: Optional[Database] = None) -> Tuple[List[dict], Optional[JournalCursor]]:
+    """
+    Una pagina della prima nota dopo `after` (dall'inizio senza cursore).
+    Restituisce (righe, cursore_successivo); il cursore è None a fine giornale.
+    """
+    db = db or DBManager.current()
+    after = after or JournalCursor("", 0, 0)
+    accounts = get_account_index(db).accounts()
+    rows: List[dict] = []
+    with db.reader() as conn:
+        cur = conn.cursor()
+        for schema, start, end in archive.segments(max(from_date, after.date), to_date,
+                                                   archive.archived_years(conn)):
+            cur.execute(archive.qualify(_JOURNAL_PAGE_SQL, schema),
+                        (start, end, after.date, after.entry_id, after.line_id, limit - len(rows)))
+            rows.extend(journal_row(r, accounts) for r in cur)
+            if len(rows) == limit:
+                break
+    if len(rows) < limit:
+        return rows, None
+    last = rows[-1]
+    return rows, JournalCursor(last["date"], last["entry_id"], last["line_id"])
+
+
+def last_entry_id(db: Optional[Database] = None) -> int:
+    """Id più alto in entries (0 se vuota): il punto di partenza di get_journal_since."""
+    with (db or DBManager.current()).reader() as conn:
+        return conn.execute(_LAST_ID_SQL).fetchone()[0]
+
+
+def get_journal_since(after_entry_id: int, db: Optional[Database] = None) -> List[dict]:
+    """
+    Righe delle entry registrate dopo after_entry_id, in ordine di id: costa
+    quanto le entry nuove. Gli anni archiviati non ricevono registrazioni e
+    restano fuori.
+    """
+    db = db or DBManager.current()
+    accounts = get_account_index(db).accounts()
+    with db.reader() as conn:
+        return [journal_row(r, accounts) for r in conn.execute(_SINCE_SQL, (after_entry_id,))]
@@ -1,20 +1,71 @@
-from decimal import Decimal
-from core.models import EntryDTO, LineDTO, EntryResult, LedgerError, ErrorCode
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from core.models import EntryDTO, LineDTO, EntryResult, LedgerError, ErrorCode, LedgerCursor
+from core.money import Money
 from core.posting_engine import PostingEngine
-from core import validator
+from core import validator, balances
+from db import archive
+from db.database import Database
 from db.db_manager import DBManager
 
+LEDGER_PAGE_SIZE = 1000
+
+# Query usate qui; i piani attesi sono in core.query_catalog
+_ENTRY_SQL = "SELECT * FROM entries WHERE id = ?"
+_REVERSAL_SQL = "SELECT id FROM entries WHERE reversal_of = ?"
+_LINES_SQL = "SELECT * FROM entry_lines WHERE entry_id = ?"
+_ENTRIES_IN_SQL = "SELECT * FROM entries WHERE id IN ({marks})"
+# intervallo sul prefisso: usa l'indice UNIQUE di client_reference_id.
+# "+reversal_of" esclude idx_entries_reversal_of: IS NULL vale per quasi tutte le righe
+_ENTRIES_BY_PREFIX_SQL = """
+    SELECT * FROM entries
+    WHERE client_reference_id >= ? AND client_reference_id < ?
+      AND +reversal_of IS NULL
+"""
+_ENTRIES_BY_DATE_SQL = """
+    SELECT * FROM entries
+    WHERE date BETWEEN ? AND ? AND +reversal_of IS NULL
+"""
+_LINES_IN_SQL = """
+    SELECT * FROM entry_lines WHERE entry_id IN ({marks})
+    ORDER BY entry_id, id
+"""
+# CROSS JOIN: si parte da entries per data, così l'ordine (date, id, el.id)
+# esce già dagli indici senza ordinamento temporaneo
+_LEDGER_PAGE_SQL = """
+    SELECT e.id AS entry_id, e.date, e.document, el.id AS line_id,
+           el.dare_cents, el.avere_cents
+    FROM entries e
+    CROSS JOIN entry_lines el ON el.entry_id = e.id
+    WHERE el.account_code = ? AND e.date BETWEEN ? AND ?
+      AND (e.date, e.id, el.id) > (?, ?, ?)
+    ORDER BY e.date ASC, e.id ASC, el.id ASC
+    LIMIT ?
+"""
+
+def _chunks(seq: list, size: int = 500):
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+def _marks(chunk: list) -> str:
+    return ",".join("?" * len(chunk))
+
 class LedgerService:
 
-    def __init__(self):
-        self.engine = PostingEngine()
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+        self.engine = PostingEngine(db)
+
+    @property
+    def db(self) -> Database:
+        return self._db or DBManager.current()
 
     def reverse_entry(self, entry_id: int, user_id: str) -> EntryResult:
-        conn = DBManager.connect()
+        conn = self.db.connect()
         cur = conn.cursor()
 
         # 1. Recupera entry originale
-        cur.execute("SELECT * FROM entries WHERE id = ?", (entry_id,))
+        cur.execute(_ENTRY_SQL, (entry_id,))
         original = cur.fetchone()
         if not original:
             return EntryResult(
@@ -24,7 +75,7 @@ class LedgerService:
             )
 
         # 2. Controlla se già stornata
-        cur.execute("SELECT id FROM entries WHERE reversal_of = ?", (entry_id,))
+        cur.execute(_REVERSAL_SQL, (entry_id,))
         already_reversed = cur.fetchone()
         if already_reversed:
             return EntryResult(
@@ -35,71 +86,215 @@ class LedgerService:
             )
 
         # 3. Recupera linee
-        cur.execute("SELECT * FROM entry_lines WHERE entry_id = ?", (entry_id,))
+        cur.execute(_LINES_SQL, (entry_id,))
         lines = cur.fetchall()
 
+        dto = self._storno_dto(original, lines)
+
+        # 4. Validazione
+        errors = validator.validate(dto, self.db)
+        if errors:
+            return EntryResult(
+                success=False,
+                errors=[err.message for err in errors],
+                error_details=errors
+            )
+
+        # 5. Post storno
+        return self.engine.post(dto, user_id)
+    
+    def _storno_dto(self, original, lines) -> EntryDTO:
         reversed_lines = [
             LineDTO(
                 account_id=line["account_code"],
-                dare=Decimal(str(line["avere"])),
-                avere=Decimal(str(line["dare"]))
+                dare=Money(line["avere_cents"]),
+                avere=Money(line["dare_cents"])
             )
             for line in lines
         ]
-
-        dto = EntryDTO(
+        return EntryDTO(
             date=original["date"],
             documento=original["document"],
             document_date=original["document_date"],
             cliente_fornitore=original["party"],
-            descrizione=f"STORNO ENTRY {entry_id}",
+            descrizione=f"STORNO ENTRY {original['id']}",
             lines=reversed_lines,
-            reversal_of=entry_id
+            reversal_of=original["id"]
         )
 
-        # 4. Validazione
-        errors = validator.validate(dto)
-        if errors:
-            return EntryResult(
-                success=False,
-                errors=[err.message for err in errors],
-                error_details=errors
-            )
+    def reverse_entries(self, user_id: str,
+                        entry_ids: Optional[Iterable[int]] = None,
+                        from_date: Optional[str] = None, to_date: Optional[str] = None,
+                        client_reference_prefix: Optional[str] = None) -> Dict[int, EntryResult]:
+        """
+        Storna molte entry in un'unica transazione.
+
+        Selezione (una sola): entry_ids, oppure from_date/to_date, oppure
+        client_reference_prefix. Con data o prefisso gli storni esistenti non
+        vengono selezionati. Originali, righe e storni già presenti sono letti
+        con query per insiemi; la validazione è fatta in blocco e gli storni
+        validi sono registrati con un solo post_many.
+
+        Restituisce {id_originale: EntryResult} in ordine di id.
+        """
+        selectors = [entry_ids is not None, from_date is not None or to_date is not None,
+                     client_reference_prefix is not None]
+        if sum(selectors) != 1:
+            raise ValueError("Indicare entry_ids, un intervallo di date oppure un prefisso")
+
+        cur = self.db.connect().cursor()
+
+        # 1. Originali
+        if entry_ids is not None:
+            ids = sorted(set(entry_ids))
+            originals = {}
+            for chunk in _chunks(ids):
+                cur.execute(_ENTRIES_IN_SQL.format(marks=_marks(chunk)), chunk)
+                originals.update((r["id"], r) for r in cur.fetchall())
+        elif client_reference_prefix is not None:
+            cur.execute(_ENTRIES_BY_PREFIX_SQL,
+                        (client_reference_prefix, client_reference_prefix + "\U0010ffff"))
+            originals = {r["id"]: r for r in cur.fetchall()}
+            ids = sorted(originals)
+        else:
+            cur.execute(_ENTRIES_BY_DATE_SQL, (from_date or "0001-01-01", to_date or "9999-12-31"))
+            originals = {r["id"]: r for r in cur.fetchall()}
+            ids = sorted(originals)
+
+        report: Dict[int, EntryResult] = {}
+        for entry_id in ids:
+            if entry_id not in originals:
+                report[entry_id] = EntryResult(
+                    success=False,
+                    errors=["Entry non trovata"],
+                    error_details=[LedgerError(ErrorCode.DB_ERROR, f"Entry {entry_id} non trovata")]
+                )
+        found = [entry_id for entry_id in ids if entry_id in originals]
+
+        # 2. Righe di tutte le entry selezionate
+        lines: Dict[int, list] = {entry_id: [] for entry_id in found}
+        for chunk in _chunks(found):
+            cur.execute(_LINES_IN_SQL.format(marks=_marks(chunk)), chunk)
+            for line in cur.fetchall():
+                lines[line["entry_id"]].append(line)
+
+        # 3. Validazione in blocco (include il controllo "già stornata")
+        dtos = [self._storno_dto(originals[entry_id], lines[entry_id]) for entry_id in found]
+        to_post = []
+        for entry_id, dto, errors in zip(found, dtos, validator.validate_many(dtos, self.db)):
+            if errors:
+                report[entry_id] = EntryResult(
+                    success=False,
+                    errors=[err.message for err in errors],
+                    error_details=errors
+                )
+            else:
+                to_post.append((entry_id, dto))
+
+        # 4. Tutti gli storni validi in una transazione
+        if to_post:
+            results = self.engine.post_many([dto for _, dto in to_post], user_id,
+                                            batch_size=len(to_post))
+            for (entry_id, _), result in zip(to_post, results):
+                report[entry_id] = result
+
+        return dict(sorted(report.items()))
 
-        # 5. Post storno
-        return self.engine.post(dto, user_id)
-    
     def get_account_balance(self, account_code: str, from_date: str, to_date: str):
-        cur = DBManager.connect().cursor()
-        cur.execute("""
-            SELECT SUM(dare) AS dare, SUM(avere) AS avere
-            FROM entry_lines el
-            JOIN entries e ON e.id = el.entry_id
-            WHERE el.account_code = ? AND e.date BETWEEN ? AND ?
-        """, (account_code, from_date, to_date))
-        row = cur.fetchone()
-        dare = row["dare"] or 0.0
-        avere = row["avere"] or 0.0
-        return {"dare": dare, "avere": avere, "saldo": dare - avere}
+        # Mesi interi da account_period_balances, giorni di bordo da entry_lines
+        with self.db.reader() as conn:
+            dare, avere = balances.account_balance(conn.cursor(), account_code, from_date, to_date)
+        return {"dare": dare, "avere": avere, "saldo": Money(dare - avere)}
 
-    def get_account_ledger(self, account_code: str, from_date: str, to_date: str):
-        cur = DBManager.connect().cursor()
-        cur.execute("""
-            SELECT e.id AS entry_id, e.date, e.document, el.dare, el.avere
-            FROM entry_lines el
-            JOIN entries e ON e.id = el.entry_id
-            WHERE el.account_code = ? AND e.date BETWEEN ? AND ?
-            ORDER BY e.date ASC, e.id ASC
-        """, (account_code, from_date, to_date))
-        rows = cur.fetchall()
-        saldo = 0.0
+    def rebuild_balances(self):
+        """Ricostruisce da zero i saldi mensili materializzati."""
+        with self.db.transaction() as cur:
+            balances.rebuild(cur)
+
+    def get_opening_balance(self, account_code: str, from_date: str) -> Money:
+        """Saldo del conto alla chiusura del giorno precedente from_date."""
+        if from_date <= "0001-01-01":
+            return Money(0)
+        day_before = (date.fromisoformat(from_date) - timedelta(days=1)).isoformat()
+        return self.get_account_balance(account_code, "0001-01-01", day_before)["saldo"]
+
+    def get_account_ledger_page(self, account_code: str, from_date: str, to_date: str,
+                                after: Optional[LedgerCursor] = None,
+                                limit: int = LEDGER_PAGE_SIZE) -> Tuple[List[dict], Optional[LedgerCursor]]:
+        """
+        Una pagina del mastrino, ordinata per (date, entry_id, line_id).
+
+        Senza cursore parte dal saldo di apertura a from_date; con un cursore
+        riprende subito dopo la riga indicata e dal suo saldo progressivo.
+        Restituisce (righe, cursore_successivo); il cursore è None a fine mastrino.
+        """
+        if after is None:
+            after = LedgerCursor("", 0, 0, self.get_opening_balance(account_code, from_date))
+
+        saldo = after.saldo
         ledger = []
-        for r in rows:
-            saldo += (r["dare"] or 0.0) - (r["avere"] or 0.0)
-            ledger.append({
-                "entry_id": r["entry_id"], "date": r["date"],
-                "document": r["document"],
-                "dare": r["dare"], "avere": r["avere"],
-                "saldo": saldo
-            })
-        return ledger
+        with self.db.reader() as conn:
+            cur = conn.cursor()
+            # il limite inferiore parte dal cursore: ogni pagina legge solo le sue righe.
+            # Gli anni archiviati sono tratti a sé, letti in ordine di data dal loro file.
+            for schema, start, end in archive.segments(max(from_date, after.date), to_date,
+                                                       archive.archived_years(conn)):
+                cur.execute(archive.qualify(_LEDGER_PAGE_SQL, schema),
+                            (account_code, start, end,
+                             after.date, after.entry_id, after.line_id, limit - len(ledger)))
+                for r in cur:
+                    saldo += r["dare_cents"] - r["avere_cents"]
+                    ledger.append({
+                        "entry_id": r["entry_id"], "line_id": r["line_id"], "date": r["date"],
+                        "document": r["document"],
+                        "dare": Money(r["dare_cents"]), "avere": Money(r["avere_cents"]),
+                        "saldo": Money(saldo)
+                    })
+                if len(ledger) == limit:
+                    break
+        if len(ledger) < limit:
+            return ledger, None
+        last = ledger[-1]
+        return ledger, LedgerCursor(last["date"], last["entry_id"], last["line_id"], saldo)
+
+    def iter_account_ledger(self, account_code: str, from_date: str, to_date: str,
+                            after: Optional[LedgerCursor] = None,
+                            page_size: int = LEDGER_PAGE_SIZE) -> Iterator[List[dict]]:
+        """Mastrino a pagine: memoria costante anche su milioni di righe."""
+        cursor = after
+        while True:
+            page, cursor = self.get_account_ledger_page(
+                account_code, from_date, to_date, after=cursor, limit=page_size)
+            if page:
+                yield page
+            if cursor is None:
+                return
+
+    def get_account_ledger(self, account_code: str, from_date: str, to_date: str):
+        return [row
+                for page in self.iter_account_ledger(account_code, from_date, to_date)
+                for row in page]
+
+    def get_entry(self, entry_id: int, entry_date: Optional[str] = None) -> Optional[dict]:
+        """
+        Una entry con le sue righe (importi Money), None se non esiste.
+        Con la data (es. da una riga di mastrino) legge subito dal file giusto,
+        anche per gli anni archiviati; senza, prova il file principale e poi gli archivi.
+        """
+        with self.db.reader() as conn:
+            archived = archive.archived_years(conn)
+            if entry_date is not None:
+                year = int(entry_date[:4])
+                schemas = [archive.schema_name(year) if year in archived else "main"]
+            else:
+                schemas = ["main"] + [archive.schema_name(year) for year in archived]
+            for schema in schemas:
+                entry = conn.execute(archive.qualify(_ENTRY_SQL, schema), (entry_id,)).fetchone()
+                if entry is None:
+                    continue
+                lines = conn.execute(archive.qualify(_LINES_SQL, schema), (entry_id,)).fetchall()
+                return {**dict(entry), "lines": [{
+                    "line_id": line["id"], "account_code": line["account_code"],
+                    "dare": Money(line["dare_cents"]), "avere": Money(line["avere_cents"]),
+                } for line in lines]}
+        return None
@@ -1,12 +1,27 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 from enum import Enum, auto
+from core.money import Money, ZERO
 
 @dataclass(frozen=True)
 class LineDTO:
+    """Riga di scrittura: dare/avere accettano euro (float, Decimal, str) o Money."""
     account_id: str
-    dare: float = 0.0
-    avere: float = 0.0
+    dare: Money = ZERO
+    avere: Money = ZERO
+
+    def __post_init__(self):
+        # conversione una sola volta: validazione e posting lavorano su centesimi
+        for name in ("dare", "avere"):
+            value = getattr(self, name)
+            if type(value) is Money:
+                continue
+            # un int semplice è ambiguo: Money.of lo legge in euro, ma le somme
+            # di Money sono int in centesimi (Money(100) + Money(50) == 150)
+            if isinstance(value, int):
+                raise TypeError(f"{name}: importo intero ambiguo ({value!r}), "
+                                f"usare Money(centesimi) o Money.of(euro)")
+            object.__setattr__(self, name, Money.of(value))
 
 @dataclass
 class EntryDTO:
@@ -33,6 +48,21 @@ class EntryResult:
     warnings: List[str] = field(default_factory=list)
     error_details: List['LedgerError'] = field(default_factory=list)
 
+@dataclass(frozen=True)
+class LedgerCursor:
+    """Posizione di ripresa in un mastrino: ultima riga letta e saldo progressivo."""
+    date: str
+    entry_id: int
+    line_id: int
+    saldo: int      # centesimi
+
+@dataclass(frozen=True)
+class JournalCursor:
+    """Posizione di ripresa nella prima nota: ultima riga letta."""
+    date: str
+    entry_id: int
+    line_id: int
+
 # Error codes per validazione e posting
 class ErrorCode(Enum):
     UNBALANCED = auto()
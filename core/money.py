@@ -0,0 +1,51 @@
+# core/money.py
+from decimal import Decimal, ROUND_HALF_UP
+
+_CENT = Decimal(1)
+
+
+class Money(int):
+    """
+    Importo in centesimi di euro (int64).
+
+    È un int: confronti, somme e SUM() in SQLite lavorano su interi esatti e
+    sqlite3 lo salva come INTEGER senza adattatori. Le operazioni aritmetiche
+    restituiscono int semplici; Money(x) serve solo per presentarli in euro.
+
+        Money.of(12.3)      -> Money(1230)   (float/Decimal/str = euro)
+        Money.of(12)        -> Money(1200)   (int semplice = euro interi)
+        Money(1230)         -> 12.30         (costruttore diretto = centesimi)
+    """
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, value) -> "Money":
+        """Converte un importo in euro, arrotondando al centesimo (ROUND_HALF_UP)."""
+        if isinstance(value, Money):
+            return value
+        if value is None:
+            return ZERO
+        if isinstance(value, int):
+            return cls(value * 100)
+        if isinstance(value, float):
+            value = Decimal(repr(value))
+        elif not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return cls(int(value.scaleb(2).quantize(_CENT, rounding=ROUND_HALF_UP)))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(int(self)).scaleb(-2)
+
+    def __str__(self) -> str:
+        sign = "-" if self < 0 else ""
+        euros, cents = divmod(abs(int(self)), 100)
+        return f"{sign}{euros}.{cents:02d}"
+
+    def __repr__(self) -> str:
+        return f"Money.of('{self}')"
+
+    def __format__(self, spec: str) -> str:
+        return format(self.to_decimal(), spec) if spec else str(self)
+
+
+ZERO = Money(0)
@@ -0,0 +1,135 @@
+# core/period_index.py
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from db.database import Database
+from db.db_manager import DBManager
+
+_GENERATION_SQL = "SELECT generation FROM cache_generations WHERE name = 'periods'"
+_CLOSED_PERIODS_SQL = """
+    SELECT year, month, start_date, end_date
+    FROM periods WHERE status = 'closed'
+"""
+
+PeriodKey = Tuple[int, Optional[int]]   # (year, month) - month None = annuale
+
+
+def period_generation(conn) -> int:
+    """Contatore 'periods' di cache_generations (connessione o cursore)."""
+    row = conn.execute(_GENERATION_SQL).fetchone()
+    return row[0] if row else 0
+
+
+class ClosedPeriodIndex:
+    """
+    Indice ordinato degli intervalli [start_date, end_date] dei periodi chiusi.
+
+    La ricerca usa bisect sulle date di inizio e un massimo prefisso delle date
+    di fine, quindi costa O(log n) anche con intervalli sovrapposti (anno chiuso
+    e mesi chiusi). PeriodService applica le proprie modifiche con patch()/
+    discard() dopo il commit, passando il contatore letto all'inizio e alla
+    fine della sua transazione. Ogni altra scrittura su periods (SQL diretto,
+    ripristini, altri processi) incrementa il contatore 'periods' in
+    cache_generations con un trigger; come in AccountIndex il contatore si
+    legge solo se total_changes o PRAGMA data_version sono cambiati, e se è
+    diverso l'indice si ricostruisce via SQL.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db          # None: il DB corrente di DBManager
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_changes = None
+        self._data_version = None
+        self._generation = None
+        self._closed: Dict[PeriodKey, Tuple[str, str]] = {}
+        # (starts, max_ends, owners) sostituiti in blocco per letture coerenti
+        self._arrays: Tuple[List[str], List[str], List[PeriodKey]] = ([], [], [])
+
+    # --- Costruzione -------------------------------------------------------
+
+    def _refresh(self):
+        db = self._db or DBManager.current()
+        conn = db.connect()
+        with self._lock:
+            same_conn = conn is self._conn
+            data_version = db.data_version(conn)
+            if (same_conn and conn.total_changes == self._total_changes
+                    and data_version == self._data_version):
+                return
+
+            generation = period_generation(conn)
+            if not same_conn or generation != self._generation:
+                rows = conn.execute(_CLOSED_PERIODS_SQL).fetchall()
+                self._closed = {(r["year"], r["month"]): (r["start_date"], r["end_date"])
+                                for r in rows}
+                self._rebuild()
+            self._conn = conn
+            self._generation = generation
+            self._total_changes = conn.total_changes
+            self._data_version = data_version
+
+    def _rebuild(self):
+        # A parità di inizio l'annuale precede i mesi, così a parità di fine vince l'anno
+        items = sorted(self._closed.items(),
+                       key=lambda kv: (kv[1][0], kv[0][1] is not None))
+        starts, max_ends, owners = [], [], []
+        best_end, best_key = "", None
+        for key, (start, end) in items:
+            if end > best_end:
+                best_end, best_key = end, key
+            starts.append(start)
+            max_ends.append(best_end)
+            owners.append(best_key)
+        self._arrays = (starts, max_ends, owners)
+
+    # --- Aggiornamenti da PeriodService -------------------------------------
+
+    def _adopt(self, generations: Tuple[int, int]) -> bool:
+        # la modifica vale solo su un indice aggiornato all'inizio della transazione;
+        # altrimenti resta il contatore vecchio e la prossima ricerca ricostruisce
+        before, after = generations
+        if self._conn is None or self._generation != before:
+            return False
+        self._generation = after
+        return True
+
+    def patch(self, year: int, month: Optional[int], start_date: str, end_date: str,
+              generations: Tuple[int, int]):
+        """
+        Registra un periodo appena chiuso (chiamare dopo il commit).
+        generations: period_generation() all'inizio e alla fine della transazione.
+        """
+        with self._lock:
+            if not self._adopt(generations):
+                return
+            self._closed[(year, month)] = (start_date, end_date)
+            self._rebuild()
+
+    def discard(self, year: int, month: Optional[int], generations: Tuple[int, int]):
+        """Rimuove un periodo appena riaperto (chiamare dopo il commit, come patch())."""
+        with self._lock:
+            if not self._adopt(generations):
+                return
+            if self._closed.pop((year, month), None) is not None:
+                self._rebuild()
+
+    def invalidate(self):
+        with self._lock:
+            self._conn = None
+
+    # --- Ricerca -----------------------------------------------------------
+
+    def find_closed(self, day: str) -> Optional[PeriodKey]:
+        """(year, month) del periodo chiuso che contiene day (ISO), oppure None."""
+        self._refresh()
+        starts, max_ends, owners = self._arrays
+        i = bisect_right(starts, day)
+        if i and max_ends[i - 1] >= day:
+            return owners[i - 1]
+        return None
+
+
+def get_period_index(db: Optional[Database] = None) -> ClosedPeriodIndex:
+    """Indice dei periodi chiusi del DB (default: quello di DBManager), uno per DB."""
+    return (db or DBManager.current()).cache("period_index", ClosedPeriodIndex)
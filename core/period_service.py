@@ -1,6 +1,24 @@
+from typing import Optional
+from db.database import Database
 from db.db_manager import DBManager
+from core.period_index import get_period_index, period_generation
 from datetime import date, timedelta
 
+_SET_MONTH_STATUS_SQL = "UPDATE periods SET status=? WHERE year=? AND month=?"
+_DELETE_MONTH_LOCK_SQL = "DELETE FROM period_locks WHERE year=? AND month=?"
+_REOPEN_LOG_SQL = """
+    INSERT INTO closing_entries(period_id, entry_id, type, created_at)
+    SELECT id, NULL, 'reopen', datetime('now')
+    FROM periods WHERE year=? AND month=?
+"""
+_CLOSED_MONTHS_SQL = """
+    SELECT COUNT(*) AS cnt
+    FROM periods
+    WHERE year=? AND month BETWEEN 1 AND 12 AND status='closed'
+"""
+_ANNUAL_PERIOD_SQL = "SELECT id, start_date, end_date FROM periods WHERE year=? AND month IS NULL"
+_CLOSE_PERIOD_SQL = "UPDATE periods SET status='closed' WHERE id=?"
+
 def _month_dates(year: int, month: int):
     start = date(year, month, 1)
     # First day of next month
@@ -12,11 +30,19 @@ def _month_dates(year: int, month: int):
     return start.isoformat(), end.isoformat()
 
 class PeriodService:
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+
+    @property
+    def db(self) -> Database:
+        return self._db or DBManager.current()
+
     def close_month(self, year: int, month: int, user_id: str):
         month = int(month)
         start_date, end_date = _month_dates(year, month)
 
-        with DBManager.transaction() as cur:
+        with self.db.transaction() as cur:
+            before = period_generation(cur)
             # Upsert del periodo mensile (garantisce che la riga esista e abbia le date corrette)
             cur.execute("""
                 INSERT INTO periods(year, month, start_date, end_date, status)
@@ -27,43 +53,43 @@ class PeriodService:
             """, (year, month, start_date, end_date))
 
             # Chiudi il mese
-            cur.execute("UPDATE periods SET status='closed' WHERE year=? AND month=?", (year, month))
+            cur.execute(_SET_MONTH_STATUS_SQL, ("closed", year, month))
 
             # Registra lock
             cur.execute("""
                 INSERT OR IGNORE INTO period_locks(year, month, locked_at, locked_by)
                 VALUES (?, ?, datetime('now'), ?)
             """, (year, month, user_id))
-            return {"success": True}
+            after = period_generation(cur)
+
+        get_period_index(self.db).patch(year, month, start_date, end_date, (before, after))
+        return {"success": True}
 
     def reopen_month(self, year: int, month: int, user_id: str):
         month = int(month)
-        with DBManager.transaction() as cur:
+        with self.db.transaction() as cur:
+            before = period_generation(cur)
             # Riapri il mese
-            cur.execute("UPDATE periods SET status='open' WHERE year=? AND month=?", (year, month))
+            cur.execute(_SET_MONTH_STATUS_SQL, ("open", year, month))
             # Rimuovi lock
-            cur.execute("DELETE FROM period_locks WHERE year=? AND month=?", (year, month))
+            cur.execute(_DELETE_MONTH_LOCK_SQL, (year, month))
             # Log riapertura (entry_id nullable)
-            cur.execute("""
-                INSERT INTO closing_entries(period_id, entry_id, type, created_at)
-                SELECT id, NULL, 'reopen', datetime('now')
-                FROM periods WHERE year=? AND month=?
-            """, (year, month))
-            return {"success": True}
+            cur.execute(_REOPEN_LOG_SQL, (year, month))
+            after = period_generation(cur)
+
+        get_period_index(self.db).discard(year, month, (before, after))
+        return {"success": True}
 
     def close_year(self, year: int, user_id: str):
-        with DBManager.transaction() as cur:
+        with self.db.transaction() as cur:
+            before = period_generation(cur)
             # 1) Verifica che esistano tutti i 12 mesi e siano chiusi
-            cur.execute("""
-                SELECT COUNT(*) AS cnt
-                FROM periods
-                WHERE year=? AND month BETWEEN 1 AND 12 AND status='closed'
-            """, (year,))
+            cur.execute(_CLOSED_MONTHS_SQL, (year,))
             if cur.fetchone()["cnt"] != 12:
                 return {"success": False, "errors": ["Ci sono mesi ancora aperti o mancanti"]}
 
             # 2) Trova o crea il record annuale
-            cur.execute("SELECT id FROM periods WHERE year=? AND month IS NULL", (year,))
+            cur.execute(_ANNUAL_PERIOD_SQL, (year,))
             p = cur.fetchone()
             if not p:
                 start_date = f"{year}-01-01"
@@ -75,7 +101,8 @@ class PeriodService:
                 period_id = cur.lastrowid
             else:
                 period_id = p["id"]
-                cur.execute("UPDATE periods SET status='closed' WHERE id=?", (period_id,))
+                start_date, end_date = p["start_date"], p["end_date"]
+                cur.execute(_CLOSE_PERIOD_SQL, (period_id,))
 
             # 3) Lock annuale
             cur.execute("""
@@ -88,13 +115,33 @@ class PeriodService:
                 INSERT INTO closing_entries(period_id, entry_id, type, created_at)
                 VALUES (?, NULL, 'yearly', datetime('now'))
             """, (period_id,))
-            return {"success": True, "period_id": period_id}
+            after = period_generation(cur)
 
+        get_period_index(self.db).patch(year, None, start_date, end_date, (before, after))
+        return {"success": True, "period_id": period_id}
+
+    def archive_year(self, year: int, vacuum: bool = False):
+        """
+        Sposta le registrazioni di un esercizio chiuso in un file di archivio
+        in sola lettura (vedi db.archive); mastrini e saldi continuano a vederle.
+        """
+        try:
+            result = self.db.archive_year(year, vacuum=vacuum)
+        except ValueError as e:
+            return {"success": False, "errors": [str(e)]}
+        return {"success": True, "path": result.path,
+                "entries": result.entries, "lines": result.lines}
 
     def create_period(self, year: int, start_date: str, end_date: str, status: str = "open"):
-        with DBManager.transaction() as cur:
+        with self.db.transaction() as cur:
+            before = period_generation(cur)
             cur.execute("""
                 INSERT INTO periods(year, month, start_date, end_date, status)
                 VALUES (?, NULL, ?, ?, ?)
             """, (year, start_date, end_date, status))
-            return {"success": True}
+            after = period_generation(cur)
+
+        # un periodo aperto non cambia i chiusi: la prossima ricerca rilegge il contatore
+        if status == "closed":
+            get_period_index(self.db).patch(year, None, start_date, end_date, (before, after))
+        return {"success": True}
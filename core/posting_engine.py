@@ -1,33 +1,115 @@
-import json
 import sqlite3
-from datetime import datetime, timezone 
-from decimal import Decimal
+from typing import Iterable, List, Optional
 from core.models import EntryDTO, EntryResult, LedgerError, ErrorCode
+from core import audit, balances
+from db.database import Database
 from db.db_manager import DBManager
 
+_INSERT_ENTRY_SQL = """
+    INSERT INTO entries (
+        date, protocol, document, document_date, party, description,
+        created_by, reversal_of, client_reference_id,
+        taxable_amount, vat_rate, vat_amount
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_LINE_SQL = """
+    INSERT INTO entry_lines (entry_id, account_code, dare_cents, avere_cents)
+    VALUES (?, ?, ?, ?)
+"""
+
+_INSERT_AUDIT_SQL = """
+    INSERT INTO audit_log (entry_id, action, user_id, payload)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Riserva un blocco di numeri di protocollo in una sola istruzione e restituisce
+# l'ultimo numero del blocco. Il contatore è nella stessa transazione della
+# registrazione: un rollback lo riporta indietro e la numerazione resta senza buchi.
+_RESERVE_PROTOCOLS_SQL = """
+    INSERT INTO protocol_counters(year, counter) VALUES (?, ?)
+    ON CONFLICT(year) DO UPDATE SET counter = counter + excluded.counter
+    RETURNING counter
+"""
+_REFERENCE_SQL = "SELECT id, protocol FROM entries WHERE client_reference_id = ?"
+_REFERENCES_IN_SQL = """
+    SELECT id, protocol, client_reference_id
+    FROM entries WHERE client_reference_id IN ({marks})
+"""
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _error_result(message: str, detail: str) -> EntryResult:
+    return EntryResult(
+        success=False,
+        errors=[message],
+        error_details=[LedgerError(ErrorCode.DB_ERROR, detail)]
+    )
+
+
 class PostingEngine:
 
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+
+    @property
+    def db(self) -> Database:
+        """DB dell'azienda; senza db esplicito segue DBManager.configure()."""
+        return self._db or DBManager.current()
+
+    def _reserve_protocols(self, cur, year: str, count: int) -> List[str]:
+        """count numeri di protocollo consecutivi per l'anno, in ordine."""
+        cur.execute(_RESERVE_PROTOCOLS_SQL, (year, count))
+        last = cur.fetchone()[0]
+        return [f"{year}/{counter:06d}" for counter in range(last - count + 1, last + 1)]
+
     def _next_protocol_for_year(self, cur, year: str) -> str:
-        cur.execute("SELECT counter FROM protocol_counters WHERE year = ?", (year,))
-        row = cur.fetchone()
-        if row is None:
-            cur.execute("INSERT INTO protocol_counters(year, counter) VALUES (?, ?)", (year, 1))
-            counter = 1
-        else:
-            counter = int(row["counter"]) + 1
-            cur.execute("UPDATE protocol_counters SET counter = ? WHERE year = ?", (counter, year))
-        return f"{year}/{counter:06d}"
+        return self._reserve_protocols(cur, year, 1)[0]
+
+    def _entry_row(self, entry: EntryDTO, protocol: str, user_id: str) -> tuple:
+        return (
+            entry.date,
+            protocol,
+            entry.documento,
+            entry.document_date,
+            entry.cliente_fornitore,
+            entry.descrizione,
+            user_id,
+            entry.reversal_of,
+            entry.client_reference_id,
+            entry.taxable_amount,
+            entry.vat_rate,
+            entry.vat_amount
+        )
+
+    def _line_rows(self, entry: EntryDTO, entry_id: int) -> List[tuple]:
+        return [
+            # LineDTO porta già centesimi interi (Money): nessuna conversione qui
+            (entry_id, line.account_id, line.dare, line.avere)
+            for line in entry.lines
+        ]
+
+    def _dated(self, entry: EntryDTO, line_rows: List[tuple]) -> List[tuple]:
+        """(date, account_code, dare_cents, avere_cents) per i saldi mensili."""
+        return [(entry.date, account_code, dare, avere) for _, account_code, dare, avere in line_rows]
 
     def post(self, entry: EntryDTO, user_id: str) -> EntryResult:
+        result = self._post(entry, user_id)
+        if result.success:
+            self.db.notify_posted([result.entry_id])
+        return result
+
+    def _post(self, entry: EntryDTO, user_id: str) -> EntryResult:
+        # payload di audit serializzato prima di prendere il lock di scrittura
+        payload = audit.encode_payload(entry, user_id)
         try:
-            with DBManager.transaction() as cur:
+            with self.db.transaction() as cur:
 
                 # IDEMPOTENZA
                 if entry.client_reference_id:
-                    cur.execute(
-                        "SELECT id, protocol FROM entries WHERE client_reference_id = ?",
-                        (entry.client_reference_id,)
-                    )
+                    cur.execute(_REFERENCE_SQL, (entry.client_reference_id,))
                     existing = cur.fetchone()
                     if existing:
                         return EntryResult(
@@ -39,64 +121,161 @@ class PostingEngine:
                 year = entry.date[:4]
                 protocol_str = self._next_protocol_for_year(cur, year)
 
-                cur.execute("""
-                    INSERT INTO entries (
-                        date, protocol, document, document_date, party, description,
-                        created_by, reversal_of, client_reference_id,
-                        taxable_amount, vat_rate, vat_amount
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    entry.date,
-                    protocol_str,
-                    entry.documento,
-                    entry.document_date,
-                    entry.cliente_fornitore,
-                    entry.descrizione,
-                    user_id,
-                    entry.reversal_of,
-                    entry.client_reference_id,
-                    entry.taxable_amount,
-                    entry.vat_rate,
-                    entry.vat_amount
-                ))
-
+                cur.execute(_INSERT_ENTRY_SQL, self._entry_row(entry, protocol_str, user_id))
                 entry_id = cur.lastrowid
 
-                for line in entry.lines:
-                    cur.execute("""
-                        INSERT INTO entry_lines (entry_id, account_code, dare, avere)
-                        VALUES (?, ?, ?, ?)
-                    """, (
-                        entry_id,
-                        line.account_id,
-                        str(Decimal(str(line.dare)).quantize(Decimal("0.01"))),
-                        str(Decimal(str(line.avere)).quantize(Decimal("0.01")))
-                    ))
-
-                payload = json.dumps({
-                    "entry": entry.__dict__,
-                    "lines": [line.__dict__ for line in entry.lines],
-                    "user": user_id,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }, default=str)
-
-                cur.execute("""
-                    INSERT INTO audit_log (entry_id, action, user_id, payload)
-                    VALUES (?, ?, ?, ?)
-                """, (entry_id, "POST", user_id, payload))
+                line_rows = self._line_rows(entry, entry_id)
+                cur.executemany(_INSERT_LINE_SQL, line_rows)
+                balances.add_lines(cur, self._dated(entry, line_rows))
+                cur.execute(_INSERT_AUDIT_SQL, (entry_id, "POST", user_id, payload))
 
             return EntryResult(success=True, entry_id=entry_id, protocol=protocol_str)
 
         except sqlite3.IntegrityError as e:
-            return EntryResult(
-                success=False,
-                errors=[f"DB integrity error: {str(e)}"],
-                error_details=[LedgerError(ErrorCode.DB_ERROR, str(e))]
-            )
+            return _error_result(f"DB integrity error: {str(e)}", str(e))
+        except Exception as e:
+            return _error_result(str(e), str(e))
+
+    def post_many(self, entries: Iterable[EntryDTO], user_id: str,
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  atomic: bool = True) -> List[EntryResult]:
+        """
+        Registra molte scritture raggruppandole in una transazione per batch.
+
+        Restituisce un EntryResult per ogni entry, nello stesso ordine dell'input.
+        Con atomic=True ogni batch è tutto-o-niente: un errore annulla l'intero
+        batch e tutte le sue entry risultano fallite. Con atomic=False ogni entry
+        gira in un proprio SAVEPOINT, così solo quelle in errore vengono scartate.
+        L'idempotenza su client_reference_id è mantenuta per singola entry.
+        A fine chiamata i listener del DB ricevono una sola notifica con tutti
+        gli id registrati (Database.add_posting_listener).
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size deve essere >= 1")
+
+        entries = list(entries)
+        results: List[EntryResult] = []
+        for start in range(0, len(entries), batch_size):
+            batch = entries[start:start + batch_size]
+            if atomic:
+                results.extend(self._post_batch_atomic(batch, user_id))
+            else:
+                results.extend(self._post_batch_savepoints(batch, user_id))
+        posted = [r.entry_id for r in results if r.success]
+        if posted:
+            self.db.notify_posted(posted)
+        return results
+
+    def _existing_references(self, cur, batch: List[EntryDTO]) -> dict:
+        refs = list({e.client_reference_id for e in batch if e.client_reference_id})
+        if not refs:
+            return {}
+        cur.execute(_REFERENCES_IN_SQL.format(marks=",".join("?" * len(refs))), refs)
+        return {
+            r["client_reference_id"]: EntryResult(success=True, entry_id=r["id"], protocol=r["protocol"])
+            for r in cur.fetchall()
+        }
+
+    def _post_batch_atomic(self, batch: List[EntryDTO], user_id: str) -> List[EntryResult]:
+        payloads = {id(entry): audit.encode_payload(entry, user_id) for entry in batch}
+        try:
+            with self.db.transaction() as cur:
+                known = self._existing_references(cur, batch)
+
+                # Entry nuove: la prima occorrenza di un client_reference_id viene
+                # registrata, le successive nello stesso batch la riusano.
+                slots = []
+                to_insert = []
+                for entry in batch:
+                    ref = entry.client_reference_id
+                    if ref and ref in known:
+                        slots.append(known[ref])
+                        continue
+                    result = EntryResult(success=True)
+                    to_insert.append((entry, result))
+                    slots.append(result)
+                    if ref:
+                        known[ref] = result
+
+                # Un blocco di protocolli per anno, assegnato nell'ordine del batch
+                by_year = {}
+                for entry, result in to_insert:
+                    by_year.setdefault(entry.date[:4], []).append(result)
+                for year, results in by_year.items():
+                    for result, protocol in zip(results, self._reserve_protocols(cur, year, len(results))):
+                        result.protocol = protocol
+
+                if to_insert:
+                    cur.executemany(_INSERT_ENTRY_SQL, [
+                        self._entry_row(entry, result.protocol, user_id)
+                        for entry, result in to_insert
+                    ])
+                    # Sotto BEGIN IMMEDIATE siamo l'unico writer e entries è
+                    # AUTOINCREMENT: gli id assegnati sono contigui e terminano
+                    # con last_insert_rowid().
+                    cur.execute("SELECT last_insert_rowid()")
+                    first_id = cur.fetchone()[0] - len(to_insert) + 1
+                    for offset, (_, result) in enumerate(to_insert):
+                        result.entry_id = first_id + offset
+
+                    line_rows = [
+                        (entry, self._line_rows(entry, result.entry_id))
+                        for entry, result in to_insert
+                    ]
+                    cur.executemany(_INSERT_LINE_SQL, [row for _, rows in line_rows for row in rows])
+                    balances.add_lines(cur, [
+                        dated for entry, rows in line_rows for dated in self._dated(entry, rows)
+                    ])
+                    cur.executemany(_INSERT_AUDIT_SQL, [
+                        (result.entry_id, "POST", user_id, payloads[id(entry)])
+                        for entry, result in to_insert
+                    ])
+
+            # Copie distinte: entry duplicate non devono condividere lo stesso oggetto
+            return [EntryResult(success=True, entry_id=r.entry_id, protocol=r.protocol)
+                    for r in slots]
+
+        except sqlite3.IntegrityError as e:
+            return [_error_result(f"DB integrity error (batch annullato): {str(e)}", str(e))
+                    for _ in batch]
+        except Exception as e:
+            return [_error_result(f"Batch annullato: {str(e)}", str(e)) for _ in batch]
+
+    def _post_batch_savepoints(self, batch: List[EntryDTO], user_id: str) -> List[EntryResult]:
+        payloads = {id(entry): audit.encode_payload(entry, user_id) for entry in batch}
+        results: List[EntryResult] = []
+        try:
+            with self.db.transaction() as cur:
+                known = self._existing_references(cur, batch)
+                for entry in batch:
+                    ref = entry.client_reference_id
+                    if ref and ref in known:
+                        found = known[ref]
+                        results.append(EntryResult(success=True, entry_id=found.entry_id,
+                                                   protocol=found.protocol))
+                        continue
+
+                    cur.execute("SAVEPOINT post_entry")
+                    try:
+                        protocol = self._next_protocol_for_year(cur, entry.date[:4])
+                        cur.execute(_INSERT_ENTRY_SQL, self._entry_row(entry, protocol, user_id))
+                        entry_id = cur.lastrowid
+                        line_rows = self._line_rows(entry, entry_id)
+                        cur.executemany(_INSERT_LINE_SQL, line_rows)
+                        balances.add_lines(cur, self._dated(entry, line_rows))
+                        cur.execute(_INSERT_AUDIT_SQL, (entry_id, "POST", user_id, payloads[id(entry)]))
+                    except sqlite3.IntegrityError as e:
+                        cur.execute("ROLLBACK TO post_entry")
+                        cur.execute("RELEASE post_entry")
+                        results.append(_error_result(f"DB integrity error: {str(e)}", str(e)))
+                        continue
+                    cur.execute("RELEASE post_entry")
+
+                    result = EntryResult(success=True, entry_id=entry_id, protocol=protocol)
+                    if ref:
+                        known[ref] = result
+                    results.append(result)
+            return results
+
         except Exception as e:
-            return EntryResult(
-                success=False,
-                errors=[str(e)],
-                error_details=[LedgerError(ErrorCode.DB_ERROR, str(e))]
-            )
+            return [_error_result(f"Batch annullato: {str(e)}", str(e)) for _ in batch]
@@ -0,0 +1,154 @@
+# core/query_catalog.py
+"""
+Catalogo delle query di core/ con la forma attesa del piano (EXPLAIN QUERY PLAN).
+
+Per ogni query: testo SQL (lo stesso usato dal modulo), parametri di esempio,
+indici che il piano deve usare ed eccezioni ammesse. Senza eccezione, una
+scansione completa di tabella ("SCAN t") o un ordinamento temporaneo
+("USE TEMP B-TREE") è una regressione. Sono escluse le INSERT ... VALUES,
+che non hanno un piano di lettura.
+
+Uso da riga di comando:
+    python -m core.query_catalog [percorso_db]
+"""
+import sys
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from core import account_index, audit, balances, journal, ledger_service, period_index, period_service
+from core import posting_engine, validator
+from db.db_manager import DBManager
+
+# tabelle di configurazione: poche righe, la scansione costa meno di un indice
+# e con le statistiche (ANALYZE) il pianificatore la sceglie; nessun indice richiesto
+SMALL_TABLES = ("accounts", "periods", "period_locks", "cache_generations", "protocol_counters",
+                "archives")
+
+
+@dataclass(frozen=True)
+class CatalogQuery:
+    name: str
+    sql: str
+    params: tuple
+    indexes: Tuple[str, ...] = ()     # indici che devono comparire nel piano
+    allow: Tuple[str, ...] = ()       # frammenti di piano ammessi ("SCAN periods", "TEMP B-TREE FOR GROUP BY")
+    hot: bool = True                  # False: manutenzione, scansioni volute
+
+
+def _marks(n: int) -> str:
+    return ",".join("?" * n)
+
+
+def catalog() -> List[CatalogQuery]:
+    ids = (1, 2, 3)
+    ledger_balance, ledger_balance_params = balances.account_balance_sql("1431", "2020-01-15", "2020-12-20")
+    totals, totals_params = balances.totals_sql("2020-01-15", "2020-12-20")
+    return [
+        # --- PostingEngine
+        CatalogQuery("posting.reference", posting_engine._REFERENCE_SQL, ("imp-2",),
+                     indexes=("sqlite_autoindex_entries_1",)),
+        CatalogQuery("posting.references_in",
+                     posting_engine._REFERENCES_IN_SQL.format(marks=_marks(3)), ("imp-2", "imp-4", "x"),
+                     indexes=("sqlite_autoindex_entries_1",)),
+
+        # --- validator / storni
+        CatalogQuery("validator.reversal", validator._REVERSAL_SQL, (99,),
+                     indexes=("idx_entries_reversal_of",)),
+        CatalogQuery("validator.reversed_in", validator._REVERSED_IN_SQL.format(marks=_marks(3)), ids,
+                     indexes=("idx_entries_reversal_of",)),
+        CatalogQuery("ledger.reversal", ledger_service._REVERSAL_SQL, (99,),
+                     indexes=("idx_entries_reversal_of",)),
+        CatalogQuery("ledger.entry", ledger_service._ENTRY_SQL, (1,)),
+        CatalogQuery("ledger.lines", ledger_service._LINES_SQL, (1,),
+                     indexes=("idx_entry_lines_entry",)),
+        CatalogQuery("ledger.entries_in", ledger_service._ENTRIES_IN_SQL.format(marks=_marks(3)), ids),
+        CatalogQuery("ledger.entries_by_prefix", ledger_service._ENTRIES_BY_PREFIX_SQL,
+                     ("imp-1", "imp-1\U0010ffff"), indexes=("sqlite_autoindex_entries_1",)),
+        CatalogQuery("ledger.entries_by_date", ledger_service._ENTRIES_BY_DATE_SQL,
+                     ("2020-01-01", "2020-01-31"), indexes=("idx_entries_date",)),
+        CatalogQuery("ledger.lines_in", ledger_service._LINES_IN_SQL.format(marks=_marks(3)), ids,
+                     indexes=("idx_entry_lines_entry",)),
+
+        # --- mastrino e saldi
+        CatalogQuery("ledger.page", ledger_service._LEDGER_PAGE_SQL,
+                     ("1431", "2020-03-01", "2020-12-31", "2020-03-01", 0, 0, 1000),
+                     indexes=("idx_entries_date", "idx_entry_lines_account_date")),
+        CatalogQuery("journal.page", journal._JOURNAL_PAGE_SQL,
+                     ("0001-01-01", "9999-12-31", "2020-03-01", 0, 0, 500),
+                     indexes=("idx_entries_date", "idx_entry_lines_entry", "idx_entries_reversal_of")),
+        CatalogQuery("journal.since", journal._SINCE_SQL, (10,),
+                     indexes=("idx_entry_lines_entry", "idx_entries_reversal_of")),
+        CatalogQuery("journal.last_id", journal._LAST_ID_SQL, ()),
+        CatalogQuery("balances.account", ledger_balance, tuple(ledger_balance_params),
+                     indexes=("idx_entries_date",)),
+        CatalogQuery("balances.totals", totals, tuple(totals_params),
+                     indexes=("idx_account_period_balances_period", "idx_entries_date"),
+                     allow=("TEMP B-TREE FOR GROUP BY",)),
+        CatalogQuery("balances.clear", balances._CLEAR_SQL, (), allow=("SCAN",), hot=False),
+        CatalogQuery("balances.rebuild", balances._REBUILD_SQL, (),
+                     allow=("SCAN", "TEMP B-TREE"), hot=False),
+
+        # --- audit
+        CatalogQuery("audit.read", audit._READ_SQL, (1,), indexes=("idx_audit_log_entry",)),
+        CatalogQuery("audit.page", audit._PAGE_SQL, (0, 1000)),
+
+        # --- indici in memoria
+        CatalogQuery("accounts.generation", account_index._GENERATION_SQL, ()),
+        CatalogQuery("accounts.load", account_index._ACCOUNTS_SQL, (), allow=("SCAN accounts",)),
+        CatalogQuery("periods.closed", period_index._CLOSED_PERIODS_SQL, (), allow=("SCAN periods",)),
+        CatalogQuery("periods.generation", period_index._GENERATION_SQL, ()),
+
+        # --- PeriodService
+        CatalogQuery("periods.set_month_status", period_service._SET_MONTH_STATUS_SQL, ("closed", 2020, 1)),
+        CatalogQuery("periods.delete_month_lock", period_service._DELETE_MONTH_LOCK_SQL, (2020, 1)),
+        CatalogQuery("periods.reopen_log", period_service._REOPEN_LOG_SQL, (2020, 1)),
+        CatalogQuery("periods.closed_months", period_service._CLOSED_MONTHS_SQL, (2020,)),
+        CatalogQuery("periods.annual", period_service._ANNUAL_PERIOD_SQL, (2020,)),
+        CatalogQuery("periods.close", period_service._CLOSE_PERIOD_SQL, (1,)),
+    ]
+
+
+def explain(conn, sql: str, params: tuple = ()) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def _is_allowed(line: str, allow: Tuple[str, ...]) -> bool:
+    return any(fragment in line for fragment in allow)
+
+
+def check(conn, query: CatalogQuery) -> List[str]:
+    """Problemi del piano di query (lista vuota se conforme al catalogo)."""
+    plan = explain(conn, query.sql, query.params)
+    allow = query.allow + tuple(f"SCAN {t}" for t in SMALL_TABLES)
+    problems = []
+    for line in plan:
+        scan = line.startswith("SCAN ") and not line.startswith(("SCAN (subquery", "SCAN CONSTANT ROW"))
+        if (scan or "TEMP B-TREE" in line) and not _is_allowed(line, allow):
+            problems.append(f"{query.name}: {line}")
+    text = "\n".join(plan)
+    for index in query.indexes:
+        if index not in text:
+            problems.append(f"{query.name}: indice {index} non usato")
+    return problems
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        DBManager.configure(argv[0])
+    failures = 0
+    with DBManager.reader() as conn:
+        for query in catalog():
+            problems = check(conn, query)
+            failures += bool(problems and query.hot)
+            print(f"{'OK ' if not problems else 'KO ' if query.hot else '-- '} {query.name}")
+            for line in explain(conn, query.sql, query.params):
+                print(f"      {line}")
+            for problem in problems:
+                print(f"    ! {problem}")
+    DBManager.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# core/report_cache.py
+"""
+Cache LRU dei report già calcolati (mastrini, aggregati di bilancio).
+
+Ogni valore è salvato con la versione del libro giornale in cui è stato
+calcolato (ledger_version(): l'id più alto in entries, che cresce a ogni
+registrazione o storno). get() con una versione diversa lo scarta: dopo
+una registrazione il report si ricalcola, senza invalidazioni esplicite.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Hashable, Optional, Tuple
+
+from core.journal import last_entry_id
+from db.database import Database
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+def ledger_version(db: Optional[Database] = None) -> int:
+    """Versione del contenuto del libro giornale (entries non si aggiornano né si cancellano)."""
+    return last_entry_id(db)
+
+
+@dataclass
+class CacheStats:
+    max_entries: int = 0
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0          # trovati ma di una versione precedente
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ReportCache:
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries deve essere >= 1")
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_entries=max_entries)
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._stats.misses += 1
+                return None
+            if item[0] != version:
+                del self._items[key]
+                self._stats.stale += 1
+                self._stats.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._stats.hits += 1
+            return item[1]
+
+    def put(self, key: Hashable, version: int, value: Any):
+        with self._lock:
+            self._items[key] = (version, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self._stats.evictions += 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**self._stats.as_dict(), "size": len(self._items)})
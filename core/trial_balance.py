@@ -0,0 +1,136 @@
+# core/trial_balance.py
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from core import balances
+from core.account_index import get_account_index
+from core.money import Money
+from db.database import Database
+from db.db_manager import DBManager
+
+CLASS_LABELS = {
+    "A": "Attività",
+    "P": "Passività",
+    "C": "Costi",
+    "R": "Ricavi",
+}
+
+
+@dataclass
+class TrialBalanceRow:
+    code: str
+    name: str
+    account_class: Optional[str]
+    parent_code: Optional[str]
+    depth: int
+    dare: int = 0       # centesimi
+    avere: int = 0
+
+    @property
+    def saldo(self) -> Money:
+        return Money(self.dare - self.avere)
+
+
+@dataclass
+class ClassTotal:
+    account_class: str
+    dare: int = 0
+    avere: int = 0
+
+    @property
+    def saldo(self) -> Money:
+        return Money(self.dare - self.avere)
+
+
+@dataclass
+class TrialBalance:
+    from_date: str
+    to_date: str
+    rows: List[TrialBalanceRow] = field(default_factory=list)
+    class_totals: Dict[str, ClassTotal] = field(default_factory=dict)
+    total_dare: int = 0
+    total_avere: int = 0
+
+    @property
+    def is_balanced(self) -> bool:
+        return self.total_dare == self.total_avere
+
+
+class TrialBalanceService:
+    """
+    Bilancio di verifica: una query raggruppata per conto, poi un solo
+    passaggio in memoria che somma i totali lungo parent_code, dai conti più
+    profondi verso le radici.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+
+    @property
+    def db(self) -> Database:
+        return self._db or DBManager.current()
+
+    def compute(self, from_date: str, to_date: str, include_empty: bool = False) -> TrialBalance:
+        with self.db.reader() as conn:
+            totals = balances.totals_by_account(conn.cursor(), from_date, to_date)
+        index = get_account_index(self.db)
+        accounts = index.accounts()
+
+        # Visita in preordine dalle radici: dà la profondità di ogni conto e un
+        # ordine in cui ogni padre precede i propri figli.
+        order: List[TrialBalanceRow] = []
+        stack = [(code, 0) for code in reversed(index.children(None))]
+        while stack:
+            code, depth = stack.pop()
+            a = accounts[code]
+            order.append(TrialBalanceRow(code, a.name, a.account_class, a.parent_code, depth))
+            stack.extend((child, depth + 1) for child in reversed(index.children(code)))
+        nodes = {row.code: row for row in order}
+
+        tb = TrialBalance(from_date, to_date)
+        for code, (dare, avere) in totals.items():
+            node = nodes.get(code)
+            if node is None:
+                continue
+            node.dare += dare
+            node.avere += avere
+            tb.total_dare += dare
+            tb.total_avere += avere
+            cls = tb.class_totals.setdefault(node.account_class, ClassTotal(node.account_class))
+            cls.dare += dare
+            cls.avere += avere
+
+        # Rollup in un solo passaggio: il preordine inverso porta i figli prima dei padri
+        for node in reversed(order):
+            if node.parent_code in nodes:
+                parent = nodes[node.parent_code]
+                parent.dare += node.dare
+                parent.avere += node.avere
+
+        tb.rows = order if include_empty else [n for n in order if n.dare or n.avere]
+        return tb
+
+
+def format_trial_balance(tb: TrialBalance) -> str:
+    """Rappresentazione testuale per terminale DSL e tab Bilancio."""
+    lines = [f"📈 Bilancio di verifica {tb.from_date} → {tb.to_date}", ""]
+    if not tb.rows:
+        lines.append("Nessun movimento nel periodo.")
+        return "\n".join(lines)
+
+    def amounts(dare: int, avere: int) -> str:
+        return f"{Money(dare):>14,.2f}{Money(avere):>14,.2f}{Money(dare - avere):>14,.2f}"
+
+    lines.append(f"{'Conto':<44}{'Dare':>14}{'Avere':>14}{'Saldo':>14}")
+    for row in tb.rows:
+        label = f"{'  ' * row.depth}{row.code} {row.name}"
+        lines.append(f"{label[:44]:<44}{amounts(row.dare, row.avere)}")
+
+    lines.append("")
+    for cls in ("A", "P", "C", "R"):
+        total = tb.class_totals.get(cls)
+        if total:
+            lines.append(f"{'Totale ' + CLASS_LABELS[cls]:<44}{amounts(total.dare, total.avere)}")
+    lines.append(f"{'Totale generale':<44}{amounts(tb.total_dare, tb.total_avere)}")
+    if not tb.is_balanced:
+        lines.append("⚠️ Dare e Avere non coincidono")
+    return "\n".join(lines)
@@ -1,26 +1,23 @@
-from typing import List
-from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional, Set
 import re
 from core.models import EntryDTO, LedgerError, ErrorCode
+from core.money import Money
+from core.account_index import get_account_index
+from core.period_index import get_period_index
+from db.database import Database
 from db.db_manager import DBManager
 
-def _to_decimal(value: float) -> Decimal:
-    return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-
-def _accounts_in_db() -> set:
-    conn = DBManager.connect()
-    cur = conn.cursor()
-    cur.execute("SELECT code FROM accounts")
-    rows = cur.fetchall()
-    cur.close()
-    return {r["code"] for r in rows}
+# Query usate qui; i piani attesi sono in core.query_catalog
+_REVERSAL_SQL = "SELECT id FROM entries WHERE reversal_of = ?"
+_REVERSED_IN_SQL = "SELECT reversal_of FROM entries WHERE reversal_of IN ({marks})"
 
 def validate_balanced(entry: EntryDTO) -> List[LedgerError]:
-    total_dare = sum(_to_decimal(line.dare or 0.0) for line in entry.lines)
-    total_avere = sum(_to_decimal(line.avere or 0.0) for line in entry.lines)
+    # Importi in centesimi: somme intere esatte, nessun Decimal per riga
+    total_dare = sum(line.dare for line in entry.lines)
+    total_avere = sum(line.avere for line in entry.lines)
     if total_dare != total_avere:
         return [LedgerError(ErrorCode.UNBALANCED,
-                            f"Entry non bilanciata: Dare={total_dare}, Avere={total_avere}")]
+                            f"Entry non bilanciata: Dare={Money(total_dare)}, Avere={Money(total_avere)}")]
     return []
 
 def validate_no_negative(entry: EntryDTO) -> List[LedgerError]:
@@ -37,64 +34,91 @@ def validate_no_negative(entry: EntryDTO) -> List[LedgerError]:
                                       f"Riga nulla su account {line.account_id}: dare e avere = 0"))
     return errors
 
-def validate_accounts_exist(entry: EntryDTO) -> List[LedgerError]:
-    valid = _accounts_in_db()
+def validate_accounts_exist(entry: EntryDTO, db: Optional[Database] = None) -> List[LedgerError]:
+    valid = get_account_index(db).accounts()
     return [LedgerError(ErrorCode.INVALID_ACCOUNT,
                         f"Account {line.account_id} non esiste")
             for line in entry.lines if line.account_id not in valid]
 
 def validate_balanced_entry(entry: EntryDTO):
-    total_dare = sum(line.dare or 0 for line in entry.lines)
-    total_avere = sum(line.avere or 0 for line in entry.lines)
-    if round(total_dare, 2) != round(total_avere, 2):
+    total_dare = sum(line.dare for line in entry.lines)
+    total_avere = sum(line.avere for line in entry.lines)
+    if total_dare != total_avere:
         return [LedgerError(code=ErrorCode.UNBALANCED, message="La scrittura non è bilanciata")]
     return []
 
 
-def validate_not_already_reversed(entry: EntryDTO) -> List[LedgerError]:
+def validate_not_already_reversed(entry: EntryDTO, db: Optional[Database] = None) -> List[LedgerError]:
     if entry.reversal_of:
-        conn = DBManager.connect()
+        conn = (db or DBManager.current()).connect()
         cur = conn.cursor()
-        cur.execute("SELECT id FROM entries WHERE reversal_of = ?", (entry.reversal_of,))
+        cur.execute(_REVERSAL_SQL, (entry.reversal_of,))
         if cur.fetchone():
             return [LedgerError(ErrorCode.ALREADY_REVERSED,
                                 f"L'entry {entry.reversal_of} è già stata stornata")]
     return []
 
 
-def validate_period_open(entry: EntryDTO) -> List[LedgerError]:
-    if not isinstance(entry.date, str) or not re.match(r"^\d{4}-\d{2}-\d{2}$", entry.date):
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def validate_period_open(entry: EntryDTO, db: Optional[Database] = None) -> List[LedgerError]:
+    if not isinstance(entry.date, str) or not _ISO_DATE.match(entry.date):
         return [LedgerError(ErrorCode.PERIOD_CLOSED, f"Data non valida: {entry.date}")]
 
-    conn = DBManager.connect()
-    cur = conn.cursor()
-
-    # Cerca qualsiasi periodo chiuso che copre la data
-    cur.execute("""
-        SELECT year, month, status
-        FROM periods
-        WHERE status='closed'
-          AND date(?) BETWEEN start_date AND end_date
-        LIMIT 1
-    """, (entry.date,))
-    row = cur.fetchone()
-
-    if row:
-        if row["month"] is None:
-            return [LedgerError(ErrorCode.PERIOD_CLOSED, f"L'anno {row['year']} è chiuso")]
+    # Cerca qualsiasi periodo chiuso che copre la data (indice in memoria)
+    closed = get_period_index(db).find_closed(entry.date)
+
+    if closed:
+        year, month = closed
+        if month is None:
+            return [LedgerError(ErrorCode.PERIOD_CLOSED, f"L'anno {year} è chiuso")]
         else:
             return [LedgerError(ErrorCode.PERIOD_CLOSED,
-                                f"Il periodo {row['year']}-{row['month']:02d} è chiuso")]
+                                f"Il periodo {year}-{month:02d} è chiuso")]
 
     return []
 
 
-def validate(entry: EntryDTO) -> List[LedgerError]:
+def validate(entry: EntryDTO, db: Optional[Database] = None) -> List[LedgerError]:
+    """Tutti i controlli su entry; db: il DB dell'azienda (default: quello di DBManager)."""
     errors: List[LedgerError] = []
     errors += validate_balanced(entry)
     errors += validate_no_negative(entry)
-    errors += validate_accounts_exist(entry)
-    errors += validate_period_open(entry)
+    errors += validate_accounts_exist(entry, db)
+    errors += validate_period_open(entry, db)
     errors += validate_balanced_entry(entry)
-    errors += validate_not_already_reversed(entry)
+    errors += validate_not_already_reversed(entry, db)
     return errors
+
+
+def _already_reversed(original_ids: List[int], db: Optional[Database] = None) -> Set[int]:
+    """Id fra original_ids che hanno già uno storno (una query ogni 500 id)."""
+    found: Set[int] = set()
+    cur = (db or DBManager.current()).connect().cursor()
+    for start in range(0, len(original_ids), 500):
+        chunk = original_ids[start:start + 500]
+        cur.execute(_REVERSED_IN_SQL.format(marks=",".join("?" * len(chunk))), chunk)
+        found.update(r[0] for r in cur.fetchall())
+    return found
+
+
+def validate_many(entries: List[EntryDTO], db: Optional[Database] = None) -> List[List[LedgerError]]:
+    """
+    Come validate() per ogni entry, nello stesso ordine. I controlli sono in
+    memoria (indici di conti e periodi); lo storno già esistente è verificato
+    con query per insiemi invece che una per entry.
+    """
+    reversed_ids = _already_reversed(list({e.reversal_of for e in entries if e.reversal_of}), db)
+    results: List[List[LedgerError]] = []
+    for entry in entries:
+        errors: List[LedgerError] = []
+        errors += validate_balanced(entry)
+        errors += validate_no_negative(entry)
+        errors += validate_accounts_exist(entry, db)
+        errors += validate_period_open(entry, db)
+        errors += validate_balanced_entry(entry)
+        if entry.reversal_of in reversed_ids:
+            errors.append(LedgerError(ErrorCode.ALREADY_REVERSED,
+                                      f"L'entry {entry.reversal_of} è già stata stornata"))
+        results.append(errors)
+    return results
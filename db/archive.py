@@ -0,0 +1,213 @@
+# db/archive.py
+"""
+Archivio degli esercizi chiusi: un file SQLite di sola lettura per anno.
+
+archive_year() sposta entries, entry_lines e audit_log di un anno chiuso
+(PeriodService.close_year) in <nome>.<anno>.db accanto al file principale e
+lo registra nella tabella archives. I saldi mensili (account_period_balances)
+restano nel file principale: saldi e bilanci sui mesi interi non leggono gli
+archivi.
+
+Le connessioni di sola lettura del pool fanno ATTACH degli archivi come
+archive_<anno> con immutable=1 (nessun lock né controllo di modifiche) e mmap.
+Le letture che attraversano più anni dividono l'intervallo con segments() e
+usano qualify() per indirizzare ogni tratto al proprio file. Il writer non
+vede gli archivi: un anno archiviato è chiuso e non si registra né si storna.
+
+Il file dell'archivio è scritto come <file>.tmp e rinominato solo a copia
+completata; le righe escono dal file principale nella stessa transazione che
+registra l'archivio. Un'interruzione a metà lascia tutto nel file principale
+e l'operazione si può ripetere.
+"""
+import os
+import pathlib
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Collection, List, Optional, Tuple
+
+ARCHIVED_TABLES = ("entries", "entry_lines", "audit_log")
+ARCHIVE_MMAP_SIZE = 256 * 1024 * 1024
+_SCHEMA_PREFIX = "archive_"
+
+_ARCHIVES_SQL = "SELECT year, file FROM archives ORDER BY year"
+_REGISTERED_SQL = "SELECT 1 FROM archives WHERE year = ?"
+_YEAR_CLOSED_SQL = "SELECT 1 FROM periods WHERE year = ? AND month IS NULL AND status = 'closed'"
+_REGISTER_SQL = "INSERT INTO archives(year, file, entries, lines) VALUES (?, ?, ?, ?)"
+# riferimenti dal resto del file alle entry dell'anno: dopo lo spostamento
+# resterebbero appesi (o verrebbero cancellati in cascata)
+_EXTERNAL_REFS_SQL = """
+    SELECT (SELECT COUNT(*) FROM entries
+            WHERE reversal_of IN (SELECT id FROM entries WHERE date BETWEEN :start AND :end)
+              AND date NOT BETWEEN :start AND :end)
+         + (SELECT COUNT(*) FROM closing_entries
+            WHERE entry_id IN (SELECT id FROM entries WHERE date BETWEEN :start AND :end))
+"""
+_DDL_SQL = """
+    SELECT type, name, sql FROM main.sqlite_master
+    WHERE tbl_name IN ('entries', 'entry_lines', 'audit_log')
+      AND type IN ('table', 'index') AND sql IS NOT NULL
+    ORDER BY type = 'index', name
+"""
+_COPY_SQL = {
+    "entries": "WHERE date BETWEEN ? AND ?",
+    "entry_lines": "WHERE entry_id IN (SELECT id FROM main.entries WHERE date BETWEEN ? AND ?)",
+    "audit_log": "WHERE entry_id IN (SELECT id FROM main.entries WHERE date BETWEEN ? AND ?)",
+}
+_DELETE_SQL = (
+    "DELETE FROM audit_log WHERE entry_id IN (SELECT id FROM entries WHERE date BETWEEN ? AND ?)",
+    "DELETE FROM entry_lines WHERE entry_id IN (SELECT id FROM entries WHERE date BETWEEN ? AND ?)",
+    "DELETE FROM entries WHERE date BETWEEN ? AND ?",
+)
+_CREATE = re.compile(r'^CREATE (TABLE|INDEX) "?(\w+)"?', re.IGNORECASE)
+_TABLE_REF = re.compile(r'\b(FROM|JOIN)\s+(entries|entry_lines|audit_log)\b', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ArchiveResult:
+    year: int
+    path: str
+    entries: int
+    lines: int
+    audit_rows: int
+
+
+def schema_name(year: int) -> str:
+    return f"{_SCHEMA_PREFIX}{int(year)}"
+
+
+def archive_path(db_path: str, year: int) -> str:
+    """contaIDE.db -> contaIDE.2019.db, nella stessa cartella."""
+    path = pathlib.Path(db_path)
+    return str(path.with_name(f"{path.stem}.{int(year)}{path.suffix or '.db'}"))
+
+
+# --- Lettura -----------------------------------------------------------------
+
+def attach_archives(conn: sqlite3.Connection, db_path: str,
+                    mmap_size: int = ARCHIVE_MMAP_SIZE) -> List[int]:
+    """
+    ATTACH in sola lettura (immutable=1) degli archivi registrati.
+    La connessione deve essere aperta con uri=True. Restituisce gli anni.
+    """
+    try:
+        registered = conn.execute(_ARCHIVES_SQL).fetchall()
+    except sqlite3.OperationalError:     # file precedente alla migrazione 005
+        return []
+    base = pathlib.Path(db_path).resolve().parent
+    for year, file in registered:
+        path = base / file
+        if not path.exists():
+            raise FileNotFoundError(f"Archivio dell'esercizio {year} mancante: {path}")
+        name = schema_name(year)
+        conn.execute(f"ATTACH DATABASE ? AS {name}", (path.as_uri() + "?mode=ro&immutable=1",))
+        conn.execute(f"PRAGMA {name}.mmap_size = {int(mmap_size)}")
+    return [year for year, _ in registered]
+
+
+def archived_years(conn: sqlite3.Connection) -> List[int]:
+    """Anni degli archivi collegati alla connessione."""
+    return sorted(int(row[1][len(_SCHEMA_PREFIX):]) for row in conn.execute("PRAGMA database_list")
+                  if row[1].startswith(_SCHEMA_PREFIX))
+
+
+def segments(from_date: str, to_date: str,
+             archived: Collection[int] = ()) -> List[Tuple[str, str, str]]:
+    """
+    Divide [from_date, to_date] in tratti (schema, da, a) in ordine di data:
+    un tratto per ogni anno archiviato, "main" per il resto (tratti contigui uniti).
+    """
+    if from_date > to_date:
+        return []
+    result, cursor = [], from_date
+    # solo gli anni archiviati nell'intervallo: un intervallo aperto
+    # ("0001-01-01".."9999-12-31") non costa un giro per ogni anno
+    for year in sorted(y for y in archived if from_date[:4] <= f"{y:04d}" <= to_date[:4]):
+        start = max(from_date, f"{year:04d}-01-01")
+        if cursor < start:
+            result.append(("main", cursor, f"{year - 1:04d}-12-31"))
+        result.append((schema_name(year), start, min(to_date, f"{year:04d}-12-31")))
+        cursor = f"{year + 1:04d}-01-01"
+    if cursor <= to_date:
+        result.append(("main", cursor, to_date))
+    return result
+
+
+def qualify(sql: str, schema: str) -> str:
+    """Indirizza a `schema` le tabelle archiviate lette dalla query (FROM/JOIN)."""
+    if schema == "main":
+        return sql
+    return _TABLE_REF.sub(lambda m: f"{m.group(1)} {schema}.{m.group(2)}", sql)
+
+
+# --- Archiviazione -------------------------------------------------------------
+
+def archive_year(conn: sqlite3.Connection, db_path: str, year: int,
+                 progress: Optional[Callable[[str], None]] = None) -> ArchiveResult:
+    """
+    Sposta l'esercizio `year` in archive_path(db_path, year). Usa il writer
+    (fuori da transazioni) e va chiamata sotto il suo lock: vedi
+    DBManager.archive_year. ValueError se l'anno non è archiviabile.
+    """
+    year = int(year)
+    start, end = f"{year:04d}-01-01", f"{year:04d}-12-31"
+    if conn.execute(_REGISTERED_SQL, (year,)).fetchone():
+        raise ValueError(f"L'esercizio {year} è già archiviato")
+    if not conn.execute(_YEAR_CLOSED_SQL, (year,)).fetchone():
+        raise ValueError(f"L'esercizio {year} non è chiuso")
+    if conn.execute(_EXTERNAL_REFS_SQL, {"start": start, "end": end}).fetchone()[0]:
+        raise ValueError(f"Altre registrazioni fanno riferimento a entry dell'esercizio {year}")
+
+    path = archive_path(db_path, year)
+    tmp = path + ".tmp"
+    for leftover in (tmp, path):      # resti di un tentativo interrotto, non registrato
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    if progress:
+        progress("copy")
+    counts = _copy_year(conn, tmp, start, end)
+    os.replace(tmp, path)
+
+    if progress:
+        progress("delete")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in _DELETE_SQL:
+            conn.execute(statement, (start, end))
+        conn.execute(_REGISTER_SQL, (year, os.path.basename(path), counts["entries"], counts["entry_lines"]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return ArchiveResult(year, path, counts["entries"], counts["entry_lines"], counts["audit_log"])
+
+
+def _copy_year(conn: sqlite3.Connection, target: str, start: str, end: str) -> dict:
+    """Crea `target` con le tabelle archiviate (stesse definizioni del file principale) e copia l'anno."""
+    ddl = conn.execute(_DDL_SQL).fetchall()
+    conn.execute("ATTACH DATABASE ? AS archive_new", (target,))
+    try:
+        # le chiavi esterne verso accounts non hanno senso nell'archivio
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("PRAGMA archive_new.journal_mode = DELETE")
+        counts = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for _, _, sql in ddl:
+                conn.execute(_CREATE.sub(lambda m: f"CREATE {m.group(1)} archive_new.{m.group(2)}", sql, 1))
+            for table in ARCHIVED_TABLES:
+                columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_xinfo({table})")
+                                    if row[6] == 0)     # esclude le colonne calcolate
+                counts[table] = conn.execute(
+                    f"INSERT INTO archive_new.{table} ({columns}) "
+                    f"SELECT {columns} FROM main.{table} {_COPY_SQL[table]}", (start, end)).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        conn.execute("ANALYZE archive_new")
+    finally:
+        conn.execute("DETACH DATABASE archive_new")
+        conn.execute("PRAGMA foreign_keys = ON")
+    return counts
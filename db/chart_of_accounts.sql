@@ -1,7 +1,7 @@
 -- Piano dei Conti standard italiano (bootstrap)
 -- Struttura: codice, nome, classe, parent_code
 
-INSERT INTO accounts (code, name, class, parent_code) VALUES
+INSERT OR IGNORE INTO accounts (code, name, class, parent_code) VALUES
 -- Attività (A)
 ('1000', 'ATTIVO', 'A', NULL),
 ('1100', 'Immobilizzazioni immateriali', 'A', '1000'),
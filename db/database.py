@@ -0,0 +1,398 @@
+# db/database.py
+"""
+Un DB aziendale aperto: pool di connessioni, profilo, migrazioni e cache.
+
+Database è l'istanza per un singolo file; DBManager resta la facciata a
+livello di classe sul DB di default (quello di configure()). Per gestire più
+aziende nello stesso processo si passano istanze ai servizi
+(LedgerService(db), PostingEngine(db), PeriodService(db), validator.validate(e, db))
+e si aprono con un DatabaseRegistry, che tiene aperti, con le loro cache
+calde, solo gli ultimi max_open file usati.
+"""
+import logging
+import pathlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import Any, Callable, List, Optional
+
+from db import archive, migrator
+from db.migrator import ProgressCallback
+from db.pool import ConnectionPool, PoolStats
+from db.report_session import ReportSession, current_session
+from db.profiles import SqliteProfile, apply_profile, get_profile, read_settings
+
+DEFAULT_MAX_READERS = 4
+DEFAULT_MAX_OPEN = 32
+
+_log = logging.getLogger(__name__)
+
+
+class Database:
+
+    def __init__(self, path: str, max_readers: int = DEFAULT_MAX_READERS, profile="default"):
+        """
+        profile: nome in db.profiles.PROFILES ("default", "safe", "bulk-load",
+        "legacy") oppure uno SqliteProfile. Il pool si apre al primo uso.
+        """
+        self.path = path
+        self.key = str(pathlib.Path(path).resolve())
+        self.max_readers = max_readers
+        self._profile: SqliteProfile = get_profile(profile)
+        self._pool: Optional[ConnectionPool] = None
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._caches: dict = {}
+        self._posting_listeners: List[Callable[[List[int]], None]] = []
+
+    def __repr__(self):
+        return f"Database({self.path!r})"
+
+    # --- Connessioni -------------------------------------------------------
+
+    def pool(self) -> ConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ConnectionPool(self.path, max_readers=self.max_readers,
+                                            setup=self._setup_connection)
+            return self._pool
+
+    @property
+    def is_open(self) -> bool:
+        return self._pool is not None
+
+    def _setup_connection(self, conn: sqlite3.Connection, read_only: bool):
+        apply_profile(conn, self._profile, read_only=read_only)
+        if read_only:
+            archive.attach_archives(conn, self.path)
+
+    def connect(self) -> sqlite3.Connection:
+        """Connessione writer condivisa (compatibilità: chi scrive passi da transaction())."""
+        return self.pool().writer
+
+    @contextmanager
+    def transaction(self):
+        """
+        Usage:
+            with db.transaction() as cur:
+                cur.execute(...)
+        This will BEGIN, and COMMIT on success or ROLLBACK on exception.
+        Le transazioni dei vari thread sono serializzate sul writer.
+        """
+        with self.pool().write_lock() as conn:
+            cur = conn.cursor()
+            try:
+                # BEGIN IMMEDIATE to obtain RESERVED lock (avoid SQLITE_BUSY race)
+                cur.execute("BEGIN IMMEDIATE;")
+                yield cur
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    @contextmanager
+    def reader(self):
+        """
+        Connessione di sola lettura dal pool, da usare per report e interrogazioni:
+            with db.reader() as conn:
+                conn.execute(...)
+        Vede solo dati già committati; non blocca le transazioni di scrittura.
+        Dentro una sessione di report su questo file restituisce la connessione della sessione.
+        """
+        session = current_session()
+        if session is not None and session.path == self.key:
+            with session.connection() as conn:
+                yield conn
+            return
+        with self.pool().reader() as conn:
+            yield conn
+
+    def report_session(self) -> ReportSession:
+        """
+        Fotografia coerente del DB per report lunghi:
+            with db.report_session() as session:
+                tb = TrialBalanceService(db).compute(...)
+                # in un thread di lavoro:
+                with session.bind():
+                    rows = LedgerService(db).get_account_ledger(...)
+        Vedi db.report_session.ReportSession.
+        """
+        self.pool()   # il writer crea il file (e il WAL) prima dell'apertura in sola lettura
+        return ReportSession(self.path, setup=self._setup_connection)
+
+    def pool_stats(self) -> PoolStats:
+        return self.pool().stats()
+
+    def close(self):
+        """Chiude le connessioni; le cache restano e il pool si riapre al primo uso."""
+        with self._lock:
+            if self._pool:
+                self._pool.close()
+                self._pool = None
+
+    # --- Cache -------------------------------------------------------------
+
+    def cache(self, name: str, factory: Callable[["Database"], Any]) -> Any:
+        """Oggetto per-DB creato una sola volta con factory(self), es. gli indici in memoria."""
+        with self._lock:
+            obj = self._caches.get(name)
+            if obj is None:
+                obj = self._caches[name] = factory(self)
+            return obj
+
+    # --- Notifiche di registrazione ----------------------------------------
+
+    def add_posting_listener(self, listener: Callable[[List[int]], None]):
+        """
+        listener(entry_ids) dopo ogni commit di PostingEngine (storni compresi),
+        nel thread che ha registrato: chi aggiorna una GUI rimanda al proprio thread.
+        Gli id possono includere entry già presenti ripresentate con lo stesso
+        client_reference_id.
+        """
+        with self._lock:
+            self._posting_listeners.append(listener)
+
+    def remove_posting_listener(self, listener: Callable[[List[int]], None]):
+        with self._lock:
+            if listener in self._posting_listeners:
+                self._posting_listeners.remove(listener)
+
+    def notify_posted(self, entry_ids: List[int]):
+        """Avvisa i listener; la registrazione è già committata e un listener in errore non la tocca."""
+        with self._lock:
+            listeners = list(self._posting_listeners)
+        for listener in listeners:
+            try:
+                listener(entry_ids)
+            except Exception:
+                _log.exception("Listener di registrazione in errore: %r", listener)
+
+    # --- Profili -----------------------------------------------------------
+
+    @property
+    def profile(self) -> SqliteProfile:
+        return self._profile
+
+    def settings(self) -> dict:
+        """Profilo attivo e valori effettivi dei PRAGMA sul writer."""
+        with self.pool().write_lock() as conn:
+            return read_settings(conn, self._profile.name)
+
+    @contextmanager
+    def use_profile(self, profile):
+        """
+        Cambia temporaneamente profilo sul writer, es. per un'importazione:
+            with db.use_profile("bulk-load"):
+                engine.post_many(...)
+        All'uscita ripristina il profilo precedente ed esegue un checkpoint WAL.
+        Il journal_mode non cambia qui: si sceglie alla creazione.
+        """
+        new = get_profile(profile)
+        with self.pool().write_lock() as conn:
+            previous = self._profile
+            if new.journal_mode.upper() != previous.journal_mode.upper():
+                raise ValueError("journal_mode diverso dal profilo attivo: usare configure()")
+            apply_profile(conn, new)
+            self._profile = new
+            try:
+                yield
+            finally:
+                apply_profile(conn, previous)
+                self._profile = previous
+                self.checkpoint()
+
+    def checkpoint(self, mode: str = "PASSIVE"):
+        """Checkpoint del WAL (no-op in rollback journal). mode: PASSIVE, FULL, RESTART, TRUNCATE."""
+        if mode.upper() not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Modalità di checkpoint non valida: {mode!r}")
+        with self.pool().write_lock() as conn:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
+    def data_version(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """PRAGMA data_version: cambia quando un'altra connessione fa commit sul file."""
+        conn = conn or self.connect()
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def execute_script(self, script: str):
+        with self.pool().write_lock() as conn:
+            cur = conn.cursor()
+            cur.executescript(script)
+            conn.commit()
+            cur.close()
+
+    # --- Schema ------------------------------------------------------------
+
+    def schema_version(self) -> int:
+        """Versione dello schema (PRAGMA user_version)."""
+        return migrator.current_version(self.connect())
+
+    def upgrade(self, target: Optional[int] = None, progress: Optional[ProgressCallback] = None):
+        """Applica le migrazioni numerate in db/migrations mancanti (vedi db.migrator)."""
+        with self.pool().write_lock() as conn:
+            return migrator.migrate(conn, target=target, progress=progress)
+
+    def initialize(self, progress: Optional[ProgressCallback] = None, force: bool = False) -> bool:
+        """
+        Porta il DB all'ultima versione dello schema (schema + piano dei conti se nuovo).
+
+        Percorso rapido: se versione, impronta di schema/piano dei conti e anno
+        del periodo di default memorizzati coincidono con quelli distribuiti,
+        non esegue nessuno script (una PRAGMA e una SELECT).
+        Restituisce True se ha dovuto fare qualcosa.
+        """
+        year = str(date.today().year)
+        with self.pool().write_lock() as conn:
+            if not force and self._startup_meta(conn) == (migrator.latest_version(),
+                                                        migrator.bundled_fingerprint(), year):
+                self._initialized = True
+                return False
+
+            migrator.migrate(conn, progress=progress)
+            fingerprint = migrator.bundled_fingerprint()
+            stored = dict(conn.execute("SELECT key, value FROM schema_meta").fetchall())
+            if stored.get("fingerprint") != fingerprint:
+                # schema o piano dei conti cambiati: gli script sono idempotenti
+                conn.executescript(migrator.load_sql("schema_accounting.sql"))
+                conn.executescript(migrator.load_sql("chart_of_accounts.sql"))
+
+            cur = conn.cursor()
+            try:
+                cur.execute("BEGIN IMMEDIATE")
+                # crea periodo annuale di default (01/01 → 31/12 anno corrente)
+                cur.execute("""
+                    INSERT OR IGNORE INTO periods(year, month, start_date, end_date, status)
+                    VALUES (?, NULL, ? || '-01-01', ? || '-12-31', 'open')
+                """, (year, year, year))
+                cur.executemany("INSERT OR REPLACE INTO schema_meta(key, value) VALUES (?, ?)",
+                                [("fingerprint", fingerprint), ("default_period_year", year)])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+        self._initialized = True
+        return True
+
+    def ensure_initialized(self, progress: Optional[ProgressCallback] = None):
+        """initialize() una sola volta per istanza (anche con più thread)."""
+        with self._init_lock:
+            if not self._initialized:
+                self.initialize(progress=progress)
+
+    def _startup_meta(self, conn: sqlite3.Connection):
+        try:
+            stored = dict(conn.execute(
+                "SELECT key, value FROM schema_meta WHERE key IN ('fingerprint', 'default_period_year')"
+            ).fetchall())
+        except sqlite3.OperationalError:     # file nuovo o precedente alla migrazione 003
+            return None
+        return (migrator.current_version(conn), stored.get("fingerprint"),
+                stored.get("default_period_year"))
+
+    # --- Archivio ----------------------------------------------------------
+
+    def archive_year(self, year: int, vacuum: bool = False,
+                     progress: Optional[Callable[[str], None]] = None) -> archive.ArchiveResult:
+        """
+        Sposta un esercizio chiuso in un file di archivio per anno (vedi db.archive).
+        I lettori vengono riaperti per collegare il nuovo archivio; vacuum=True
+        compatta subito il file principale.
+        """
+        with self.pool().write_lock() as conn:
+            result = archive.archive_year(conn, self.path, year, progress=progress)
+            if vacuum:
+                if progress:
+                    progress("vacuum")
+                conn.execute("VACUUM")
+        self.pool().retire_readers()
+        return result
+
+
+@dataclass
+class RegistryStats:
+    max_open: int = 0
+    open: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class DatabaseRegistry:
+    """
+    DB aziendali aperti, al più max_open alla volta (LRU).
+
+    get(path) restituisce sempre la stessa istanza per un file finché resta
+    nel registro: connessioni, schema già verificato e cache in memoria
+    (piano dei conti, periodi chiusi) restano caldi. Oltre max_open il file
+    usato meno di recente viene chiuso e dimenticato; chi ne tiene ancora
+    l'istanza può continuare a usarla (il pool si riapre da sé).
+    """
+
+    def __init__(self, max_open: int = DEFAULT_MAX_OPEN, max_readers: int = 2,
+                 profile="default", initialize: bool = True):
+        if max_open < 1:
+            raise ValueError("max_open deve essere >= 1")
+        self.max_open = max_open
+        self.max_readers = max_readers
+        self.profile = get_profile(profile)
+        self.initialize = initialize
+        self._open: "OrderedDict[str, Database]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = RegistryStats(max_open=max_open)
+
+    def get(self, path: str) -> Database:
+        key = str(pathlib.Path(path).resolve())
+        evicted: List[Database] = []
+        with self._lock:
+            db = self._open.get(key)
+            if db is not None:
+                self._open.move_to_end(key)
+                self._stats.hits += 1
+            else:
+                db = self._open[key] = Database(path, max_readers=self.max_readers,
+                                                profile=self.profile)
+                self._stats.misses += 1
+                while len(self._open) > self.max_open:
+                    evicted.append(self._open.popitem(last=False)[1])
+                    self._stats.evictions += 1
+        # chiusure e inizializzazione fuori dal lock: possono attendere il writer
+        for old in evicted:
+            old.close()
+        if self.initialize:
+            db.ensure_initialized()
+        return db
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return str(pathlib.Path(path).resolve()) in self._open
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            return RegistryStats(**{**self._stats.as_dict(), "open": len(self._open)})
+
+    def close(self, path: str):
+        with self._lock:
+            db = self._open.pop(str(pathlib.Path(path).resolve()), None)
+        if db is not None:
+            db.close()
+
+    def close_all(self):
+        with self._lock:
+            dbs = list(self._open.values())
+            self._open.clear()
+        for db in dbs:
+            db.close()
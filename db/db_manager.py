@@ -1,33 +1,72 @@
 # db/db_manager.py
 import sqlite3
 import threading
-import pathlib
 from contextlib import contextmanager
-from typing import Optional
+from typing import Callable, Optional
+
+from db import archive
+from db.database import (Database, DatabaseRegistry, DEFAULT_MAX_OPEN, DEFAULT_MAX_READERS,
+                         RegistryStats)
+from db.migrator import ProgressCallback
+from db.pool import ConnectionPool, PoolStats
+from db.report_session import ReportSession
 
-SCHEMA_SQL = pathlib.Path("db/schema_accounting.sql").read_text(encoding="utf-8")
-CHART_SQL = pathlib.Path("db/chart_of_accounts.sql").read_text(encoding="utf-8")
 DB_PATH_DEFAULT = "contaIDE.db"
 _lock = threading.Lock()
 
 class DBManager:
-    _conn: Optional[sqlite3.Connection] = None
-    _path: str = DB_PATH_DEFAULT
+    """
+    Facciata a livello di classe sul DB di default (vedi db.database.Database).
+    Le applicazioni con un solo file usano questa; i servizi senza un db
+    esplicito lavorano sul DB corrente di DBManager.
+    """
+    _db: Database = Database(DB_PATH_DEFAULT)
+    _registry: Optional[DatabaseRegistry] = None
 
     @classmethod
-    def configure(cls, path: str = DB_PATH_DEFAULT):
-        cls._path = path
+    def configure(cls, path: str = DB_PATH_DEFAULT, max_readers: int = DEFAULT_MAX_READERS,
+                  profile="default"):
+        """
+        profile: nome in db.profiles.PROFILES ("default", "safe", "bulk-load",
+        "legacy") oppure uno SqliteProfile. Chiude il DB di default precedente.
+        """
+        with _lock:
+            previous, cls._db = cls._db, Database(path, max_readers=max_readers, profile=profile)
+        previous.close()
 
     @classmethod
-    def connect(cls) -> sqlite3.Connection:
+    def current(cls) -> Database:
+        """Il DB di default, istanza da passare a chi accetta un db esplicito."""
+        return cls._db
+
+    # --- Più aziende ---------------------------------------------------------
+
+    @classmethod
+    def registry(cls) -> DatabaseRegistry:
         with _lock:
-            if cls._conn is None:
-                conn = sqlite3.connect(cls._path, timeout=30.0, isolation_level=None) 
-                # isolation_level=None -> autocommit off; we will manage transactions manually
-                conn.execute("PRAGMA foreign_keys = ON;")
-                conn.row_factory = sqlite3.Row
-                cls._conn = conn
-            return cls._conn
+            if cls._registry is None:
+                cls._registry = DatabaseRegistry(max_open=DEFAULT_MAX_OPEN)
+            return cls._registry
+
+    @classmethod
+    def open(cls, path: str) -> Database:
+        """DB di un'azienda dal registro di processo (aperto e inizializzato al primo uso, LRU)."""
+        return cls.registry().get(path)
+
+    @classmethod
+    def registry_stats(cls) -> RegistryStats:
+        return cls.registry().stats()
+
+    # --- DB di default -------------------------------------------------------
+
+    @classmethod
+    def pool(cls) -> ConnectionPool:
+        return cls._db.pool()
+
+    @classmethod
+    def connect(cls) -> sqlite3.Connection:
+        """Connessione writer condivisa (compatibilità: chi scrive passi da transaction())."""
+        return cls._db.connect()
 
     @classmethod
     @contextmanager
@@ -38,49 +77,89 @@ class DBManager:
                 cur.execute(...)
         This will BEGIN, and COMMIT on success or ROLLBACK on exception.
         """
-        conn = cls.connect()
-        cur = conn.cursor()
-        try:
-            # BEGIN IMMEDIATE to obtain RESERVED lock (avoid SQLITE_BUSY race)
-            cur.execute("BEGIN IMMEDIATE;")
+        with cls._db.transaction() as cur:
             yield cur
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            cur.close()
+
+    @classmethod
+    @contextmanager
+    def reader(cls):
+        """Connessione di sola lettura dal pool (vedi Database.reader)."""
+        with cls._db.reader() as conn:
+            yield conn
+
+    @classmethod
+    def report_session(cls) -> ReportSession:
+        """
+        Fotografia coerente del DB per report lunghi:
+            with DBManager.report_session() as session:
+                tb = TrialBalanceService().compute(...)
+                # in un thread di lavoro:
+                with session.bind():
+                    rows = LedgerService().get_account_ledger(...)
+        Vedi db.report_session.ReportSession.
+        """
+        return cls._db.report_session()
+
+    @classmethod
+    def pool_stats(cls) -> PoolStats:
+        return cls._db.pool_stats()
+
+    @classmethod
+    def settings(cls) -> dict:
+        """Profilo attivo e valori effettivi dei PRAGMA sul writer."""
+        return cls._db.settings()
+
+    @classmethod
+    @contextmanager
+    def use_profile(cls, profile):
+        """
+        Cambia temporaneamente profilo sul writer, es. per un'importazione:
+            with DBManager.use_profile("bulk-load"):
+                engine.post_many(...)
+        All'uscita ripristina il profilo precedente ed esegue un checkpoint WAL.
+        Il journal_mode non cambia qui: si sceglie con configure().
+        """
+        with cls._db.use_profile(profile):
+            yield
+
+    @classmethod
+    def checkpoint(cls, mode: str = "PASSIVE"):
+        """Checkpoint del WAL (no-op in rollback journal). mode: PASSIVE, FULL, RESTART, TRUNCATE."""
+        return cls._db.checkpoint(mode)
+
+    @classmethod
+    def data_version(cls, conn: Optional[sqlite3.Connection] = None) -> int:
+        """PRAGMA data_version: cambia quando un'altra connessione fa commit sul file."""
+        return cls._db.data_version(conn)
 
     @classmethod
     def execute_script(cls, script: str):
-        conn = cls.connect()
-        cur = conn.cursor()
-        cur.executescript(script)
-        conn.commit()
-        cur.close()
+        cls._db.execute_script(script)
 
     @classmethod
     def close(cls):
-        with _lock:
-            if cls._conn:
-                cls._conn.close()
-                cls._conn = None
-
-    @classmethod
-    def initialize(cls):
-        """Create schema and load chart of accounts if DB is new."""
-        cls.execute_script(SCHEMA_SQL)
-        cls.execute_script(CHART_SQL)
-
-        # crea periodo annuale di default (01/01 → 31/12 anno corrente)
-        conn = cls.connect()
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT OR IGNORE INTO periods(year, month, start_date, end_date, status)
-            VALUES (strftime('%Y','now'), NULL,
-                    strftime('%Y','now') || '-01-01',
-                    strftime('%Y','now') || '-12-31',
-                    'open')
-        """)
-        conn.commit()
-        cur.close()
\ No newline at end of file
+        cls._db.close()
+
+    @classmethod
+    def schema_version(cls) -> int:
+        """Versione dello schema (PRAGMA user_version)."""
+        return cls._db.schema_version()
+
+    @classmethod
+    def upgrade(cls, target: Optional[int] = None, progress: Optional[ProgressCallback] = None):
+        """Applica le migrazioni numerate in db/migrations mancanti (vedi db.migrator)."""
+        return cls._db.upgrade(target=target, progress=progress)
+
+    @classmethod
+    def initialize(cls, progress: Optional[ProgressCallback] = None, force: bool = False) -> bool:
+        """
+        Porta il DB all'ultima versione dello schema (schema + piano dei conti se nuovo).
+        Percorso rapido e valore restituito: vedi Database.initialize.
+        """
+        return cls._db.initialize(progress=progress, force=force)
+
+    @classmethod
+    def archive_year(cls, year: int, vacuum: bool = False,
+                     progress: Optional[Callable[[str], None]] = None) -> archive.ArchiveResult:
+        """Sposta un esercizio chiuso in un file di archivio per anno (vedi db.archive)."""
+        return cls._db.archive_year(year, vacuum=vacuum, progress=progress)
@@ -0,0 +1,48 @@
+# db/migrations/001_init_chart.py
+"""
+Schema contabile e piano dei conti standard.
+
+schema_accounting.sql descrive lo schema corrente ed è scritto tutto con
+IF NOT EXISTS, quindi su un file nuovo crea le tabelle già nella forma finale
+e le migrazioni successive non trovano nulla da fare. Il piano dei conti
+usa INSERT OR IGNORE: non tocca i conti già presenti.
+
+I file creati dal vecchio backend/db.py hanno accounts/entries/entry_lines
+con colonne incompatibili (account_id, niente class/parent_code): vengono
+rinominati in legacy_* prima di creare lo schema, senza perdere dati.
+"""
+from db.migrator import load_sql
+
+LEGACY_TABLES = ("entry_lines", "entries", "accounts")
+
+
+def _columns(conn, table: str) -> set:
+    return {r[1] for r in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def is_legacy(conn) -> bool:
+    cols = _columns(conn, "accounts")
+    return bool(cols) and "class" not in cols
+
+
+def upgrade(conn, progress=None):
+    if is_legacy(conn):
+        if progress:
+            progress("legacy")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in LEGACY_TABLES:
+                if _columns(conn, table):
+                    conn.execute(f"ALTER TABLE {table} RENAME TO legacy_{table}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if progress:
+        progress("schema")
+    conn.executescript(load_sql("schema_accounting.sql"))
+
+    if progress:
+        progress("chart")
+    conn.executescript("BEGIN IMMEDIATE;\n" + load_sql("chart_of_accounts.sql") + "\nCOMMIT;")
@@ -0,0 +1,89 @@
+# db/migrations/002_integer_cents.py
+"""
+Importi in centesimi interi: entry_lines.dare/avere REAL -> dare_cents/avere_cents INTEGER.
+
+La tabella viene ricopiata a blocchi in entry_lines_cents, un blocco per
+transazione, così il lock di scrittura non viene mai tenuto a lungo. Il
+progresso coincide con max(id) già copiato: un'interruzione riprende da lì.
+Lo scambio finale copia le ultime righe e rinomina la tabella in una sola
+transazione breve. Anche account_period_balances passa ai centesimi.
+"""
+from db.migrator import run_batched
+
+BATCH_SIZE = 10000
+
+NEW_ENTRY_LINES = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER NOT NULL,
+        account_code TEXT NOT NULL,
+        dare_cents INTEGER NOT NULL DEFAULT 0 CHECK (dare_cents >= 0),
+        avere_cents INTEGER NOT NULL DEFAULT 0 CHECK (avere_cents >= 0),
+        dare REAL GENERATED ALWAYS AS (dare_cents / 100.0) VIRTUAL,
+        avere REAL GENERATED ALWAYS AS (avere_cents / 100.0) VIRTUAL,
+        CHECK (NOT (dare_cents > 0 AND avere_cents > 0)),
+        FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE,
+        FOREIGN KEY(account_code) REFERENCES accounts(code)
+    )
+"""
+
+COPY_SQL = """
+    INSERT INTO entry_lines_cents (id, entry_id, account_code, dare_cents, avere_cents)
+    SELECT id, entry_id, account_code,
+           CAST(round(COALESCE(dare, 0) * 100) AS INTEGER),
+           CAST(round(COALESCE(avere, 0) * 100) AS INTEGER)
+    FROM entry_lines
+    WHERE id > (SELECT COALESCE(MAX(id), 0) FROM entry_lines_cents)
+    ORDER BY id
+"""
+
+
+def needs_upgrade(conn) -> bool:
+    cols = {r[1] for r in conn.execute("PRAGMA table_xinfo(entry_lines)")}
+    return bool(cols) and "dare_cents" not in cols
+
+
+def upgrade(conn, batch_size: int = BATCH_SIZE, progress=None):
+    if not needs_upgrade(conn):
+        return
+
+    conn.execute(NEW_ENTRY_LINES.format(name="entry_lines_cents"))
+
+    # Copia a blocchi: ogni blocco è una transazione breve
+    total = conn.execute("SELECT COUNT(*) FROM entry_lines").fetchone()[0]
+    copied = conn.execute("SELECT COUNT(*) FROM entry_lines_cents").fetchone()[0]
+    run_batched(conn, COPY_SQL, batch_size=batch_size, step="copy",
+                total=total, done=copied, progress=progress)
+
+    if progress:
+        progress("swap", total, total)
+    # Scambio: ultime righe arrivate nel frattempo + rename + saldi mensili
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(COPY_SQL)
+        conn.execute("DROP TABLE entry_lines")
+        conn.execute("ALTER TABLE entry_lines_cents RENAME TO entry_lines")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_lines_account_date ON entry_lines(account_code, entry_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_lines_entry ON entry_lines(entry_id)")
+
+        conn.execute("DROP TABLE IF EXISTS account_period_balances")
+        conn.execute("""
+            CREATE TABLE account_period_balances (
+                account_code TEXT NOT NULL,
+                period TEXT NOT NULL,
+                dare_cents INTEGER NOT NULL DEFAULT 0,
+                avere_cents INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (account_code, period)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            INSERT INTO account_period_balances (account_code, period, dare_cents, avere_cents)
+            SELECT el.account_code, substr(e.date, 1, 7), SUM(el.dare_cents), SUM(el.avere_cents)
+            FROM entry_lines el
+            JOIN entries e ON e.id = el.entry_id
+            GROUP BY el.account_code, substr(e.date, 1, 7)
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,16 @@
+# db/migrations/003_schema_meta.py
+"""
+Tabella schema_meta: impronta di schema/piano dei conti e anno del periodo di
+default, così l'avvio su un file già aggiornato non riesegue gli script.
+"""
+
+SCHEMA_META = """
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+
+
+def upgrade(conn, progress=None):
+    conn.execute(SCHEMA_META)
@@ -0,0 +1,21 @@
+# db/migrations/004_query_indexes.py
+"""
+Indici richiesti dal catalogo delle query (core.query_catalog):
+  - entries.reversal_of era letto con una scansione completa a ogni storno e
+    a ogni validazione;
+  - il bilancio di verifica filtra account_period_balances per periodo, fuori
+    dal prefisso della chiave (account_code, period).
+"""
+
+INDEXES = {
+    "idx_entries_reversal_of": "entries(reversal_of)",
+    "idx_account_period_balances_period":
+        "account_period_balances(period, account_code, dare_cents, avere_cents)",
+}
+
+
+def upgrade(conn, progress=None):
+    for name, target in INDEXES.items():
+        if progress:
+            progress(name)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
@@ -0,0 +1,19 @@
+# db/migrations/005_archives.py
+"""
+Registro degli esercizi archiviati in file per anno (db.archive): le
+connessioni di lettura fanno ATTACH dei file elencati qui.
+"""
+
+ARCHIVES = """
+    CREATE TABLE IF NOT EXISTS archives (
+        year INTEGER PRIMARY KEY,
+        file TEXT NOT NULL,
+        entries INTEGER NOT NULL,
+        lines INTEGER NOT NULL,
+        archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+"""
+
+
+def upgrade(conn, progress=None):
+    conn.execute(ARCHIVES)
@@ -0,0 +1,13 @@
+# db/migrations/006_audit_index.py
+"""
+Indice su audit_log(entry_id): la lettura dell'audit di una entry
+(core.audit.get_audit_records) scandiva tutta la tabella, la più grande del file.
+"""
+
+INDEX = "CREATE INDEX IF NOT EXISTS idx_audit_log_entry ON audit_log(entry_id)"
+
+
+def upgrade(conn, progress=None):
+    if progress:
+        progress("idx_audit_log_entry")
+    conn.execute(INDEX)
@@ -0,0 +1,22 @@
+# db/migrations/007_period_generation.py
+"""
+Contatore 'periods' in cache_generations, incrementato da trigger su ogni
+scrittura di periods: l'indice dei periodi chiusi (core.period_index) si
+accorge anche delle modifiche fatte con SQL diretto sulla stessa connessione,
+che PRAGMA data_version non segnala.
+"""
+
+SCRIPT = """
+    INSERT OR IGNORE INTO cache_generations(name, generation) VALUES ('periods', 0);
+""" + "".join(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_periods_{op.lower()}_generation AFTER {op} ON periods
+    BEGIN
+        UPDATE cache_generations SET generation = generation + 1 WHERE name = 'periods';
+    END;
+""" for op in ("INSERT", "UPDATE", "DELETE"))
+
+
+def upgrade(conn, progress=None):
+    if progress:
+        progress("triggers")
+    conn.executescript(SCRIPT)
@@ -0,0 +1,152 @@
+# db/migrator.py
+"""
+Migrazioni numerate dello schema, versione in PRAGMA user_version.
+
+Ogni file db/migrations/NNN_nome.py definisce upgrade(conn, progress=None) e
+viene applicato una sola volta, in ordine: dopo il successo user_version
+diventa NNN. Una migrazione interrotta viene rieseguita da capo al riavvio,
+quindi deve essere idempotente; i backfill lunghi usano run_batched(), che
+lavora a blocchi (una transazione breve per blocco) e riparte da dove era
+arrivato perché l'istruzione stessa salta le righe già elaborate.
+
+schema_accounting.sql resta lo schema corrente (lo applica la 001 sui file
+nuovi): una modifica allo schema va sia lì sia in una nuova migrazione, che
+quindi su un file nuovo deve trovare tutto già fatto e non fare nulla.
+"""
+import functools
+import hashlib
+import importlib
+import importlib.resources
+import pathlib
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+MIGRATIONS_DIR = pathlib.Path(__file__).resolve().parent / "migrations"
+_NAME = re.compile(r"^(\d{3})_(\w+)\.py$")
+
+
+@dataclass(frozen=True)
+class MigrationProgress:
+    version: int
+    name: str
+    step: str
+    done: int = 0
+    total: Optional[int] = None
+
+
+ProgressCallback = Callable[[MigrationProgress], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: str
+
+    def load(self):
+        return importlib.import_module(self.module)
+
+
+@functools.lru_cache(maxsize=None)
+def load_sql(name: str) -> str:
+    """Script SQL distribuito con il pacchetto db, letto solo quando serve."""
+    return importlib.resources.files("db").joinpath(name).read_text(encoding="utf-8")
+
+
+@functools.lru_cache(maxsize=None)
+def bundled_fingerprint() -> str:
+    """Impronta di schema, piano dei conti e migrazioni distribuiti con il programma."""
+    digest = hashlib.sha256()
+    for name in ("schema_accounting.sql", "chart_of_accounts.sql"):
+        digest.update(load_sql(name).encode("utf-8"))
+    for mig in discover():
+        digest.update(f"{mig.version}:{mig.name}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def discover() -> Tuple[Migration, ...]:
+    found = []
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        m = _NAME.match(path.name)
+        if m:
+            found.append(Migration(int(m.group(1)), m.group(2), f"db.migrations.{path.stem}"))
+    found.sort(key=lambda mig: mig.version)
+    versions = [mig.version for mig in found]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Numeri di migrazione duplicati: {versions}")
+    return tuple(found)
+
+
+def latest_version() -> int:
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending(conn: sqlite3.Connection) -> List[Migration]:
+    version = current_version(conn)
+    return [mig for mig in discover() if mig.version > version]
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None,
+            progress: Optional[ProgressCallback] = None) -> List[Tuple[int, float]]:
+    """
+    Applica le migrazioni mancanti fino a target (default: l'ultima).
+    Restituisce [(versione, secondi)] delle migrazioni applicate.
+    """
+    applied = []
+    for mig in pending(conn):
+        if target is not None and mig.version > target:
+            break
+        if progress:
+            progress(MigrationProgress(mig.version, mig.name, "start"))
+        started = time.perf_counter()
+        mig.load().upgrade(conn, progress=_scoped(progress, mig))
+        # PRAGMA non accetta parametri; la versione è un intero dal nome file
+        conn.execute(f"PRAGMA user_version = {int(mig.version)}")
+        applied.append((mig.version, time.perf_counter() - started))
+        if progress:
+            progress(MigrationProgress(mig.version, mig.name, "done"))
+    return applied
+
+
+def _scoped(progress: Optional[ProgressCallback], mig: Migration):
+    """Callback passata alla migrazione: step, done, total -> MigrationProgress."""
+    if progress is None:
+        return None
+
+    def report(step: str, done: int = 0, total: Optional[int] = None):
+        progress(MigrationProgress(mig.version, mig.name, step, done, total))
+    return report
+
+
+def run_batched(conn: sqlite3.Connection, statement: str, params: tuple = (),
+                batch_size: int = 10000, step: str = "backfill",
+                total: Optional[int] = None, done: int = 0, progress=None) -> int:
+    """
+    Esegue `statement + LIMIT batch_size` finché tocca meno di batch_size righe,
+    un blocco per transazione. L'istruzione deve escludere da sé le righe già
+    fatte (es. WHERE id > (SELECT MAX(id) FROM destinazione)): così ogni commit
+    è un punto di ripresa. progress(step, done, total) dopo ogni blocco;
+    done parte dalle righe già elaborate prima di un'eventuale interruzione.
+    """
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            count = conn.execute(f"{statement} LIMIT ?", (*params, batch_size)).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        done += count
+        if progress:
+            progress(step, done, total)
+        if count < batch_size:
+            return done
@@ -0,0 +1,177 @@
+# db/pool.py
+import pathlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+
+
+@dataclass
+class PoolStats:
+    """Metriche del pool: utili per capire se i lettori sono sufficienti."""
+    max_readers: int = 0
+    readers_open: int = 0
+    readers_in_use: int = 0
+    reader_checkouts: int = 0
+    reader_waits: int = 0
+    reader_wait_seconds: float = 0.0
+    writer_checkouts: int = 0
+    writer_waits: int = 0
+    writer_wait_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class ConnectionPool:
+    """
+    Un writer condiviso + fino a max_readers connessioni di sola lettura.
+
+    Il writer è protetto da un RLock (rientrante: una transazione può chiamare
+    codice che usa di nuovo il writer). I lettori sono assegnati per thread:
+    dentro reader() lo stesso thread riottiene sempre la stessa connessione,
+    gli altri thread ne prendono una libera o aspettano che se ne liberi una.
+    """
+
+    def __init__(self, path: str, max_readers: int = 4,
+                 setup: Optional[Callable[[sqlite3.Connection, bool], None]] = None):
+        if max_readers < 1:
+            raise ValueError("max_readers deve essere >= 1")
+        self.path = path
+        self.max_readers = max_readers
+        self._setup = setup
+        self._writer_lock = threading.RLock()
+        self._cond = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._all_readers: List[sqlite3.Connection] = []
+        self._retired: List[sqlite3.Connection] = []   # in uso durante retire_readers()
+        self._local = threading.local()
+        self._stats = PoolStats(max_readers=max_readers)
+        self._closed = False
+        self.writer = self._open(read_only=False)
+
+    # --- Connessioni -------------------------------------------------------
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        if read_only:
+            uri = pathlib.Path(self.path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=30.0, isolation_level=None,
+                                   check_same_thread=False)
+        else:
+            # isolation_level=None -> autocommit; le transazioni sono esplicite
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON;")
+        conn.row_factory = sqlite3.Row
+        if self._setup:
+            self._setup(conn, read_only)
+        return conn
+
+    # --- Writer ------------------------------------------------------------
+
+    @contextmanager
+    def write_lock(self):
+        started = time.perf_counter()
+        acquired = self._writer_lock.acquire(blocking=False)
+        if not acquired:
+            self._writer_lock.acquire()
+        with self._cond:
+            self._stats.writer_checkouts += 1
+            if not acquired:
+                self._stats.writer_waits += 1
+                self._stats.writer_wait_seconds += time.perf_counter() - started
+        try:
+            yield self.writer
+        finally:
+            self._writer_lock.release()
+
+    # --- Lettori -----------------------------------------------------------
+
+    @contextmanager
+    def reader(self):
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            # rientrante: stesso thread, stessa connessione (e stessa vista)
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout()
+        self._local.conn, self._local.depth = conn, 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._checkin(conn)
+
+    def _checkout(self) -> sqlite3.Connection:
+        started = time.perf_counter()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool chiuso")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if len(self._all_readers) < self.max_readers:
+                    conn = self._open(read_only=True)
+                    self._all_readers.append(conn)
+                    self._stats.readers_open += 1
+                    break
+                waited = True
+                self._cond.wait()
+            self._stats.reader_checkouts += 1
+            self._stats.readers_in_use += 1
+            if waited:
+                self._stats.reader_waits += 1
+                self._stats.reader_wait_seconds += time.perf_counter() - started
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection):
+        with self._cond:
+            self._stats.readers_in_use -= 1
+            if conn in self._retired:
+                self._retired.remove(conn)
+                conn.close()
+            elif self._closed:
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def retire_readers(self):
+        """
+        Chiude i lettori liberi e quelli in uso appena rilasciati: i successivi
+        vengono riaperti (e ripassano da setup), es. dopo un'archiviazione.
+        """
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+            self._retired.extend(c for c in self._all_readers if c not in self._idle)
+            self._stats.readers_open -= len(self._all_readers)
+            self._idle.clear()
+            self._all_readers.clear()
+            self._cond.notify_all()
+
+    # --- Stato -------------------------------------------------------------
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            return PoolStats(**self._stats.as_dict())
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+            self._all_readers.clear()
+            self._cond.notify_all()
+        with self._writer_lock:
+            self.writer.close()
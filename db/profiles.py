@@ -0,0 +1,74 @@
+# db/profiles.py
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """Insieme di PRAGMA applicati a ogni connessione aperta dal pool."""
+    name: str
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -20000          # negativo = KiB (qui ~20 MB per connessione)
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    wal_autocheckpoint: int = 1000    # pagine; 0 = nessun checkpoint automatico
+
+
+PROFILES: Dict[str, SqliteProfile] = {
+    # WAL: i lettori non si bloccano durante i commit; NORMAL è sicuro in WAL
+    # (al più si perdono le ultime transazioni in caso di blackout, mai corruzione)
+    "default": SqliteProfile("default"),
+    # fsync a ogni commit, per chi preferisce la durabilità alle prestazioni
+    "safe": SqliteProfile("safe", synchronous="FULL", cache_size=-8000, mmap_size=0),
+    # importazioni massive: niente fsync né checkpoint finché non si torna al profilo normale
+    "bulk-load": SqliteProfile("bulk-load", synchronous="OFF", cache_size=-200000,
+                               wal_autocheckpoint=0),
+    # comportamento storico: rollback journal e impostazioni di default di SQLite
+    "legacy": SqliteProfile("legacy", journal_mode="DELETE", synchronous="FULL",
+                            cache_size=-2000, mmap_size=0, temp_store="DEFAULT"),
+}
+
+_SYNCHRONOUS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+_TEMP_STORE = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def get_profile(profile) -> SqliteProfile:
+    if isinstance(profile, SqliteProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Profilo sconosciuto: {profile!r} (disponibili: {', '.join(PROFILES)})")
+
+
+def apply_profile(conn: sqlite3.Connection, profile: SqliteProfile, read_only: bool = False):
+    """
+    Applica il profilo a una connessione. journal_mode e checkpoint riguardano
+    il file e si impostano solo dal writer; il resto vale per connessione.
+    """
+    if not read_only:
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {int(profile.wal_autocheckpoint)}")
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+
+
+def read_settings(conn: sqlite3.Connection, profile_name: Optional[str] = None) -> dict:
+    """Valori effettivi dei PRAGMA sulla connessione (per benchmark e diagnostica)."""
+    def pragma(name):
+        row = conn.execute(f"PRAGMA {name}").fetchone()
+        return row[0] if row else None
+
+    return {
+        "profile": profile_name,
+        "journal_mode": str(pragma("journal_mode")).upper(),
+        "synchronous": _SYNCHRONOUS.get(pragma("synchronous")),
+        "cache_size": pragma("cache_size"),
+        "mmap_size": pragma("mmap_size") or 0,
+        "temp_store": _TEMP_STORE.get(pragma("temp_store")),
+        "wal_autocheckpoint": pragma("wal_autocheckpoint"),
+    }
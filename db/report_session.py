@@ -0,0 +1,91 @@
+# db/report_session.py
+import pathlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+_bound = threading.local()
+
+
+def current_session() -> Optional["ReportSession"]:
+    """Sessione di report legata al thread corrente (la più interna), se c'è."""
+    stack = getattr(_bound, "stack", None)
+    return stack[-1] if stack else None
+
+
+class ReportSession:
+    """
+    Connessione di sola lettura con una transazione di lettura aperta: tutto
+    ciò che si calcola dentro la sessione vede la stessa fotografia del DB,
+    mentre il writer continua a fare commit (in WAL non ci sono attese).
+
+    Mentre la sessione è legata a un thread (bind() o with), reader() del DB
+    della sessione (DBManager.reader() per quello di default) restituisce
+    questa connessione, quindi i servizi esistenti la usano senza modifiche.
+    Per i thread di lavoro basta `with session.bind(): ...`; le istruzioni
+    dei vari thread sono serializzate sulla connessione.
+
+    Con il profilo "legacy" (rollback journal) la transazione aperta tiene un
+    lock SHARED e i commit dei writer attendono la chiusura della sessione.
+    """
+
+    def __init__(self, path: str,
+                 setup: Optional[Callable[[sqlite3.Connection, bool], None]] = None):
+        self.path = str(pathlib.Path(path).resolve())
+        uri = pathlib.Path(self.path).as_uri() + "?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, timeout=30.0, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if setup:
+            setup(self._conn, True)
+        self._lock = threading.RLock()
+        self._closed = False
+        # BEGIN DEFERRED non legge nulla: la fotografia si fissa alla prima
+        # lettura, che facciamo subito per non dipendere dal primo report
+        self._conn.execute("BEGIN DEFERRED")
+        self._conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Sessione di report chiusa")
+            yield self._conn
+
+    @contextmanager
+    def bind(self):
+        """Lega la sessione al thread corrente (anche dai thread di lavoro)."""
+        stack: List[ReportSession] = getattr(_bound, "stack", None)
+        if stack is None:
+            stack = _bound.stack = []
+        stack.append(self)
+        try:
+            yield self
+        finally:
+            stack.pop()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._conn.rollback()
+            finally:
+                self._conn.close()
+
+    def __enter__(self):
+        self._binding = self.bind()
+        return self._binding.__enter__()
+
+    def __exit__(self, *exc):
+        try:
+            self._binding.__exit__(*exc)
+        finally:
+            self.close()
+        return False
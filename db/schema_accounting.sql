@@ -28,13 +28,16 @@ CREATE TABLE IF NOT EXISTS entries (
     FOREIGN KEY(reversal_of) REFERENCES entries(id)
 );
 
+-- Importi in centesimi interi; dare/avere in euro sono colonne calcolate
 CREATE TABLE IF NOT EXISTS entry_lines (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     entry_id INTEGER NOT NULL,
     account_code TEXT NOT NULL,
-    dare REAL DEFAULT 0 CHECK (dare >= 0),
-    avere REAL DEFAULT 0 CHECK (avere >= 0),
-    CHECK (NOT (dare > 0 AND avere > 0)),
+    dare_cents INTEGER NOT NULL DEFAULT 0 CHECK (dare_cents >= 0),
+    avere_cents INTEGER NOT NULL DEFAULT 0 CHECK (avere_cents >= 0),
+    dare REAL GENERATED ALWAYS AS (dare_cents / 100.0) VIRTUAL,
+    avere REAL GENERATED ALWAYS AS (avere_cents / 100.0) VIRTUAL,
+    CHECK (NOT (dare_cents > 0 AND avere_cents > 0)),
     FOREIGN KEY(entry_id) REFERENCES entries(id) ON DELETE CASCADE,
     FOREIGN KEY(account_code) REFERENCES accounts(code)
 );
@@ -83,8 +86,86 @@ CREATE TABLE IF NOT EXISTS closing_entries (
     created_at TEXT NOT NULL
 );
 
+-- Saldi mensili materializzati per conto (aggiornati dal PostingEngine)
+CREATE TABLE IF NOT EXISTS account_period_balances (
+    account_code TEXT NOT NULL,
+    period TEXT NOT NULL,           -- 'YYYY-MM'
+    dare_cents INTEGER NOT NULL DEFAULT 0,
+    avere_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_code, period)
+) WITHOUT ROWID;
+
+-- idx_account_period_balances_period è creato dalla migrazione 004: su file
+-- precedenti ai centesimi le colonne *_cents non esistono ancora a questo punto
+
 CREATE INDEX IF NOT EXISTS idx_entry_lines_account_date
     ON entry_lines(account_code, entry_id);
 
+CREATE INDEX IF NOT EXISTS idx_entry_lines_entry
+    ON entry_lines(entry_id);
+
 CREATE INDEX IF NOT EXISTS idx_entries_date
     ON entries(date);
+
+-- Storni: controllo "già stornata" e selezione degli storni di una entry
+CREATE INDEX IF NOT EXISTS idx_entries_reversal_of
+    ON entries(reversal_of);
+
+-- Audit di una entry (core.audit.get_audit_records)
+CREATE INDEX IF NOT EXISTS idx_audit_log_entry
+    ON audit_log(entry_id);
+
+-- Impronta dello schema installato e altri metadati di avvio (vedi DBManager.initialize)
+CREATE TABLE IF NOT EXISTS schema_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- Esercizi spostati in file di archivio per anno (vedi db.archive)
+CREATE TABLE IF NOT EXISTS archives (
+    year INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,             -- nome del file, nella cartella del DB principale
+    entries INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Generation counters for in-process caches (bumped by triggers on every write)
+CREATE TABLE IF NOT EXISTS cache_generations (
+    name TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO cache_generations(name, generation) VALUES ('accounts', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_insert_generation AFTER INSERT ON accounts
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_update_generation AFTER UPDATE ON accounts
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'accounts';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_accounts_delete_generation AFTER DELETE ON accounts
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'accounts';
+END;
+
+INSERT OR IGNORE INTO cache_generations(name, generation) VALUES ('periods', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_periods_insert_generation AFTER INSERT ON periods
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'periods';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_periods_update_generation AFTER UPDATE ON periods
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'periods';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_periods_delete_generation AFTER DELETE ON periods
+BEGIN
+    UPDATE cache_generations SET generation = generation + 1 WHERE name = 'periods';
+END;
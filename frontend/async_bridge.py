@@ -0,0 +1,48 @@
+# frontend/async_bridge.py
+"""
+Consegna al thread della GUI i risultati di core.async_service.
+
+    bridge = FutureBridge(self)
+    bridge.then(svc.trial_balance("2025-01-01", "2025-12-31"),
+                self.show_bilancio, on_error=self.show_error)
+
+Le callback partono sempre nel thread della GUI: il done_callback del future
+emette un segnale e la connessione queued di Qt lo consegna al ricevente.
+"""
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+class FutureBridge(QObject):
+    _done = Signal(object)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._callbacks: Dict[Future, tuple] = {}
+        self._done.connect(self._deliver)
+
+    def then(self, future: Future, on_result: Callable[[object], None],
+             on_error: Optional[Callable[[BaseException], None]] = None) -> Future:
+        """Registra le callback e restituisce il future (per annullarlo)."""
+        self._callbacks[future] = (on_result, on_error)
+        future.add_done_callback(self._done.emit)
+        return future
+
+    def cancel_all(self) -> int:
+        """Annulla i future ancora in coda e scarta le callback di tutti gli altri."""
+        cancelled = sum(f.cancel() for f in list(self._callbacks))
+        self._callbacks.clear()
+        return cancelled
+
+    @Slot(object)
+    def _deliver(self, future: Future):
+        on_result, on_error = self._callbacks.pop(future, (None, None))
+        if on_result is None or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            on_result(future.result())
+        elif on_error is not None:
+            on_error(error)
@@ -0,0 +1,134 @@
+# frontend/bilancio_model.py
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+from core.money import Money
+from core.trial_balance import TrialBalanceRow
+
+HEADERS = ["Conto", "Dare", "Avere", "Saldo"]
+
+
+class _Item:
+    __slots__ = ("code", "row", "parent", "children")
+
+    def __init__(self, code: Optional[str], row: Optional[TrialBalanceRow], parent: Optional["_Item"]):
+        self.code = code
+        self.row = row
+        self.parent = parent
+        self.children: Optional[List["_Item"]] = None     # None: non ancora caricati
+
+
+class BilancioModel(QAbstractItemModel):
+    """
+    Albero del piano dei conti con i totali di un intervallo.
+
+    I totali arrivano già calcolati (BalanceTreeService.nodes); i nodi figli
+    si creano solo quando la vista espande il padre (canFetchMore/fetchMore),
+    leggendo dal dizionario dei totali senza interrogare il DB.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._nodes: Dict[str, TrialBalanceRow] = {}
+        self._children_of: Callable[[Optional[str]], List[str]] = lambda code: []
+        self._root = _Item(None, None, None)
+
+    def set_nodes(self, nodes: Dict[str, TrialBalanceRow],
+                  children_of: Callable[[Optional[str]], List[str]]):
+        self.beginResetModel()
+        self._nodes, self._children_of = nodes, children_of
+        self._root = _Item(None, None, None)
+        self._root.children = self._load_children(self._root)
+        self.endResetModel()
+
+    def _child_codes(self, code: Optional[str]) -> List[str]:
+        """Figli con movimenti nell'intervallo."""
+        result = []
+        for c in self._children_of(code):
+            row = self._nodes.get(c)
+            if row is not None and (row.dare or row.avere):
+                result.append(c)
+        return result
+
+    def _load_children(self, item: _Item) -> List[_Item]:
+        return [_Item(c, self._nodes[c], item) for c in self._child_codes(item.code)]
+
+    def _item(self, index: QModelIndex) -> _Item:
+        return index.internalPointer() if index.isValid() else self._root
+
+    # --- Struttura -----------------------------------------------------------
+
+    def index(self, row, column, parent=QModelIndex()):
+        item = self._item(parent)
+        if item.children is None or not (0 <= row < len(item.children)):
+            return QModelIndex()
+        return self.createIndex(row, column, item.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.parent.children.index(parent), 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        children = self._item(parent).children
+        return len(children) if children is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        item = self._item(parent)
+        if item.children is not None:
+            return bool(item.children)
+        return bool(self._child_codes(item.code))
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._item(parent).children is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        item = self._item(parent)
+        if item.children is not None:
+            return
+        children = self._load_children(item)
+        if not children:
+            item.children = []
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        item.children = children
+        self.endInsertRows()
+
+    # --- Dati ----------------------------------------------------------------
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.internalPointer().row
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return f"{row.code} {row.name}"
+            if index.column() == 3:
+                return str(row.saldo)
+            return str(Money(row.dare if index.column() == 1 else row.avere))
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable if index.isValid() else Qt.NoItemFlags
+
+    def code(self, index: QModelIndex) -> Optional[str]:
+        return self._item(index).code
+
+    def is_leaf(self, index: QModelIndex) -> bool:
+        return not self._children_of(self._item(index).code)
@@ -0,0 +1,123 @@
+# frontend/container_bilancio.py
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QDateEdit, QLabel, QTreeView,
+                               QHeaderView)
+from PySide6.QtCore import QDate, Signal, Slot
+
+from backend import db
+from core.account_index import get_account_index
+from core.async_service import AsyncLedgerService
+from core.money import Money
+from frontend.async_bridge import FutureBridge
+from frontend.bilancio_model import BilancioModel
+
+class BilancioWidget(QWidget):
+    """
+    Bilancio di verifica ad albero. I totali di tutti i nodi si calcolano in
+    background (una volta per intervallo e versione del libro giornale, poi
+    dalla cache); il doppio clic su un conto foglia apre il suo mastrino.
+    """
+    # conto foglia scelto: (codice, da, a)
+    account_activated = Signal(str, str, str)
+    # emesso dal thread che registra, consegnato (queued) nel thread della GUI
+    posted = Signal(object)
+
+    def __init__(self, service: AsyncLedgerService, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self.bridge = FutureBridge(self)
+        self.model = BilancioModel(self)
+        self._generation = 0
+        self._stale = True
+
+        layout = QVBoxLayout(self)
+
+        # Periodo
+        controls = QHBoxLayout()
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(QDate(today.year(), 1, 1))
+        self.to_date = QDateEdit(QDate(today.year(), 12, 31))
+        for edit in (self.from_date, self.to_date):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.dateChanged.connect(lambda _: self.reload())
+        controls.addWidget(QLabel("Periodo"))
+        controls.addWidget(self.from_date)
+        controls.addWidget(self.to_date)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        # Albero: i figli si caricano all'espansione
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setAlternatingRowColors(True)
+        header = self.tree.header()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for i in (1, 2, 3):
+            header.setSectionResizeMode(i, QHeaderView.Fixed)
+            header.resizeSection(i, 120)
+        header.setStretchLastSection(False)
+        self.tree.doubleClicked.connect(self._on_double_click)
+        layout.addWidget(self.tree)
+
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Dopo una registrazione: ricalcolo subito se visibile, altrimenti alla prossima apertura
+        self.posted.connect(self._on_posted)
+        listener = self.posted.emit
+        db.add_posting_listener(listener)
+        self.destroyed.connect(lambda: db.remove_posting_listener(listener))
+
+    def period(self):
+        return (self.from_date.date().toString("yyyy-MM-dd"),
+                self.to_date.date().toString("yyyy-MM-dd"))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self.reload()
+
+    def reload(self):
+        self._stale = False
+        self._generation += 1
+        self.bridge.cancel_all()
+        generation = self._generation
+        from_date, to_date = self.period()
+        self.status.setText("Calcolo del bilancio…")
+        self.bridge.then(self.service.balance_tree(from_date, to_date),
+                         lambda nodes: self._on_nodes(generation, nodes),
+                         on_error=lambda e: self._on_error(generation, e))
+
+    def _on_nodes(self, generation, nodes):
+        if generation != self._generation:
+            return
+        self.model.set_nodes(nodes, get_account_index().children)
+        roots = [nodes[c] for c in get_account_index().children(None) if c in nodes]
+        dare, avere = sum(r.dare for r in roots), sum(r.avere for r in roots)
+        self.status.setText(self._totals_text(dare, avere) if dare or avere
+                            else "Nessun movimento nel periodo.")
+
+    @staticmethod
+    def _totals_text(dare: int, avere: int) -> str:
+        text = f"Totale dare {Money(dare)} — avere {Money(avere)}"
+        return text if dare == avere else text + " ⚠️ Dare e Avere non coincidono"
+
+    def _on_error(self, generation, error):
+        if generation == self._generation:
+            self.status.setText(f"❌ Errore nel calcolo del bilancio: {error}")
+
+    @Slot(object)
+    def _on_posted(self, entry_ids):
+        if self.isVisible():
+            self.reload()
+        else:
+            self._stale = True
+
+    def _on_double_click(self, index):
+        index = index.siblingAtColumn(0)
+        if self.model.is_leaf(index):
+            self.account_activated.emit(self.model.code(index), *self.period())
@@ -1,38 +1,53 @@
 # frontend/container_journal.py
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QHeaderView
+from PySide6.QtCore import Qt, Signal, Slot
+
+from backend import db
+from core.async_service import READ
+from frontend.async_bridge import FutureBridge
+from frontend.journal_model import JournalModel
+
+# Larghezze fisse delle colonne corte (px): niente ResizeToContents, che
+# misurerebbe ogni cella a ogni pagina caricata
+COLUMN_WIDTHS = {0: 95, 1: 110, 2: 110, 3: 115, 7: 100}
+ROW_HEIGHT = 26
 
 class JournalWidget(QWidget):
-    def __init__(self, parent=None):
+    # emesso dal thread che registra, consegnato (queued) nel thread della GUI
+    posted = Signal(object)
+    # prima pagina arrivata dal worker (None) o errore di lettura
+    page_loaded = Signal(object)
+
+    def __init__(self, parent=None, model=None, service=None):
         super().__init__(parent)
         layout = QVBoxLayout(self)
+        # con un AsyncLedgerService la prima pagina si legge fuori dal thread della GUI
+        self.service = service
+        self.bridge = FutureBridge(self)
+
+        # Vista sul modello a pagine: la tabella disegna solo le righe visibili
+        self.model = model or JournalModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
 
-        # Tabella con 8 colonne
-        self.table = QTableWidget(0, 8)
-        self.table.setHorizontalHeaderLabels([
-            "Data", 
-            "N. protocollo", 
-            "N. documento", 
-            "Data documento",
-            "Cliente/Fornitore", 
-            "Descrizione", 
-            "Conto Dare/Avere", 
-            "Importo"
-        ])
-
-        # Configura l'header per ridimensionamento automatico
         header = self.table.horizontalHeader()
-        # Colonne corte: dimensione automatica
-        for i in [0, 1, 2, 3, 7]:
-            header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+        # Colonne corte: larghezza fissa
+        for i, width in COLUMN_WIDTHS.items():
+            header.setSectionResizeMode(i, QHeaderView.Fixed)
+            header.resizeSection(i, width)
         # Colonne lunghe: si espandono
         for i in [4, 5, 6]:
             header.setSectionResizeMode(i, QHeaderView.Stretch)
 
-        header.setStretchLastSection(True)
+        # Altezza di riga costante: la vista non misura il contenuto
+        rows = self.table.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(ROW_HEIGHT)
+        rows.hide()
 
-        # Abilita word wrap nelle celle (non sugli header)
-        self.table.setWordWrap(True)
+        # Testo su una riga sola (il contenuto completo è nel tooltip)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.ElideRight)
 
         # Impedisci che la tabella superi la larghezza del contenitore
         self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
@@ -41,23 +56,32 @@ class JournalWidget(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-    def add_entry(self, entry):
-        """
-        entry deve essere una lista/tupla con 8 valori:
-        [data, n_protocollo, n_documento, data_documento,
-         cliente/fornitore, descrizione, conto dare/avere, importo]
-        """
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        for col, value in enumerate(entry):
-            item = QTableWidgetItem(str(value))
-            item.setTextAlignment(Qt.AlignCenter)
-            item.setToolTip(str(value))  # mostra contenuto completo se troppo lungo
-            item.setFlags(Qt.ItemIsEnabled)  # non editabile
-            self.table.setItem(row, col, item)
-
-    def load_from_db(self, entries):
-        """Carica più righe dal DB (lista di tuple)."""
-        self.table.setRowCount(0)  # reset tabella
-        for entry in entries:
-            self.add_entry(entry)
+        # Nuove registrazioni (anche storni): solo le righe nuove, niente ricarica
+        self.posted.connect(self._on_posted)
+        listener = self.posted.emit
+        db.add_posting_listener(listener)
+        self.destroyed.connect(lambda: db.remove_posting_listener(listener))
+
+    def load_from_db(self):
+        """Ricarica la prima nota dal DB (prima pagina; le altre scorrendo)."""
+        self.bridge.cancel_all()
+        if self.service is None:
+            self.model.reload()
+            return
+        self.model.begin_loading()
+        self.bridge.then(self.service.submit(READ, self.model.first_page),
+                         self._on_first_page, on_error=self._on_page_error)
+
+    def _on_first_page(self, page):
+        self.model.prime(*page)
+        # registrazioni arrivate durante la lettura
+        self.model.refresh()
+        self.page_loaded.emit(None)
+
+    def _on_page_error(self, error):
+        self.model.abort_loading()
+        self.page_loaded.emit(error)
+
+    @Slot(object)
+    def _on_posted(self, entry_ids):
+        self.model.refresh()
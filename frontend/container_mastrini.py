@@ -0,0 +1,191 @@
+# frontend/container_mastrini.py
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QDateEdit, QLabel,
+                               QTableView, QHeaderView, QDialog, QTableWidget, QTableWidgetItem)
+from PySide6.QtCore import Qt, QDate
+
+from core.account_index import get_account_index
+from core.async_service import AsyncLedgerService
+from core.report_cache import ReportCache, ledger_version
+from frontend.async_bridge import FutureBridge
+from frontend.mastrino_model import MastrinoModel
+
+# righe per blocco letto dal thread di lavoro
+MASTRINO_CHUNK = 2000
+# mastrini recenti tenuti in memoria; oltre CACHE_MAX_ROWS righe non si salvano
+CACHE_ACCOUNTS = 16
+CACHE_MAX_ROWS = 100_000
+ROW_HEIGHT = 26
+
+class EntryDialog(QDialog):
+    """Dettaglio di una entry (intestazione e righe) aperto da una riga di mastrino."""
+
+    def __init__(self, entry: dict, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Entry {entry['id']} — protocollo {entry['protocol'] or ''}")
+        layout = QVBoxLayout(self)
+        header = [f"Data {entry['date']}"]
+        for label, key in (("Documento", "document"), ("Cliente/Fornitore", "party"),
+                           ("Descrizione", "description")):
+            if entry.get(key):
+                header.append(f"{label}: {entry[key]}")
+        if entry.get("reversal_of"):
+            header.append(f"Storno dell'entry {entry['reversal_of']}")
+        layout.addWidget(QLabel("\n".join(header)))
+
+        # poche righe: una QTableWidget basta
+        lines = QTableWidget(len(entry["lines"]), 3)
+        lines.setHorizontalHeaderLabels(["Conto", "Dare", "Avere"])
+        names = get_account_index().accounts()
+        for r, line in enumerate(entry["lines"]):
+            info = names.get(line["account_code"])
+            values = (f"{line['account_code']} {info.name if info else ''}",
+                      str(line["dare"]) if line["dare"] else "",
+                      str(line["avere"]) if line["avere"] else "")
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setFlags(Qt.ItemIsEnabled)
+                lines.setItem(r, c, item)
+        lines.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        lines.verticalHeader().hide()
+        layout.addWidget(lines)
+        self.resize(560, 300)
+
+class MastriniWidget(QWidget):
+    """
+    Mastrino del conto scelto: le pagine arrivano dal pool di AsyncLedgerService
+    e si aggiungono alla tabella una alla volta, con il saldo progressivo.
+    Cambiando conto o date il caricamento in corso viene abbandonato.
+    """
+
+    def __init__(self, service: AsyncLedgerService, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self.bridge = FutureBridge(self)
+        self.cache = ReportCache(max_entries=CACHE_ACCOUNTS)
+        self._generation = 0
+        self.model = MastrinoModel(self)
+
+        layout = QVBoxLayout(self)
+
+        # Scelta di conto e periodo
+        controls = QHBoxLayout()
+        self.account_box = QComboBox()
+        self.account_box.setEditable(True)
+        self.account_box.setInsertPolicy(QComboBox.NoInsert)
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(QDate(today.year(), 1, 1))
+        self.to_date = QDateEdit(QDate(today.year(), 12, 31))
+        for edit in (self.from_date, self.to_date):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+        controls.addWidget(self.account_box, 1)
+        controls.addWidget(self.from_date)
+        controls.addWidget(self.to_date)
+        layout.addLayout(controls)
+
+        # Tabella: larghezze e altezze fisse, nessuna misura del contenuto
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setAlternatingRowColors(True)
+        self.table.setWordWrap(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        rows = self.table.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(ROW_HEIGHT)
+        rows.hide()
+        self.table.doubleClicked.connect(self._open_entry)
+        layout.addWidget(self.table)
+
+        self.status = QLabel("Scegli un conto")
+        layout.addWidget(self.status)
+
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        self.load_accounts()
+        self.account_box.activated.connect(lambda _: self.reload())
+        self.from_date.dateChanged.connect(lambda _: self.reload())
+        self.to_date.dateChanged.connect(lambda _: self.reload())
+
+    def load_accounts(self):
+        """Conti foglia del piano dei conti (quelli con movimenti)."""
+        index = get_account_index()
+        self.account_box.clear()
+        for info in index.accounts().values():
+            if not index.children(info.code):
+                self.account_box.addItem(f"{info.code} {info.name}", info.code)
+
+    def reload(self):
+        code = self.account_box.currentData()
+        if code:
+            self.show_account(code)
+
+    def open_account(self, code: str, from_date: str, to_date: str):
+        """Mastrino di un conto su un periodo dato (drill-down dal bilancio)."""
+        for edit, value in ((self.from_date, from_date), (self.to_date, to_date)):
+            edit.blockSignals(True)
+            edit.setDate(QDate.fromString(value, "yyyy-MM-dd"))
+            edit.blockSignals(False)
+        self.account_box.setCurrentIndex(self.account_box.findData(code))
+        self.show_account(code)
+
+    # --- Caricamento --------------------------------------------------------
+
+    def show_account(self, code: str):
+        from_date = self.from_date.date().toString("yyyy-MM-dd")
+        to_date = self.to_date.date().toString("yyyy-MM-dd")
+        key = (code, from_date, to_date)
+
+        # abbandona il conto precedente: le pagine in coda si annullano,
+        # quella già in lettura arriva ma viene scartata (generazione vecchia)
+        self._generation += 1
+        self.bridge.cancel_all()
+
+        version = ledger_version()
+        cached = self.cache.get(key, version)
+        if cached is not None:
+            self.model.set_rows(cached)
+            self._show_saldo(code, done=True)
+            return
+        self.model.clear()
+        self.status.setText(f"{code}: caricamento…")
+        self._request(key, version, self._generation, after=None)
+
+    def _request(self, key, version, generation, after):
+        code, from_date, to_date = key
+        future = self.service.get_account_ledger_page(code, from_date, to_date,
+                                                      after=after, limit=MASTRINO_CHUNK)
+        self.bridge.then(future,
+                         lambda page: self._on_page(key, version, generation, page),
+                         on_error=lambda e: self._on_error(generation, e))
+
+    def _on_page(self, key, version, generation, page):
+        if generation != self._generation:
+            return
+        rows, cursor = page
+        self.model.append_rows(rows)
+        if cursor is not None:
+            self._show_saldo(key[0], done=False)
+            self._request(key, version, generation, after=cursor)
+            return
+        if self.model.rowCount() <= CACHE_MAX_ROWS:
+            self.cache.put(key, version, self.model.rows())
+        self._show_saldo(key[0], done=True)
+
+    def _on_error(self, generation, error):
+        if generation == self._generation:
+            self.status.setText(f"❌ Errore nel caricamento del mastrino: {error}")
+
+    def _open_entry(self, index):
+        row = self.model.row(index.row())
+        self.bridge.then(self.service.get_entry(row["entry_id"], row["date"]),
+                         lambda entry: EntryDialog(entry, self).exec() if entry else None,
+                         on_error=lambda e: self.status.setText(f"❌ Entry non leggibile: {e}"))
+
+    def _show_saldo(self, code: str, done: bool):
+        saldo = self.model.saldo()
+        text = f"{code}: {self.model.rowCount()} righe"
+        if saldo is not None:
+            text += f" — saldo {saldo}"
+        self.status.setText(text if done else text + " (caricamento…)")
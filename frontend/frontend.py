@@ -1,17 +1,49 @@
 import platform
-from PySide6.QtCore import QFile, QTextStream, Qt
-from PySide6.QtWidgets import QMainWindow, QSplitter, QTabWidget, QWidget, QVBoxLayout, QMenuBar, QStackedLayout, QPlainTextEdit, QHeaderView
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QFile, QTextStream, Qt, QTimer, Signal, Slot
+from PySide6.QtWidgets import QMainWindow, QSplitter, QTabWidget, QWidget, QVBoxLayout, QMenuBar, QStackedLayout
 from PySide6.QtGui import QShortcut, QKeySequence
-from frontend.widgets import SearchBar, HelpBrowser, TerminalWidget
+from frontend.widgets import SearchBar, HelpBrowser, TerminalWidget, LazyTab
+from backend import db
 from backend.dsl_parser import execute_command
-from backend.modules.help_logic import get_help_text, TIPS
+from backend.modules.help_logic import get_help_text, preload_tips
+from frontend.async_bridge import FutureBridge
 from frontend.container_journal import JournalWidget
-from backend import db
+from frontend.container_mastrini import MastriniWidget
+from frontend.container_bilancio import BilancioWidget
+from frontend.startup_timing import FIRST_PAINT, INTERACTIVE, StartupTimer
+from core.async_service import AsyncLedgerService
+
+# fasi da completare prima che la finestra sia interattiva
+STARTUP_STAGES = ("db", "journal_page", "help_tips")
 
 
 class ContaIDE(QMainWindow):
-    def __init__(self):
+    """
+    Finestra principale, avviata a fasi:
+
+    1. costruttore: solo la shell (menu, splitter, tab vuoti, help, terminale);
+    2. primo disegno: il DB si apre (migrazioni comprese) in un thread di
+       avvio; al termine il terminale si abilita e il tab visibile costruisce
+       il suo contenuto (gli altri alla prima apertura);
+    3. in background: prima pagina della prima nota e tips dell'help.
+
+    I tempi delle fasi sono in self.timer (vedi frontend.startup_timing).
+    """
+    # avanzamento delle migrazioni, emesso dal thread di avvio
+    migration_progress = Signal(object)
+
+    def __init__(self, timer: StartupTimer = None, report: bool = False,
+                 db_path: str = db.DB_PATH_DEFAULT):
         super().__init__()
+        self.timer = timer or StartupTimer()
+        self.report = report
+        self.db_path = db_path
+        self._pending_stages = set(STARTUP_STAGES)
+        # Letture e report del libro giornale fuori dal thread della GUI (dopo l'apertura del DB)
+        self.ledger_async = None
+
         # Shortcut globali UX
         # Journal
         QShortcut(QKeySequence("Ctrl+1"), self, activated=lambda: self.main_panel.setCurrentIndex(0))
@@ -29,7 +61,7 @@ class ContaIDE(QMainWindow):
         self.setWindowTitle("Accounting IDE")
         self.resize(1400, 800)
         
-        # Applica il tema di sistema
+        # Applica il tema di sistema (subito: la shell non deve comparire senza stile)
         self.apply_system_theme()
 
         # Menu bar
@@ -50,84 +82,26 @@ class ContaIDE(QMainWindow):
         self.main_panel = QTabWidget()
         self.main_panel.setMinimumWidth(300)  # larghezza minima in px
 
-        # Journal tab
-        self.journal_tab = JournalWidget()
-        header = self.journal_tab.table.horizontalHeader()
-        # Colonne corte: ResizeToContents
-        for i in [0, 1, 2, 3, 7]:
-            header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
-        # Colonne lunghe: Stretch
-        for i in [4, 5, 6]:
-            header.setSectionResizeMode(i, QHeaderView.Stretch)
-        header.setStretchLastSection(True)
-        self.journal_tab.table.setAlternatingRowColors(True)
-        self.journal_tab.table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1c1c1e;
-                alternate-background-color: #2c2c2e;
-                gridline-color: #3a3a3c;
-                selection-background-color: #0a84ff;
-                selection-color: #ffffff;
-                font-family: "SF Pro Text", "Helvetica Neue", "Arial", sans-serif;
-                font-size: 14px;
-            }
-            QHeaderView::section {
-                background-color: #2c2c2e;
-                color: #f5f5f7;
-                font-weight: 600;
-                border: none;
-                padding: 6px;
-            }
-        """)
-        self.main_panel.addTab(self.journal_tab, "Prima nota")
-        entries = db.get_journal_entries()
-        self.journal_tab.load_from_db(entries)
-
-        # Mastrini tab
-        mastrini_tab = QWidget()
-        mastrini_layout = QVBoxLayout(mastrini_tab)
-        mastrini_view = QPlainTextEdit()
-        mastrini_view.setObjectName("mastriniView")
-        mastrini_view.setReadOnly(True)
-        mastrini_view.setPlainText(
-            "📊 Mastrini (Conti)\n\n"
-            "Cassa:\n  Dare 1000 | Avere 0 | Saldo 1000\n\n"
-            "Banca:\n  Dare 0 | Avere 500 | Saldo -500\n\n"
-            "Clienti:\n  Dare 2000 | Avere 0 | Saldo 2000\n"
-        )
-        mastrini_layout.addWidget(mastrini_view)
-        self.main_panel.addTab(mastrini_tab, "Mastrini")
-        mastrini_layout.setContentsMargins(0, 0, 0, 0)
-        mastrini_layout.setSpacing(0)
-
-        # Bilancio tab
-        bilancio_tab = QWidget()
-        bilancio_layout = QVBoxLayout(bilancio_tab)
-        bilancio_view = QPlainTextEdit()
-        bilancio_view.setObjectName("bilancioView")
-        bilancio_view.setReadOnly(True)
-        bilancio_view.setPlainText(
-            "📈 Bilancio\n\n"
-            "Attività:\n  Cassa 1000\n  Clienti 2000\n\n"
-            "Passività:\n  Banca 500\n\n"
-            "Patrimonio Netto: 2500\n"
-        )
-        bilancio_layout.addWidget(bilancio_view)
-        self.main_panel.addTab(bilancio_tab, "Bilancio")
-        bilancio_layout.setContentsMargins(0, 0, 0, 0)
-        bilancio_layout.setSpacing(0)
+        # Tab: segnaposti, il contenuto si costruisce alla prima apertura
+        self.journal_tab = LazyTab(self._build_journal)
+        self.mastrini_tab = LazyTab(self._build_mastrini)
+        bilancio_tab = LazyTab(self._build_bilancio)
 
         # Salva i tab di default per reset
         self.default_tabs = [
             ("Prima nota", self.journal_tab),
-            ("Mastrini", mastrini_tab),
+            ("Mastrini", self.mastrini_tab),
             ("Bilancio", bilancio_tab),
         ]
-        # Help contestuale con searchbar + browser
+        for title, tab in self.default_tabs:
+            tab.built.connect(lambda _: self.timer.mark("first_tab"))
+            self.main_panel.addTab(tab, title)
+
+        # Help contestuale con searchbar + browser (suggerimenti quando arrivano i tips)
         help_widget = QWidget()
         help_layout = QVBoxLayout(help_widget)
 
-        self.searchbar = SearchBar(list(TIPS.keys()))
+        self.searchbar = SearchBar()
         self.searchbar.textChanged.connect(self.update_help)
 
         self.help_browser = HelpBrowser()
@@ -152,9 +126,12 @@ class ContaIDE(QMainWindow):
         self.top_splitter.setCollapsible(0, False)  # colonna sinistra non collassabile
         self.top_splitter.setCollapsible(1, True)   # help collassabile
     
-        # Terminale 
+        # Terminale: l'input si abilita quando il DB è aperto
         self.terminal = TerminalWidget()
         self.terminal.setMinimumHeight(150)
+        self._terminal_placeholder = self.terminal.input_line.placeholderText()
+        self.terminal.input_line.setEnabled(False)
+        self.terminal.input_line.setPlaceholderText("Apertura del file contabile...")
         main_splitter.addWidget(self.top_splitter)
         main_splitter.addWidget(self.terminal)
         main_splitter.setSizes([640, 240])
@@ -164,8 +141,146 @@ class ContaIDE(QMainWindow):
         main_splitter.setCollapsible(1, False)  # il terminale non collassabile
 
         self.setCentralWidget(main_splitter)
-        # Force focus to the terminal input line on startup
+
+        # Thread di avvio: tips dell'help subito, mentre la shell si disegna;
+        # apertura del DB dopo il primo disegno (open_ledger)
+        self.startup_bridge = FutureBridge(self)
+        self.startup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="contaide-startup")
+        self.startup_bridge.then(self.startup_pool.submit(preload_tips), self._on_help_tips,
+                                 on_error=self._on_help_tips_error)
+        self.migration_progress.connect(self._on_migration_progress)
+
+
+
+    # --- Avvio a fasi -------------------------------------------------------
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.timer.done(FIRST_PAINT):
+            self.timer.mark(FIRST_PAINT)
+            # il resto dell'avvio dopo che la shell è a schermo
+            QTimer.singleShot(0, self.open_ledger)
+
+
+
+    def open_ledger(self):
+        """Apre il DB nel thread di avvio: un aggiornamento lungo non blocca la finestra."""
+        future = self.startup_pool.submit(db.init_db, self.db_path,
+                                          progress=self.migration_progress.emit)
+        self.startup_bridge.then(future, self._on_ledger_open, on_error=self._on_ledger_error)
+        self.startup_pool.shutdown(wait=False)
+
+
+
+    @Slot(object)
+    def _on_migration_progress(self, p):
+        count = f" {p.done}/{p.total}" if p.total else ""
+        self.terminal.input_line.setPlaceholderText(
+            f"Aggiornamento del file contabile: migrazione {p.version:03d} {p.name} ({p.step}{count})...")
+
+
+
+    def _on_ledger_error(self, error):
+        self.terminal.input_line.setPlaceholderText("File contabile non disponibile")
+        self.terminal.write(f"❌ Impossibile aprire il file contabile: {error}")
+
+
+
+    def _on_ledger_open(self, _conn):
+        """DB pronto: servizi, terminale e tab che dipendono dal libro giornale."""
+        self.ledger_async = AsyncLedgerService()
+        self.terminal.input_line.setEnabled(True)
+        self.terminal.input_line.setPlaceholderText(self._terminal_placeholder)
         self.terminal.input_line.setFocus()
+        self._stage_done("db")
+        for _, tab in self.default_tabs:
+            tab.arm()
+
+
+
+    def _build_journal(self):
+        journal = JournalWidget(service=self.ledger_async)
+        journal.table.setAlternatingRowColors(True)
+        journal.table.setStyleSheet("""
+            QTableView {
+                background-color: #1c1c1e;
+                alternate-background-color: #2c2c2e;
+                gridline-color: #3a3a3c;
+                selection-background-color: #0a84ff;
+                selection-color: #ffffff;
+                font-family: "SF Pro Text", "Helvetica Neue", "Arial", sans-serif;
+                font-size: 14px;
+            }
+            QHeaderView::section {
+                background-color: #2c2c2e;
+                color: #f5f5f7;
+                font-weight: 600;
+                border: none;
+                padding: 6px;
+            }
+        """)
+        journal.page_loaded.connect(self._on_journal_page)
+        journal.load_from_db()
+        return journal
+
+
+
+    def _build_mastrini(self):
+        return MastriniWidget(self.ledger_async)
+
+
+
+    def _build_bilancio(self):
+        # doppio clic su un conto foglia -> mastrino -> entry
+        bilancio = BilancioWidget(self.ledger_async)
+        bilancio.account_activated.connect(self.open_mastrino)
+        return bilancio
+
+
+
+    def _on_journal_page(self, error):
+        if error is not None:
+            self.terminal.write(f"❌ Prima nota non caricata: {error}")
+        self._stage_done("journal_page")
+
+
+
+    def _on_help_tips(self, keys):
+        self.searchbar.set_suggestions(keys)
+        self._stage_done("help_tips")
+
+
+
+    def _on_help_tips_error(self, error):
+        self.terminal.write(f"❌ Tips dell'help non caricati: {error}")
+        self._stage_done("help_tips")
+
+
+
+    def _stage_done(self, stage: str):
+        self.timer.mark(stage)
+        if stage not in self._pending_stages:
+            return
+        self._pending_stages.discard(stage)
+        if not self._pending_stages:
+            self.timer.mark(INTERACTIVE)
+            if self.report:
+                print(self.timer.report(), file=sys.stderr)
+
+
+
+    def closeEvent(self, event):
+        # le letture in coda non servono più; quelle in corso finiscono da sole
+        if self.ledger_async is not None:
+            self.ledger_async.close(wait=False)
+        super().closeEvent(event)
+
+
+
+    def open_mastrino(self, code: str, from_date: str, to_date: str):
+        """Drill-down dal bilancio: porta in primo piano il mastrino del conto."""
+        self.main_panel.setCurrentWidget(self.mastrini_tab)
+        self.mastrini_tab.widget().open_account(code, from_date, to_date)
 
 
 
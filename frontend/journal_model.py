@@ -0,0 +1,197 @@
+# frontend/journal_model.py
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor, QFont
+
+from backend import db
+from core.journal import JOURNAL_PAGE_SIZE
+from core.models import JournalCursor
+
+HEADERS = [
+    "Data",
+    "N. protocollo",
+    "N. documento",
+    "Data documento",
+    "Cliente/Fornitore",
+    "Descrizione",
+    "Conto Dare/Avere",
+    "Importo",
+]
+# colonne lunghe: testo completo nel tooltip
+_TOOLTIP_COLUMNS = (4, 5, 6)
+_REVERSAL_COLOR = QColor("#8e8e93")
+
+
+def _key(row: dict) -> tuple:
+    return row["date"], row["entry_id"], row["line_id"]
+
+
+def _cell(row: dict, col: int) -> str:
+    if col == 6:
+        return f"{row['account_code']} {row['account_name']}"
+    value = (row["date"], row["protocol"], row["document"], row["document_date"],
+             row["party"], row["description"], None, row["importo"])[col]
+    return "" if value is None else str(value)
+
+
+class JournalModel(QAbstractTableModel):
+    """
+    Prima nota a caricamento progressivo.
+
+    La vista chiede canFetchMore/fetchMore quando si scorre verso il fondo e
+    il modello legge la pagina successiva con il cursore keyset dell'ultima
+    riga: aprire un giornale di molti anni legge solo la prima pagina.
+    Le righe restano i dict di core.journal; il testo delle celle si forma
+    in data(), cioè solo per le righe che la vista disegna.
+
+    refresh() aggiunge le entry registrate dopo l'ultima vista (id crescente)
+    nella loro posizione per data; quelle oltre l'ultima pagina caricata
+    arriveranno con fetchMore. Le entry stornate sono barrate e gli storni
+    in grigio.
+
+    All'avvio la prima pagina si legge fuori dal thread della GUI:
+    begin_loading() svuota il modello e sospende fetchMore/refresh,
+    first_page() gira nel worker e prime() inserisce il risultato.
+    """
+
+    def __init__(self, fetch_page=db.get_journal_page, page_size: int = JOURNAL_PAGE_SIZE,
+                 parent=None):
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._rows = []
+        self._cursor = None
+        self._at_end = False
+        self._loading = False
+        self._last_id = None        # letto insieme alla prima pagina
+        self._reversed = set()      # stornate dopo il caricamento della loro pagina
+        self._strike = QFont()
+        self._strike.setStrikeOut(True)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole or (role == Qt.ToolTipRole and index.column() in _TOOLTIP_COLUMNS):
+            return _cell(self._rows[index.row()], index.column())
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        row = self._rows[index.row()]
+        if role == Qt.FontRole and (row["reversed"] or row["entry_id"] in self._reversed):
+            return self._strike
+        if role == Qt.ForegroundRole and row["reversal_of"] is not None:
+            return QBrush(_REVERSAL_COLOR)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable if index.isValid() else Qt.NoItemFlags
+
+    def row(self, n: int) -> dict:
+        return self._rows[n]
+
+    # --- Caricamento a pagine ------------------------------------------------
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._at_end and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._at_end or self._loading:
+            return
+        if self._last_id is None:
+            self._last_id = db.last_entry_id()
+        rows, cursor = self._fetch_page(after=self._cursor, limit=self._page_size)
+        self._append(rows, cursor)
+
+    def _append(self, rows, cursor):
+        self._at_end = cursor is None
+        if rows:
+            last = rows[-1]
+            self._cursor = JournalCursor(last["date"], last["entry_id"], last["line_id"])
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def reload(self):
+        """Riparte dalla prima pagina (la vista richiama fetchMore da sé)."""
+        self._reset(loading=False)
+
+    def _reset(self, loading: bool):
+        self.beginResetModel()
+        # il flag va impostato prima di endResetModel: la vista chiede subito canFetchMore
+        self._rows, self._cursor, self._at_end, self._loading = [], None, False, loading
+        self._last_id, self._reversed = None, set()
+        self.endResetModel()
+
+    # --- Prima pagina in background ------------------------------------------
+
+    @property
+    def loading(self) -> bool:
+        return self._loading
+
+    def begin_loading(self):
+        """Come reload(), ma la prima pagina arriverà con prime()."""
+        self._reset(loading=True)
+
+    def first_page(self):
+        """
+        (righe, cursore, ultimo id) della prima pagina; non tocca il modello,
+        quindi gira in qualunque thread. L'id si legge prima della pagina: le
+        entry registrate in mezzo arrivano con refresh() e non si perdono.
+        """
+        last_id = db.last_entry_id()
+        rows, cursor = self._fetch_page(after=None, limit=self._page_size)
+        return rows, cursor, last_id
+
+    def prime(self, rows, cursor, last_id: int):
+        if not self._loading:
+            return
+        self._loading, self._last_id = False, last_id
+        self._append(rows, cursor)
+
+    def abort_loading(self):
+        """Lettura fallita: modello vuoto, senza ulteriori pagine."""
+        self._loading, self._at_end = False, True
+
+    # --- Aggiornamento incrementale -----------------------------------------
+
+    def refresh(self) -> int:
+        """Inserisce le entry registrate dopo l'ultima vista; restituisce le righe aggiunte."""
+        if self._loading or self._last_id is None:
+            return 0        # arriveranno con la prima pagina (e il refresh() dopo prime())
+        rows = db.get_journal_since(self._last_id)
+        if not rows:
+            return 0
+        self._last_id = max(self._last_id, rows[-1]["entry_id"])
+        added = sum(self._insert(row) for row in rows)
+        reversed_now = {r["reversal_of"] for r in rows if r["reversal_of"] is not None}
+        if reversed_now - self._reversed:
+            self._reversed |= reversed_now
+            # la vista ridisegna solo le righe visibili
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(max(0, len(self._rows) - 1), len(HEADERS) - 1),
+                                  [Qt.FontRole])
+        return added
+
+    def _insert(self, row: dict) -> bool:
+        key = _key(row)
+        pos = bisect_left(self._rows, key, key=_key)
+        if pos < len(self._rows) and _key(self._rows[pos]) == key:
+            return False       # già arrivata con una pagina
+        if pos == len(self._rows) and not self._at_end:
+            return False       # oltre l'ultima pagina: la porterà fetchMore
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self.endInsertRows()
+        return True
@@ -0,0 +1,71 @@
+# frontend/mastrino_model.py
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+HEADERS = ["Data", "N. documento", "Dare", "Avere", "Saldo"]
+_FIELDS = ("date", "document", "dare", "avere", "saldo")
+_AMOUNT_COLUMNS = (2, 3, 4)
+
+
+class MastrinoModel(QAbstractTableModel):
+    """
+    Righe di un mastrino (dict di LedgerService.get_account_ledger_page),
+    aggiunte a blocchi mentre arrivano dal thread di lavoro.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][_FIELDS[index.column()]]
+            if index.column() in (2, 3) and not value:
+                return ""
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole:
+            if index.column() in _AMOUNT_COLUMNS:
+                return int(Qt.AlignRight | Qt.AlignVCenter)
+            return int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable if index.isValid() else Qt.NoItemFlags
+
+    def rows(self) -> list:
+        return self._rows
+
+    def row(self, n: int) -> dict:
+        return self._rows[n]
+
+    def saldo(self):
+        """Saldo progressivo dell'ultima riga caricata (None se vuoto)."""
+        return self._rows[-1]["saldo"] if self._rows else None
+
+    def set_rows(self, rows: list):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def append_rows(self, rows: list):
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def clear(self):
+        self.set_rows([])
@@ -0,0 +1,82 @@
+# frontend/startup_timing.py
+"""
+Tempi dell'avvio a fasi della GUI.
+
+main.py legge l'orologio prima di ogni import pesante e passa il riferimento
+a StartupTimer; le fasi si segnano con mark() man mano che finiscono, anche
+da thread diversi. report() riassume:
+
+    primo disegno   finestra vuota (shell) disegnata la prima volta
+    interattiva     DB aperto, tab iniziale con i dati, help pronto
+
+Il resoconto va su stderr con --startup-report o CONTAIDE_STARTUP_REPORT=1.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+FIRST_PAINT = "first_paint"
+INTERACTIVE = "interactive"
+REPORT_FLAG = "--startup-report"
+REPORT_ENV = "CONTAIDE_STARTUP_REPORT"
+
+# etichette del resoconto; le fasi non elencate compaiono con il loro nome
+STAGE_LABELS = {
+    "qt_app": "QApplication",
+    "imports": "import frontend",
+    "shell": "finestra (shell)",
+    FIRST_PAINT: "primo disegno",
+    "db": "apertura DB",
+    "first_tab": "tab iniziale",
+    "journal_page": "prima pagina prima nota",
+    "help_tips": "tips dell'help",
+    INTERACTIVE: "interattiva",
+}
+
+
+def report_requested(argv: Sequence[str] = (), environ: Optional[Dict[str, str]] = None) -> bool:
+    environ = os.environ if environ is None else environ
+    return REPORT_FLAG in argv or environ.get(REPORT_ENV, "") not in ("", "0")
+
+
+class StartupTimer:
+
+    def __init__(self, started: Optional[float] = None, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock() if started is None else started
+        self._marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str) -> float:
+        """Segna la fine di una fase (solo la prima volta); restituisce i ms dall'avvio."""
+        now = self._clock()
+        with self._lock:
+            at = self._marks.setdefault(stage, now)
+        return (at - self.started) * 1000
+
+    def elapsed(self, stage: str) -> Optional[float]:
+        at = self._marks.get(stage)
+        return None if at is None else (at - self.started) * 1000
+
+    def done(self, *stages: str) -> bool:
+        return all(stage in self._marks for stage in stages)
+
+    def stages(self) -> List[tuple]:
+        """(fase, ms dall'avvio, ms dalla fase precedente) in ordine di tempo."""
+        with self._lock:
+            ordered = sorted(self._marks.items(), key=lambda item: item[1])
+        result, previous = [], self.started
+        for stage, at in ordered:
+            result.append((stage, (at - self.started) * 1000, (at - previous) * 1000))
+            previous = at
+        return result
+
+    def report(self) -> str:
+        lines = ["Avvio ContaIDE — ms dall'avvio (+ ms dalla fase precedente)"]
+        for stage, total, delta in self.stages():
+            lines.append(f"  {STAGE_LABELS.get(stage, stage):<26} {total:9.1f}  (+{delta:.1f})")
+        for stage, label in ((FIRST_PAINT, "time-to-first-paint"), (INTERACTIVE, "time-to-interactive")):
+            ms = self.elapsed(stage)
+            lines.append(f"{label}: " + ("n/d" if ms is None else f"{ms:.1f} ms"))
+        return "\n".join(lines)
@@ -0,0 +1,92 @@
+# frontend/terminal_output.py
+"""
+Uscita del terminale DSL a blocchi, con memoria limitata.
+
+OutputSpool non dipende da Qt: TerminalWidget gli passa il testo dei comandi
+e, a ogni giro del timer, ne preleva un blocco di righe da aggiungere con un
+solo appendPlainText. Un'uscita oltre spill_lines righe non entra nel
+terminale: va in un file temporaneo, il terminale ne mostra l'inizio e il
+resto si sfoglia a pagine (comando DSL "output N") leggendo dal file.
+"""
+import os
+import tempfile
+from collections import deque
+from itertools import islice
+from typing import Deque, List, Optional
+
+BATCH_LINES = 500           # righe per aggiornamento del documento
+SPILL_LINES = 2000          # oltre questa soglia l'uscita va su file
+PAGE_LINES = 200            # righe per pagina (anche anteprima di un'uscita su file)
+
+
+class OutputSpool:
+
+    def __init__(self, spill_lines: int = SPILL_LINES, page_lines: int = PAGE_LINES,
+                 spill_dir: Optional[str] = None):
+        if page_lines < 1 or spill_lines < page_lines:
+            raise ValueError("Serve 1 <= page_lines <= spill_lines")
+        self.spill_lines = spill_lines
+        self.page_lines = page_lines
+        self.spill_dir = spill_dir
+        self._pending: Deque[str] = deque()
+        self.spill_path: Optional[str] = None
+        self.spill_total = 0
+
+    # --- Ingresso ------------------------------------------------------------
+
+    def write(self, text: str):
+        """Accoda l'uscita di un comando (una o più righe)."""
+        lines = text.split("\n")
+        if len(lines) <= self.spill_lines:
+            self._pending.extend(lines)
+            return
+        self._spill(text, len(lines))
+        self._pending.extend(lines[:self.page_lines])
+        pages = self.page_count()
+        self._pending.append(
+            f"… {len(lines) - self.page_lines} righe non mostrate ({len(lines)} in tutto, "
+            f"{pages} pagine): 'output 2' per la pagina successiva, file completo in {self.spill_path}")
+
+    def _spill(self, text: str, total: int):
+        self.discard_spill()
+        fd, path = tempfile.mkstemp(prefix="contaide-output-", suffix=".txt", dir=self.spill_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.spill_path, self.spill_total = path, total
+
+    # --- Uscita --------------------------------------------------------------
+
+    def take(self, max_lines: int = BATCH_LINES) -> Optional[str]:
+        """Fino a max_lines righe in attesa, unite in un solo testo; None se non c'è niente."""
+        if not self._pending:
+            return None
+        n = min(max_lines, len(self._pending))
+        return "\n".join(self._pending.popleft() for _ in range(n))
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def clear(self):
+        self._pending.clear()
+
+    # --- Pagine dell'ultima uscita su file -------------------------------------
+
+    def page_count(self) -> int:
+        return -(-self.spill_total // self.page_lines) if self.spill_path else 0
+
+    def page(self, n: int) -> List[str]:
+        """Righe della pagina n (da 1) dell'ultima uscita su file, lette dal disco."""
+        if not self.spill_path or not 1 <= n <= self.page_count():
+            return []
+        start = (n - 1) * self.page_lines
+        with open(self.spill_path, encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in islice(f, start, start + self.page_lines)]
+
+    def discard_spill(self):
+        """Elimina il file dell'uscita precedente (ne resta al più uno)."""
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+        self.spill_path, self.spill_total = None, 0
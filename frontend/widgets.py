@@ -1,15 +1,65 @@
 from PySide6.QtWidgets import QLineEdit, QCompleter, QPlainTextEdit, QTextBrowser, QLabel, QWidget, QVBoxLayout, QApplication, QSplitter
-from PySide6.QtCore import Qt, QStringListModel
-from backend.dsl_parser import COMMANDS, execute_command
+from PySide6.QtCore import Qt, QStringListModel, QTimer, Signal
+from backend.dsl_parser import COMMANDS, execute_command, suggest_accounts
+from frontend.terminal_output import BATCH_LINES, OutputSpool
+
+# righe (blocchi) tenute nel terminale: le più vecchie escono in testa
+TERMINAL_SCROLLBACK = 10000
+# intervallo fra un blocco di uscita e il successivo
+FLUSH_INTERVAL_MS = 15
 
 class SearchBar(QLineEdit):
-    def __init__(self, suggestions: list[str]):
+    def __init__(self, suggestions: list[str] = ()):
         super().__init__()
         self.setPlaceholderText("🔍 Cerca causale o comando DSL...")
-        completer = QCompleter(suggestions)
+        self.suggestions_model = QStringListModel(list(suggestions), self)
+        completer = QCompleter(self.suggestions_model, self)
         completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.setCompleter(completer)
 
+    def set_suggestions(self, suggestions: list[str]):
+        """Suggerimenti arrivati dopo la costruzione (i tips si caricano in background)."""
+        self.suggestions_model.setStringList(list(suggestions))
+
+
+class LazyTab(QWidget):
+    """
+    Segnaposto di un tab: il contenuto si costruisce con factory() alla prima
+    apparizione, e solo dopo arm() (il DB deve essere aperto). Split e reset
+    spostano il segnaposto, che resta lo stesso anche dopo la costruzione.
+    """
+    built = Signal(object)
+
+    def __init__(self, factory, parent=None):
+        super().__init__(parent)
+        self._factory = factory
+        self._widget = None
+        self._armed = False
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.setSpacing(0)
+
+    def arm(self):
+        self._armed = True
+        if self.isVisible():
+            self.widget()
+
+    def is_built(self) -> bool:
+        return self._widget is not None
+
+    def widget(self) -> QWidget:
+        """Il contenuto del tab, costruito ora se serve."""
+        if self._widget is None:
+            self._widget = self._factory()
+            self._layout.addWidget(self._widget)
+            self.built.emit(self._widget)
+        return self._widget
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._armed:
+            self.widget()
+
 
 class HelpBrowser(QTextBrowser):
     def __init__(self):
@@ -67,7 +117,7 @@ class TerminalInput(QLineEdit):
 
 
 class TerminalWidget(QWidget):
-    def __init__(self):
+    def __init__(self, scrollback: int = TERMINAL_SCROLLBACK, batch_lines: int = BATCH_LINES):
         super().__init__()
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)   # niente margini
@@ -88,6 +138,18 @@ class TerminalWidget(QWidget):
             }
         """)
         self.output_area.setFont(default_font)
+        # scrollback limitato: memoria costante anche dopo molti comandi
+        self.output_area.setMaximumBlockCount(scrollback)
+
+        # Uscita a blocchi: un appendPlainText per giro di timer, non uno per riga
+        self.batch_lines = batch_lines
+        self.spool = OutputSpool()
+        self.output_page = 1
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush_output)
+        spool = self.spool
+        self.destroyed.connect(lambda: spool.discard_spill())
 
         self.history = []
         self.history_index = -1
@@ -111,37 +173,80 @@ class TerminalWidget(QWidget):
 
        
 
-        # Autocomplete
-        completer = QCompleter(COMMANDS, self)
+        # Autocomplete: comandi per il primo token, codici conto per gli argomenti
+        self.completion_model = QStringListModel(COMMANDS, self)
+        completer = QCompleter(self.completion_model, self)
         completer.setCaseSensitivity(Qt.CaseInsensitive)
         completer.setFilterMode(Qt.MatchStartsWith)
         completer.setCompletionMode(QCompleter.PopupCompletion)
         self.input_line.setCompleter(completer)
+        self.input_line.textEdited.connect(self.update_completions)
 
         layout.addWidget(self.output_area)
         layout.addWidget(self.input_line)
 
+    def update_completions(self, text: str):
+        head, sep, last = text.rpartition(" ")
+        if not sep:
+            self.completion_model.setStringList(COMMANDS)
+            return
+        # l'indice dei conti è in memoria: nessuna query per tasto premuto
+        self.completion_model.setStringList([f"{head} {code}" for code in suggest_accounts(last)])
+
+    def write(self, text: str):
+        """Accoda testo all'uscita; compare a blocchi (vedi frontend.terminal_output)."""
+        spilled = self.spool.spill_path
+        self.spool.write(text)
+        if self.spool.spill_path != spilled:
+            self.output_page = 1
+        if not self.flush_timer.isActive():
+            self.flush_output()
+            self.flush_timer.start()
+
+    def flush_output(self):
+        chunk = self.spool.take(self.batch_lines)
+        if chunk is None:
+            self.flush_timer.stop()
+            return
+        self.output_area.appendPlainText(chunk)
+
+    def show_output_page(self, page=None):
+        """Pagina dell'ultima uscita salvata su file (senza numero: la successiva)."""
+        total = self.spool.page_count()
+        if not total:
+            self.write("ℹ️ Nessuna uscita lunga da sfogliare.")
+            return
+        page = page or min(self.output_page + 1, total)
+        lines = self.spool.page(page)
+        if not lines:
+            self.write(f"❌ Pagina {page} inesistente: l'ultima uscita ha {total} pagine.")
+            return
+        self.output_page = page
+        self.write("\n".join(lines) + f"\n— pagina {page}/{total} —")
+
     def run_command(self):
         cmd = self.input_line.text().strip()
         if cmd:
             result = execute_command(cmd)
 
             # stampa sempre il comando digitato
-            self.output_area.appendPlainText(f"> {cmd}")
+            self.write(f"> {cmd}")
 
             if isinstance(result, dict):
                 action = result.get("action")
                 if action == "split":
                     self.window().show_split(result["left"], result["right"])
-                    self.output_area.appendPlainText(f"🔀 Split {result['left']} and {result['right']}")
+                    self.write(f"🔀 Split {result['left']} and {result['right']}")
                 elif action == "unsplit":
                     self.window().reset_split()
-                    self.output_area.appendPlainText("↩️ Vista tab ripristinata")
+                    self.write("↩️ Vista tab ripristinata")
+                elif action == "output":
+                    self.show_output_page(result["page"])
             else:
-                self.output_area.appendPlainText(str(result))
+                self.write(str(result))
 
 
-            self.output_area.appendPlainText("")  # riga vuota per separare
+            self.write("")  # riga vuota per separare
             # aggiorna lo storico
             self.history.append(cmd)
             self.history_index = len(self.history)
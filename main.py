@@ -1,11 +1,28 @@
 import sys
-from backend import db
-from PySide6.QtWidgets import QApplication
-from frontend.frontend import ContaIDE   # importa dalla folder frontend
+import time
 
-if __name__ == "__main__":
-    db.init_db()
-    app = QApplication(sys.argv)
-    window = ContaIDE()
+# prima di ogni import pesante: è lo zero del resoconto di avvio
+STARTED = time.perf_counter()
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    from frontend.startup_timing import StartupTimer, report_requested
+    timer = StartupTimer(started=STARTED)
+
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(argv)
+    timer.mark("qt_app")
+
+    from frontend.frontend import ContaIDE   # importa dalla folder frontend
+    timer.mark("imports")
+
+    # DB, tab e dati arrivano dopo il primo disegno (vedi ContaIDE)
+    window = ContaIDE(timer=timer, report=report_requested(argv))
     window.show()
-    sys.exit(app.exec())
+    timer.mark("shell")
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
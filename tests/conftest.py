@@ -18,3 +18,10 @@ def tmp_db(tmp_path):
     DBManager.close()
     if os.path.exists(db_file):
         os.remove(db_file)
+
+@pytest.fixture(scope="session")
+def qt_app():
+    """QApplication senza display, per i modelli Qt del frontend (salta se manca PySide6)."""
+    widgets = pytest.importorskip("PySide6.QtWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return widgets.QApplication.instance() or widgets.QApplication([])
@@ -0,0 +1,80 @@
+# --- tests/test_account_index.py ---------------------------------------------
+import sqlite3
+import pytest
+from db.db_manager import DBManager
+from core.account_index import get_account_index
+from core.models import EntryDTO, LineDTO
+from core import validator
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def index(tmp_db):
+    return get_account_index()
+
+def _count_account_scans(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    return statements
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_index_exposes_chart(index):
+    cassa = index.get("1431")
+    assert cassa.name == "Cassa"
+    assert cassa.account_class == "A"
+    assert cassa.parent_code == "1430"
+    assert "1432" in index.children("1430")
+    assert "1000" in index.children(None)
+
+def test_index_loads_once(index):
+    index.codes()
+    conn = DBManager.connect()
+    statements = _count_account_scans(conn)
+    try:
+        dto = EntryDTO(date="2025-12-01", lines=[LineDTO("1431", dare=1.0), LineDTO("4100", avere=1.0)])
+        for _ in range(50):
+            assert validator.validate_accounts_exist(dto) == []
+    finally:
+        conn.set_trace_callback(None)
+    assert not any("FROM accounts" in s for s in statements)
+
+def test_search_by_code_and_name(index):
+    assert [a.code for a in index.search("143")] == ["1430", "1431", "1432"]
+    assert any(a.code == "1432" for a in index.search("banca"))
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_index_follows_insert_update_delete(index):
+    assert "5000" not in index
+    conn = DBManager.connect()
+    conn.execute("INSERT INTO accounts (code, name, class, parent_code) VALUES ('5000', 'Nuovo', 'C', NULL)")
+    conn.commit()
+    assert "5000" in index
+
+    conn.execute("UPDATE accounts SET name = 'Rinominato' WHERE code = '5000'")
+    conn.commit()
+    assert index.get("5000").name == "Rinominato"
+
+    conn.execute("DELETE FROM accounts WHERE code = '5000'")
+    conn.commit()
+    assert "5000" not in index
+
+def test_index_sees_other_connection_writes(index, tmp_db):
+    assert "5100" not in index
+    other = sqlite3.connect(str(tmp_db))
+    other.execute("INSERT INTO accounts (code, name, class, parent_code) VALUES ('5100', 'Esterno', 'C', NULL)")
+    other.commit()
+    other.close()
+    assert "5100" in index
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_validator_uses_fresh_index(index):
+    dto = EntryDTO(date="2025-12-01", lines=[LineDTO("5200", dare=1.0), LineDTO("4100", avere=1.0)])
+    assert any(e.code.name == "INVALID_ACCOUNT" for e in validator.validate(dto))
+
+    conn = DBManager.connect()
+    conn.execute("INSERT INTO accounts (code, name, class, parent_code) VALUES ('5200', 'Servizi', 'C', NULL)")
+    conn.commit()
+    assert validator.validate(dto) == []
@@ -72,10 +72,11 @@ def test_trial_balance_includes_all_accounts(tmp_db):
     # Inserisci entry
     cur.execute("INSERT INTO entries(date) VALUES (?)", ("2025-12-01",))
     entry_id = cur.lastrowid
-    cur.execute("INSERT INTO entry_lines(entry_id, account_code, dare, avere) VALUES (?,?,?,?)",
-                (entry_id, "9100", 100.0, 0.0))
-    cur.execute("INSERT INTO entry_lines(entry_id, account_code, dare, avere) VALUES (?,?,?,?)",
-                (entry_id, "9000", 0.0, 100.0))
+    # gli importi sono salvati in centesimi; dare/avere sono colonne calcolate in euro
+    cur.execute("INSERT INTO entry_lines(entry_id, account_code, dare_cents, avere_cents) VALUES (?,?,?,?)",
+                (entry_id, "9100", 10000, 0))
+    cur.execute("INSERT INTO entry_lines(entry_id, account_code, dare_cents, avere_cents) VALUES (?,?,?,?)",
+                (entry_id, "9000", 0, 10000))
     conn.commit()
 
     # Calcolo saldo (trial balance)
@@ -0,0 +1,152 @@
+# --- tests/test_archive.py ---------------------------------------------------
+import os
+import sqlite3
+import pytest
+from db import archive
+from db.db_manager import DBManager
+from core import audit
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.ledger_service import LedgerService
+from core.period_service import PeriodService
+from core.trial_balance import TrialBalanceService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def service(tmp_db):
+    return LedgerService()
+
+@pytest.fixture
+def history(tmp_db):
+    """Vendite a metà e fine mese su 2023 e 2024; il 2023 è chiuso."""
+    engine = PostingEngine()
+    for year in (2023, 2024):
+        engine.post_many([_sale(f"{year}-{m:02d}-{d:02d}", 10.0 * m + d)
+                          for m in range(1, 13) for d in (10, 28)], user_id="tester")
+    periods = PeriodService()
+    for m in range(1, 13):
+        periods.close_month(2023, m, user_id="tester")
+    periods.close_year(2023, user_id="tester")
+    return tmp_db
+
+def _sale(day, amount):
+    return EntryDTO(date=day, documento=f"FAT-{day}",
+                    lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _snapshot(service):
+    ledger = service.get_account_ledger("1431", "2023-01-01", "2024-12-31")
+    balances = [service.get_account_balance("1431", a, b)
+                for a, b in (("2023-03-15", "2024-02-20"), ("2023-12-15", "2024-01-15"),
+                             ("2023-05-01", "2023-05-31"), ("2024-01-01", "2024-12-31"))]
+    totals = TrialBalanceService().compute("2023-02-12", "2024-11-12")
+    return ledger, balances, totals
+
+def _live_count(table):
+    return DBManager.connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_archive_path():
+    assert archive.archive_path("/dati/contaIDE.db", 2019) == "/dati/contaIDE.2019.db"
+
+def test_segments_split_archived_years():
+    assert archive.segments("2022-06-01", "2025-03-01") == [("main", "2022-06-01", "2025-03-01")]
+    assert archive.segments("2022-06-01", "2025-03-01", {2023}) == [
+        ("main", "2022-06-01", "2022-12-31"),
+        ("archive_2023", "2023-01-01", "2023-12-31"),
+        ("main", "2024-01-01", "2025-03-01"),
+    ]
+    assert archive.segments("2023-02-01", "2023-01-01", {2023}) == []
+
+def test_qualify_rewrites_archived_tables():
+    sql = "SELECT * FROM entries e CROSS JOIN entry_lines el ON el.entry_id = e.id"
+    assert archive.qualify(sql, "main") == sql
+    assert archive.qualify(sql, "archive_2023") == (
+        "SELECT * FROM archive_2023.entries e CROSS JOIN archive_2023.entry_lines el ON el.entry_id = e.id")
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_open_year_is_refused(history):
+    res = PeriodService().archive_year(2024)
+    assert res["success"] is False
+    assert "non è chiuso" in res["errors"][0]
+    assert not os.path.exists(archive.archive_path(str(history), 2024))
+
+def test_archive_twice_is_refused(history):
+    assert PeriodService().archive_year(2023)["success"]
+    res = PeriodService().archive_year(2023)
+    assert res["success"] is False
+    assert "già archiviato" in res["errors"][0]
+
+def test_interrupted_attempt_is_repeatable(history):
+    # resti di un tentativo interrotto prima della registrazione
+    path = archive.archive_path(str(history), 2023)
+    for leftover in (path, path + ".tmp"):
+        with open(leftover, "wb") as f:
+            f.write(b"incompleto")
+    assert PeriodService().archive_year(2023)["success"]
+    assert not os.path.exists(path + ".tmp")
+
+def test_missing_archive_file_is_an_error(history):
+    result = DBManager.archive_year(2023)
+    DBManager.close()
+    os.remove(result.path)
+    with pytest.raises(FileNotFoundError):
+        with DBManager.reader():
+            pass
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_archive_moves_rows_out_of_live_file(history):
+    entries, lines, audit_rows = (_live_count(t) for t in archive.ARCHIVED_TABLES)
+    result = DBManager.archive_year(2023, vacuum=True)
+    assert (result.entries, result.lines, result.audit_rows) == (24, 48, 24)
+    assert (_live_count("entries"), _live_count("entry_lines"), _live_count("audit_log")) == (
+        entries - 24, lines - 48, audit_rows - 24)
+    assert DBManager.connect().execute(
+        "SELECT COUNT(*) FROM entries WHERE date < '2024-01-01'").fetchone()[0] == 0
+    # il file di archivio è un DB autonomo, con i propri indici
+    conn = sqlite3.connect(result.path)
+    assert conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 24
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_entries_date", "idx_entry_lines_account_date", "idx_entry_lines_entry"} <= indexes
+    conn.close()
+
+def test_reads_are_unchanged_after_archiving(history, service):
+    before = _snapshot(service)
+    assert PeriodService().archive_year(2023)["success"]
+    assert _snapshot(service) == before
+
+def test_ledger_pages_cross_the_archive(history, service):
+    full = service.get_account_ledger("1431", "2023-01-01", "2024-12-31")
+    DBManager.archive_year(2023)
+    pages = list(service.iter_account_ledger("1431", "2023-01-01", "2024-12-31", page_size=7))
+    assert [row for page in pages for row in page] == full
+    assert len(pages[3]) == 7        # pagina a cavallo tra archivio e file principale
+
+def test_readers_attach_archives_read_only(history):
+    DBManager.archive_year(2023)
+    with DBManager.reader() as conn:
+        assert archive.archived_years(conn) == [2023]
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM archive_2023.entries")
+    with DBManager.report_session() as session:
+        with session.connection() as conn:
+            assert archive.archived_years(conn) == [2023]
+    # il writer resta sul solo file principale
+    assert archive.archived_years(DBManager.connect()) == []
+
+def test_rebuild_keeps_archived_months(history, service):
+    DBManager.archive_year(2023)
+    before = service.get_account_balance("1431", "2023-01-01", "2024-12-31")
+    service.rebuild_balances()
+    assert service.get_account_balance("1431", "2023-01-01", "2024-12-31") == before
+
+def test_archived_entries_keep_audit(history):
+    result = DBManager.archive_year(2023)
+    conn = sqlite3.connect(result.path)
+    payload = conn.execute("SELECT payload FROM audit_log ORDER BY id LIMIT 1").fetchone()[0]
+    conn.close()
+    assert audit.decode_payload(payload)["entry"]["documento"] == "FAT-2023-01-10"
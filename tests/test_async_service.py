@@ -0,0 +1,147 @@
+# --- tests/test_async_service.py ---------------------------------------------
+import asyncio
+import threading
+import pytest
+from concurrent.futures import CancelledError
+from core.async_service import AsyncLedgerService, READ, REPORT, WRITE
+from core.ledger_service import LedgerService
+from core.models import EntryDTO, LineDTO
+from db.db_manager import DBManager
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def svc(tmp_db):
+    service = AsyncLedgerService(limits={READ: 2, REPORT: 1, WRITE: 1})
+    yield service
+    service.close()
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _blocker(gate: threading.Event, started: threading.Event = None):
+    def run():
+        if started is not None:
+            started.set()
+        assert gate.wait(5)
+        return "ok"
+    return run
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_default_limits_follow_pool(tmp_db):
+    with AsyncLedgerService() as service:
+        readers = DBManager.current().max_readers
+        assert service.limits == {READ: readers, REPORT: max(1, readers // 2), WRITE: 1}
+
+def test_post_and_read(svc):
+    assert svc.post(_sale("2025-01-10", 10.0), user_id="tester").result(5).success
+    saldo = svc.get_account_balance("1431", "2025-01-01", "2025-12-31").result(5)["saldo"]
+    assert saldo == 1000
+    rows, cursor = svc.get_account_ledger_page("1431", "2025-01-01", "2025-12-31").result(5)
+    assert len(rows) == 1 and cursor is None
+    assert len(svc.get_entry(rows[0]["entry_id"], rows[0]["date"]).result(5)["lines"]) == 2
+    assert svc.balance_tree("2025-01-01", "2025-12-31").result(5)["1430"].saldo == 1000
+
+def test_cap_per_kind(svc):
+    gate = threading.Event()
+    futures = [svc.submit(READ, _blocker(gate)) for _ in range(5)]
+    assert svc.running(READ) == 2 and svc.pending(READ) == 3
+    # i tipi non si contendono i posti: la scrittura parte comunque
+    assert svc.post(_sale("2025-01-10", 1.0), user_id="tester").result(5).success
+    gate.set()
+    assert [f.result(5) for f in futures] == ["ok"] * 5
+    assert svc.running(READ) == 0
+
+def test_cancel_queued_report(svc):
+    gate, started = threading.Event(), threading.Event()
+    first = svc.submit(REPORT, _blocker(gate, started))
+    assert started.wait(5)
+    queued = svc.trial_balance("2025-01-01", "2025-12-31")
+    assert queued.cancel()
+    assert first.cancel() is False             # già in esecuzione
+    gate.set()
+    assert first.result(5) == "ok"
+    with pytest.raises(CancelledError):
+        queued.result(5)
+    assert svc.pending(REPORT) == 0
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_invalid_kind_and_limits(tmp_db):
+    with pytest.raises(ValueError):
+        AsyncLedgerService(limits={WRITE: 0})
+    with AsyncLedgerService() as service:
+        with pytest.raises(ValueError):
+            service.submit("bulk", lambda: None)
+
+def test_exception_reaches_future(svc):
+    def boom():
+        raise RuntimeError("rotto")
+    with pytest.raises(RuntimeError, match="rotto"):
+        svc.submit(READ, boom).result(5)
+    # il posto viene liberato anche dopo un errore
+    assert svc.submit(READ, lambda: 1).result(5) == 1
+
+def test_cancel_pending_and_close(svc):
+    gate = threading.Event()
+    running = svc.submit(REPORT, _blocker(gate))
+    queued = [svc.get_account_ledger("1431", "2025-01-01", "2025-12-31") for _ in range(3)]
+    assert svc.cancel_pending(REPORT) == 3
+    assert all(f.cancelled() for f in queued)
+    gate.set()
+    svc.close()
+    assert running.result() == "ok"
+    with pytest.raises(RuntimeError):
+        svc.submit(READ, lambda: None)
+
+def test_services_keep_constructor_db(tmp_db, tmp_path):
+    with AsyncLedgerService() as service:
+        first = DBManager.current()
+        assert service.post(_sale("2025-01-10", 10.0), user_id="tester").result(5).success
+        # cambio di file dopo la costruzione: limiti e servizi restano sul primo DB
+        DBManager.configure(str(tmp_path / "altra.db"))
+        DBManager.initialize()
+        assert DBManager.current() is not first
+        assert service.ledger.db is first
+        saldo = service.get_account_balance("1431", "2025-01-01", "2025-12-31").result(5)["saldo"]
+        assert saldo == 1000
+        assert service.balance_tree("2025-01-01", "2025-12-31").result(5)["1430"].saldo == 1000
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_asyncio_callers(svc):
+    async def main():
+        posted = await asyncio.gather(*(asyncio.wrap_future(svc.post(_sale(f"2025-01-{d:02d}", 5.0), "tester"))
+                                        for d in range(1, 11)))
+        balance, tb = await asyncio.gather(
+            asyncio.wrap_future(svc.get_account_balance("1431", "2025-01-01", "2025-12-31")),
+            asyncio.wrap_future(svc.trial_balance("2025-01-01", "2025-12-31")))
+        return posted, balance, tb
+    posted, balance, tb = asyncio.run(main())
+    assert all(r.success for r in posted)
+    # scritture serializzate: protocolli tutti distinti
+    assert len({r.protocol for r in posted}) == 10
+    assert balance["saldo"] == 5000 and tb.is_balanced
+
+def test_asyncio_cancel_drops_queued_report(svc):
+    gate = threading.Event()
+    svc.submit(REPORT, _blocker(gate))
+    queued = svc.trial_balance("2025-01-01", "2025-12-31")
+
+    async def main():
+        task = asyncio.ensure_future(asyncio.wrap_future(queued))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(main())
+    gate.set()
+    assert queued.cancelled()
+
+def test_report_in_session_sees_snapshot(svc):
+    svc.post(_sale("2025-01-10", 10.0), user_id="tester").result(5)
+    with DBManager.report_session() as session:
+        LedgerService().engine.post(_sale("2025-01-11", 7.0), user_id="tester")
+        rows = svc.get_account_ledger("1431", "2025-01-01", "2025-12-31", session=session).result(5)
+    assert len(rows) == 1
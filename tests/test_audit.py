@@ -0,0 +1,134 @@
+# --- tests/test_audit.py -----------------------------------------------------
+import json
+import pytest
+from db.db_manager import DBManager
+from core import audit
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def engine(tmp_db):
+    return PostingEngine()
+
+def _entry(n=1, lines=2):
+    amount = 100.0 + n
+    rows = [LineDTO("1431", dare=amount)] + [LineDTO("4100", avere=amount / (lines - 1))
+                                             for _ in range(lines - 1)]
+    return EntryDTO(date="2025-03-10", documento=f"FAT-{n}", cliente_fornitore="Cliente A",
+                    descrizione=f"Vendita {n}", lines=rows, client_reference_id=f"imp-{n}")
+
+def _legacy_payload(entry, user_id):
+    # formato scritto dal PostingEngine originale: importi in euro
+    lines = [{"account_id": line.account_id, "dare": float(line.dare.to_decimal()),
+              "avere": float(line.avere.to_decimal())} for line in entry.lines]
+    return json.dumps({
+        "entry": entry.__dict__,
+        "lines": lines,
+        "user": user_id,
+        "timestamp": "2025-03-10T10:00:00+00:00",
+    }, default=str)
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_roundtrip():
+    entry = _entry()
+    decoded = audit.decode_payload(audit.encode_payload(entry, "tester", timestamp="2025-03-10T10:00:00"))
+    assert decoded["format"] == audit.FORMAT_VERSION
+    assert decoded["entry"]["documento"] == "FAT-1"
+    assert decoded["entry"]["is_sale"] is False
+    assert "protocollo" not in decoded["entry"]          # None non viene scritto
+    assert "lines" not in decoded["entry"]               # righe una sola volta
+    assert decoded["lines"] == [{"account": "1431", "dare": 10100, "avere": 0},
+                                {"account": "4100", "dare": 0, "avere": 10100}]
+    assert decoded["user"] == "tester"
+    assert decoded["timestamp"] == "2025-03-10T10:00:00"
+
+def test_payload_is_smaller_than_legacy():
+    entry = _entry(lines=6)
+    new = audit.encode_payload(entry, "tester")
+    old = _legacy_payload(entry, "tester").encode("utf-8")
+    assert len(new) * 2 < len(old)
+
+def test_decode_legacy_euros():
+    entry = _entry()
+    decoded = audit.decode_payload(_legacy_payload(entry, "tester"))
+    assert decoded["format"] == 1
+    assert decoded["entry"]["descrizione"] == "Vendita 1"
+    assert "lines" not in decoded["entry"]
+    assert [(l["account"], l["dare"], l["avere"]) for l in decoded["lines"]] == [
+        ("1431", 10100, 0), ("4100", 0, 10100)]
+    assert decoded["timestamp"] == "2025-03-10T10:00:00+00:00"
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_decode_legacy_float_euros():
+    # payload scritti prima dei centesimi interi: importi float in euro
+    payload = json.dumps({"entry": {"date": "2024-01-05", "lines": "[LineDTO(...)]"},
+                          "lines": [{"account_id": "1431", "dare": 12.34, "avere": 0.0}],
+                          "user": "old", "timestamp": "2024-01-05T09:00:00"})
+    decoded = audit.decode_payload(payload)
+    assert decoded["lines"] == [{"account": "1431", "dare": 1234, "avere": 0}]
+    assert decoded["entry"] == {"date": "2024-01-05"}
+
+def test_decode_legacy_storno_decimal_strings():
+    # storni della versione iniziale: Decimal in euro serializzati da default=str
+    payload = json.dumps({"entry": {"date": "2024-02-01", "descrizione": "STORNO ENTRY 3",
+                                    "reversal_of": 3},
+                          "lines": [{"account_id": "4100", "dare": "10.1", "avere": "0"},
+                                    {"account_id": "1431", "dare": "0", "avere": "10.1"}],
+                          "user": "old", "timestamp": "2024-02-01T09:00:00"})
+    decoded = audit.decode_payload(payload)
+    assert decoded["lines"] == [{"account": "4100", "dare": 1010, "avere": 0},
+                                {"account": "1431", "dare": 0, "avere": 1010}]
+    assert decoded["entry"]["reversal_of"] == 3
+
+def test_decode_legacy_int_euros():
+    # il motore originale scriveva gli importi come li riceveva: dare=100 sono 100 euro
+    payload = json.dumps({"entry": {"date": "2024-03-01"},
+                          "lines": [{"account_id": "1431", "dare": 100, "avere": 0},
+                                    {"account_id": "4100", "dare": 0, "avere": 100}],
+                          "user": "old", "timestamp": "2024-03-01T09:00:00"})
+    decoded = audit.decode_payload(payload)
+    assert decoded["lines"] == [{"account": "1431", "dare": 10000, "avere": 0},
+                                {"account": "4100", "dare": 0, "avere": 10000}]
+
+def test_decode_null_payload():
+    assert audit.decode_payload(None)["lines"] == []
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_post_writes_compressed_blob(tmp_db, engine):
+    res = engine.post(_entry(), user_id="tester")
+    with DBManager.reader() as conn:
+        kind = conn.execute("SELECT typeof(payload) FROM audit_log WHERE entry_id=?",
+                            (res.entry_id,)).fetchone()[0]
+    assert kind == "blob"
+    (record,) = audit.get_audit_records(res.entry_id)
+    assert record.action == "POST"
+    assert record.user_id == "tester"
+    assert record.entry["client_reference_id"] == "imp-1"
+
+def test_post_many_payloads(tmp_db, engine):
+    for atomic in (True, False):
+        results = engine.post_many([_entry(n) for n in range(10)] + [_entry(3)],
+                                   user_id="bulk", atomic=atomic)
+        assert all(r.success for r in results)
+    records = list(audit.iter_audit(page_size=4))
+    assert len(records) == 10                      # duplicati idempotenti non scrivono audit
+    assert [r.entry["documento"] for r in records] == [f"FAT-{n}" for n in range(10)]
+    assert [r.id for r in records] == sorted(r.id for r in records)
+
+def test_reads_old_and_new_rows(tmp_db, engine):
+    old = _entry(7)
+    conn = DBManager.connect()
+    conn.execute("INSERT INTO audit_log(entry_id, action, user_id, payload) VALUES (?, 'POST', 'old', ?)",
+                 (999, _legacy_payload(old, "old")))
+    conn.commit()
+    engine.post(_entry(8), user_id="tester")
+    records = list(audit.iter_audit())
+    assert [r.format for r in records] == [1, audit.FORMAT_VERSION]
+    assert [r.entry["documento"] for r in records] == ["FAT-7", "FAT-8"]
+    assert records[0].lines == [{"account": "1431", "dare": 10700, "avere": 0},
+                                {"account": "4100", "dare": 0, "avere": 10700}]
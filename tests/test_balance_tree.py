@@ -0,0 +1,94 @@
+# --- tests/test_balance_tree.py ----------------------------------------------
+import pytest
+from core.balance_tree import BalanceTreeService
+from core.ledger_service import LedgerService
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.period_service import PeriodService
+from db.db_manager import DBManager
+
+YEAR = ("2025-01-01", "2025-12-31")
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def tree(tmp_db):
+    engine = PostingEngine()
+    engine.post(_entry("2025-01-10", ("1431", 100.0), ("4100", -100.0)), user_id="tester")
+    engine.post(_entry("2025-02-10", ("1432", 50.0), ("4200", -50.0)), user_id="tester")
+    engine.post(_entry("2025-03-10", ("3200", 30.0), ("1431", -30.0)), user_id="tester")
+    return BalanceTreeService()
+
+def _entry(day, *lines):
+    return EntryDTO(date=day, documento=f"DOC-{day}", lines=[
+        LineDTO(code, dare=amount) if amount > 0 else LineDTO(code, avere=-amount)
+        for code, amount in lines])
+
+def _codes(rows):
+    return [r.code for r in rows]
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_roots_and_children(tree):
+    assert _codes(tree.children(None, *YEAR)) == ["1000", "3000", "4000"]
+    assert _codes(tree.children("1000", *YEAR)) == ["1400"]
+    assert _codes(tree.children("1430", *YEAR)) == ["1431", "1432"]
+    assert len(tree.children("1000", *YEAR, include_empty=True)) == 4
+
+def test_aggregates_roll_up(tree):
+    assert tree.node("1431", *YEAR).saldo == 7000
+    liquid = tree.node("1430", *YEAR)
+    assert (liquid.dare, liquid.avere) == (15000, 3000)
+    assert tree.node("1000", *YEAR).saldo == liquid.saldo
+    assert tree.node("4000", *YEAR).saldo == -15000
+
+def test_repeated_navigation_uses_cache(tree):
+    tree.children(None, *YEAR)
+    for code in ("1000", "1400", "1430", "1000"):
+        tree.children(code, *YEAR)
+    stats = tree.cache().stats()
+    assert (stats.misses, stats.hits) == (1, 4)
+
+def test_posting_invalidates(tree):
+    before = tree.node("1432", *YEAR).saldo
+    PostingEngine().post(_entry("2025-04-01", ("1432", 5.0), ("4100", -5.0)), user_id="tester")
+    assert tree.node("1432", *YEAR).saldo == before + 500
+    assert tree.cache().stats().stale == 1
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_ranges_are_cached_separately(tree):
+    assert _codes(tree.children("1430", "2025-01-01", "2025-01-31")) == ["1431"]
+    assert _codes(tree.children("1430", *YEAR)) == ["1431", "1432"]
+    assert len(tree.cache()) == 2
+
+def test_leaf_and_unknown(tree):
+    assert tree.is_leaf("1431") and not tree.is_leaf("1430")
+    assert tree.node("9999", *YEAR) is None
+    assert tree.children("1431", *YEAR) == []
+
+def test_get_entry_missing(tree):
+    assert LedgerService().get_entry(999) is None
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_drill_down_to_entry(tree):
+    leaf = tree.children("1430", *YEAR)[0]
+    ledger = LedgerService().get_account_ledger(leaf.code, *YEAR)
+    assert ledger[-1]["saldo"] == leaf.saldo
+    entry = LedgerService().get_entry(ledger[0]["entry_id"], ledger[0]["date"])
+    assert entry["document"] == "DOC-2025-01-10"
+    assert [(l["account_code"], l["dare"], l["avere"]) for l in entry["lines"]] == [
+        ("1431", 10000, 0), ("4100", 0, 10000)]
+
+def test_get_entry_from_archived_year(tmp_db):
+    posted = PostingEngine().post(_entry("2023-05-10", ("1431", 10.0), ("4100", -10.0)),
+                                  user_id="tester")
+    periods = PeriodService()
+    for m in range(1, 13):
+        periods.close_month(2023, m, user_id="tester")
+    periods.close_year(2023, user_id="tester")
+    DBManager.archive_year(2023)
+    service = LedgerService()
+    for entry in (service.get_entry(posted.entry_id, "2023-05-10"), service.get_entry(posted.entry_id)):
+        assert entry["date"] == "2023-05-10" and len(entry["lines"]) == 2
@@ -0,0 +1,79 @@
+# --- tests/test_balances.py --------------------------------------------------
+import pytest
+from db.db_manager import DBManager
+from core import balances
+from core.models import EntryDTO, LineDTO
+from core.ledger_service import LedgerService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def ledger_service(tmp_db):
+    return LedgerService()
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("4100", avere=amount), LineDTO("1431", dare=amount)])
+
+def _table():
+    cur = DBManager.connect().cursor()
+    cur.execute("SELECT account_code, period, dare_cents, avere_cents FROM account_period_balances ORDER BY 1, 2")
+    return [tuple(r) for r in cur.fetchall()]
+
+def _brute_force(account_code, from_date, to_date):
+    cur = DBManager.connect().cursor()
+    cur.execute("""
+        SELECT COALESCE(SUM(dare_cents), 0), COALESCE(SUM(avere_cents), 0)
+        FROM entry_lines el JOIN entries e ON e.id = el.entry_id
+        WHERE el.account_code = ? AND e.date BETWEEN ? AND ?
+    """, (account_code, from_date, to_date))
+    return tuple(cur.fetchone())
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_split_range_full_months_and_edges():
+    assert balances.split_range("2025-01-15", "2025-04-10") == (
+        ("2025-01-15", "2025-01-31"), ("2025-02", "2025-03"), ("2025-04-01", "2025-04-10"))
+    assert balances.split_range("2025-01-01", "2025-12-31") == (None, ("2025-01", "2025-12"), None)
+    assert balances.split_range("2025-02-03", "2025-02-20") == (("2025-02-03", "2025-02-20"), None, None)
+    assert balances.split_range("2025-03-01", "2025-02-01") == (None, None, None)
+
+def test_post_updates_monthly_table(ledger_service):
+    ledger_service.engine.post(_sale("2025-01-10", 100.0), user_id="tester")
+    ledger_service.engine.post(_sale("2025-01-20", 50.0), user_id="tester")
+    ledger_service.engine.post(_sale("2025-02-05", 30.0), user_id="tester")
+    assert _table() == [
+        ("1431", "2025-01", 15000, 0), ("1431", "2025-02", 3000, 0),
+        ("4100", "2025-01", 0, 15000), ("4100", "2025-02", 0, 3000),
+    ]
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_reverse_entry_updates_table(ledger_service):
+    res = ledger_service.engine.post(_sale("2025-03-10", 80.0), user_id="tester")
+    ledger_service.reverse_entry(res.entry_id, user_id="tester")
+    bal = ledger_service.get_account_balance("1431", "2025-03-01", "2025-03-31")
+    assert bal == {"dare": 8000, "avere": 8000, "saldo": 0}
+
+def test_rebuild_matches_incremental(ledger_service):
+    ledger_service.engine.post_many(
+        [_sale(f"2025-{m:02d}-{d:02d}", 10.0 * d) for m in (1, 2, 5) for d in (1, 15, 28)],
+        user_id="tester")
+    incremental = _table()
+    ledger_service.rebuild_balances()
+    assert _table() == incremental
+
+# --- Test integrati -----------------------------------------------------------
+
+@pytest.mark.parametrize("from_date,to_date", [
+    ("2025-01-01", "2025-12-31"),
+    ("2025-01-15", "2025-05-14"),
+    ("2025-02-01", "2025-02-28"),
+    ("2025-02-10", "2025-02-20"),
+    ("2024-06-01", "2025-01-01"),
+])
+def test_balance_matches_brute_force(ledger_service, from_date, to_date):
+    ledger_service.engine.post_many(
+        [_sale(f"2025-{m:02d}-{d:02d}", float(m * d)) for m in range(1, 7) for d in (1, 10, 20, 28)],
+        user_id="tester")
+    bal = ledger_service.get_account_balance("1431", from_date, to_date)
+    assert (bal["dare"], bal["avere"]) == _brute_force("1431", from_date, to_date)
@@ -0,0 +1,86 @@
+# --- tests/test_bilancio_model.py --------------------------------------------
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QModelIndex
+from core.account_index import get_account_index
+from core.balance_tree import BalanceTreeService
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from frontend.bilancio_model import BilancioModel
+
+YEAR = ("2025-01-01", "2025-12-31")
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def model(tmp_db, qt_app):
+    engine = PostingEngine()
+    engine.post(_entry("2025-01-10", "1431", "4100", 100.0), user_id="tester")
+    engine.post(_entry("2025-02-10", "1432", "4200", 50.0), user_id="tester")
+    m = BilancioModel()
+    m.set_nodes(BalanceTreeService().nodes(*YEAR), get_account_index().children)
+    return m
+
+def _entry(day, dare, avere, amount):
+    return EntryDTO(date=day, lines=[LineDTO(dare, dare=amount), LineDTO(avere, avere=amount)])
+
+def _codes(model, parent=QModelIndex()):
+    return [model.code(model.index(i, 0, parent)) for i in range(model.rowCount(parent))]
+
+def _find(model, code, parent=QModelIndex()):
+    return next(model.index(i, 0, parent) for i in range(model.rowCount(parent))
+                if model.code(model.index(i, 0, parent)) == code)
+
+def _expand(model, *codes):
+    index = QModelIndex()
+    for code in codes:
+        index = _find(model, code, index)
+        model.fetchMore(index)
+    return index
+
+def _inserted(model):
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append((model.code(parent), first, last)))
+    return events
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_roots_loaded_children_on_demand(model):
+    assert _codes(model) == ["1000", "4000"]
+    assets = _find(model, "1000")
+    assert model.hasChildren(assets) and model.canFetchMore(assets)
+    assert model.rowCount(assets) == 0            # niente figli prima dell'espansione
+
+def test_fetch_more_inserts_children_once(model):
+    events = _inserted(model)
+    assets = _find(model, "1000")
+    model.fetchMore(assets)
+    assert events == [("1000", 0, 0)] and _codes(model, assets) == ["1400"]
+    assert not model.canFetchMore(assets)
+    model.fetchMore(assets)                       # già caricati: nessun nuovo inserimento
+    assert events == [("1000", 0, 0)]
+
+def test_drill_down_to_leaf(model):
+    liquid = _expand(model, "1000", "1400", "1430")
+    assert _codes(model, liquid) == ["1431", "1432"]
+    cassa = _find(model, "1431", liquid)
+    assert model.is_leaf(cassa) and not model.hasChildren(cassa)
+    assert model.data(cassa.siblingAtColumn(3)) == "100.00"
+    assert model.parent(cassa) == liquid
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_fetch_more_on_leaf_inserts_nothing(model):
+    cassa = _find(model, "1431", _expand(model, "1000", "1400", "1430"))
+    events = _inserted(model)
+    assert model.canFetchMore(cassa)
+    model.fetchMore(cassa)
+    assert events == [] and not model.canFetchMore(cassa) and model.rowCount(cassa) == 0
+
+def test_accounts_without_movements_hidden(model):
+    assert "3000" not in _codes(model)
+    assets = _expand(model, "1000")
+    assert _codes(model, assets) == ["1400"]
+    assert len(get_account_index().children("1000")) > 1
@@ -0,0 +1,148 @@
+# --- tests/test_database.py --------------------------------------------------
+import pytest
+from db.database import Database, DatabaseRegistry
+from db.db_manager import DBManager
+from core import validator
+from core.account_index import get_account_index
+from core.audit import get_audit_records
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.ledger_service import LedgerService
+from core.period_index import get_period_index
+from core.period_service import PeriodService
+from core.trial_balance import TrialBalanceService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def companies(tmp_path):
+    registry = DatabaseRegistry(max_open=2)
+    yield registry, [str(tmp_path / f"azienda_{i}.db") for i in range(3)]
+    registry.close_all()
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _count(db, table="entries"):
+    with db.reader() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_registry_returns_same_instance(companies):
+    registry, paths = companies
+    a = registry.get(paths[0])
+    assert registry.get(paths[0]) is a
+    assert a.schema_version() > 0              # inizializzato all'apertura
+    stats = registry.stats()
+    assert (stats.hits, stats.misses, stats.open) == (1, 1, 1)
+
+def test_registry_evicts_least_recently_used(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    registry.get(paths[0])                     # b diventa il meno recente
+    c = registry.get(paths[2])
+    assert paths[1] not in registry and paths[0] in registry
+    assert not b.is_open and a.is_open and c.is_open
+    assert registry.stats().evictions == 1
+    # chi tiene ancora l'istanza può usarla: il pool si riapre
+    assert _count(b) == 0
+
+def test_caches_are_per_database(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    assert get_account_index(a) is get_account_index(a)
+    assert get_account_index(a) is not get_account_index(b)
+    assert get_period_index(a) is not get_period_index(b)
+
+def test_configure_closes_previous_default(tmp_path):
+    DBManager.configure(str(tmp_path / "uno.db"))
+    first = DBManager.current()
+    DBManager.initialize()
+    assert first.is_open
+    DBManager.configure(str(tmp_path / "due.db"))
+    assert not first.is_open and DBManager.current() is not first
+    DBManager.close()
+
+def test_posting_listeners(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    seen = []
+    a.add_posting_listener(seen.append)
+    one = PostingEngine(a).post(_sale("2025-01-10", 10.0), user_id="tester")
+    many = PostingEngine(a).post_many([_sale("2025-01-11", 1.0), _sale("2025-01-12", 2.0)],
+                                      user_id="tester", batch_size=1)
+    PostingEngine(b).post(_sale("2025-01-10", 10.0), user_id="tester")
+    storno = LedgerService(a).reverse_entry(one.entry_id, user_id="tester")
+    # post_many avvisa una volta sola, anche su più batch; b non avvisa a
+    assert seen == [[one.entry_id], [r.entry_id for r in many], [storno.entry_id]]
+    a.remove_posting_listener(seen.append)
+    PostingEngine(a).post(_sale("2025-01-13", 1.0), user_id="tester")
+    assert len(seen) == 3
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_invalid_max_open():
+    with pytest.raises(ValueError):
+        DatabaseRegistry(max_open=0)
+
+def test_report_session_is_per_database(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    PostingEngine(b).post(_sale("2025-01-10", 10.0), user_id="tester")
+    with a.report_session():
+        # la sessione legata al thread è di a: le letture su b non la usano
+        assert _count(b) == 1
+        assert _count(a) == 0
+
+def test_default_services_follow_dbmanager(tmp_db):
+    engine = PostingEngine()
+    assert engine.db is DBManager.current()
+    assert engine.post(_sale("2025-01-10", 10.0), user_id="tester").success
+
+def test_failing_listener_does_not_fail_posting(companies):
+    registry, paths = companies
+    a = registry.get(paths[0])
+    def broken(entry_ids):
+        raise RuntimeError("listener rotto")
+    a.add_posting_listener(broken)
+    assert PostingEngine(a).post(_sale("2025-01-10", 10.0), user_id="tester").success
+    assert _count(a) == 1
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_companies_are_independent(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    ra = PostingEngine(a).post_many([_sale("2025-01-10", 10.0), _sale("2025-01-11", 20.0)],
+                                    user_id="tester")
+    rb = PostingEngine(b).post(_sale("2025-01-10", 5.0), user_id="tester")
+    assert (_count(a), _count(b)) == (2, 1)
+    # numerazione dei protocolli separata per azienda
+    assert ra[0].protocol == rb.protocol
+    assert LedgerService(a).get_account_balance("1431", "2025-01-01", "2025-12-31")["saldo"] == 3000
+    assert LedgerService(b).get_account_balance("1431", "2025-01-01", "2025-12-31")["saldo"] == 500
+    assert TrialBalanceService(b).compute("2025-01-01", "2025-12-31").total_dare == 500
+    assert get_audit_records(rb.entry_id, db=b)[0].lines[0]["dare"] == 500
+
+def test_validation_uses_the_company_file(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    with a.transaction() as cur:
+        cur.execute("INSERT INTO accounts(code, name, class) VALUES ('9999', 'Conto di A', 'A')")
+    entry = EntryDTO(date="2025-02-01", lines=[LineDTO("9999", dare=1.0), LineDTO("4100", avere=1.0)])
+    assert validator.validate(entry, a) == []
+    assert [e.code.name for e in validator.validate(entry, b)] == ["INVALID_ACCOUNT"]
+
+    PeriodService(b).close_month(2025, 2, user_id="tester")
+    assert validator.validate_period_open(entry, a) == []
+    assert validator.validate_period_open(entry, b)
+
+def test_reversal_in_one_company(companies):
+    registry, paths = companies
+    a, b = registry.get(paths[0]), registry.get(paths[1])
+    posted = PostingEngine(a).post(_sale("2025-03-10", 10.0), user_id="tester")
+    PostingEngine(b).post(_sale("2025-03-10", 10.0), user_id="tester")
+    assert LedgerService(a).reverse_entry(posted.entry_id, user_id="tester").success
+    assert (_count(a), _count(b)) == (2, 1)
+    assert LedgerService(a).reverse_entry(posted.entry_id, user_id="tester").success is False
@@ -0,0 +1,107 @@
+# --- tests/test_db_pool.py ---------------------------------------------------
+import sqlite3
+import threading
+import pytest
+from db.db_manager import DBManager
+from db.pool import ConnectionPool
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.ledger_service import LedgerService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def pool(tmp_db):
+    p = ConnectionPool(str(tmp_db), max_readers=2)
+    yield p
+    p.close()
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_reader_is_read_only(pool):
+    with pool.reader() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM accounts")
+
+def test_reader_reentrant_same_thread(pool):
+    with pool.reader() as outer:
+        with pool.reader() as inner:
+            assert inner is outer
+    stats = pool.stats()
+    assert stats.reader_checkouts == 1 and stats.readers_in_use == 0
+
+def test_reader_reused_after_checkin(pool):
+    with pool.reader() as first:
+        pass
+    with pool.reader() as second:
+        assert second is first
+    assert pool.stats().readers_open == 1
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_waits_when_all_readers_busy(pool):
+    hold, release = threading.Barrier(3), threading.Event()
+
+    def busy():
+        with pool.reader():
+            hold.wait()
+            release.wait()
+
+    workers = [threading.Thread(target=busy) for _ in range(2)]
+    for t in workers:
+        t.start()
+    hold.wait()                       # entrambi i lettori occupati
+    threading.Timer(0.05, release.set).start()
+    with pool.reader():
+        pass
+    for t in workers:
+        t.join()
+    stats = pool.stats()
+    assert stats.readers_open == 2
+    assert stats.reader_waits == 1 and stats.reader_wait_seconds > 0
+
+def test_reader_does_not_see_open_transaction(tmp_db):
+    with DBManager.transaction() as cur:
+        cur.execute("INSERT INTO entries(date, description) VALUES ('2025-01-01', 'pendente')")
+        with DBManager.reader() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    assert count == 0
+    # la transazione è stata committata e le scritture successive funzionano
+    assert PostingEngine().post(_sale("2025-01-02", 1.0), user_id="tester").success
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_concurrent_reports_and_postings(tmp_db):
+    engine, service = PostingEngine(), LedgerService()
+    errors = []
+
+    def post():
+        try:
+            for day in range(1, 21):
+                assert engine.post(_sale(f"2025-01-{day:02d}", 10.0), user_id="tester").success
+        except Exception as exc:       # pragma: no cover - riportato sotto
+            errors.append(exc)
+
+    def report():
+        try:
+            for _ in range(20):
+                bal = service.get_account_balance("1431", "2025-01-01", "2025-12-31")
+                assert bal["dare"] % 1000 == 0
+                service.get_account_ledger("1431", "2025-01-01", "2025-12-31")
+        except Exception as exc:       # pragma: no cover - riportato sotto
+            errors.append(exc)
+
+    threads = [threading.Thread(target=post), threading.Thread(target=post)]
+    threads += [threading.Thread(target=report) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert service.get_account_balance("1431", "2025-01-01", "2025-12-31")["dare"] == 40000
+    stats = DBManager.pool_stats()
+    assert stats.reader_checkouts > 0 and stats.writer_checkouts >= 40
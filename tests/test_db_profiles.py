@@ -0,0 +1,73 @@
+# --- tests/test_db_profiles.py -----------------------------------------------
+import threading
+import pytest
+from db.db_manager import DBManager
+from db.profiles import PROFILES
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.ledger_service import LedgerService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def profiled_db(tmp_path):
+    def open_with(profile):
+        DBManager.close()
+        DBManager.configure(str(tmp_path / f"{profile}.db"), profile=profile)
+        DBManager.initialize()
+        return DBManager.settings()
+    yield open_with
+    DBManager.close()
+    DBManager.configure()            # ripristina path e profilo di default
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_default_profile_uses_wal(tmp_db):
+    settings = DBManager.settings()
+    assert settings["profile"] == "default"
+    assert settings["journal_mode"] == "WAL"
+    assert settings["synchronous"] == "NORMAL"
+    assert settings["temp_store"] == "MEMORY"
+    assert settings["cache_size"] == PROFILES["default"].cache_size
+
+@pytest.mark.parametrize("profile,journal,sync", [
+    ("safe", "WAL", "FULL"), ("legacy", "DELETE", "FULL"), ("bulk-load", "WAL", "OFF"),
+])
+def test_named_profiles(profiled_db, profile, journal, sync):
+    settings = profiled_db(profile)
+    assert (settings["profile"], settings["journal_mode"], settings["synchronous"]) == (profile, journal, sync)
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        DBManager.configure("x.db", profile="turbo")
+
+def test_use_profile_restores_previous(tmp_db):
+    with DBManager.use_profile("bulk-load"):
+        assert DBManager.settings()["synchronous"] == "OFF"
+        assert DBManager.settings()["wal_autocheckpoint"] == 0
+        PostingEngine().post_many([_sale("2025-01-10", 5.0)] * 20, user_id="tester")
+    settings = DBManager.settings()
+    assert (settings["profile"], settings["synchronous"], settings["wal_autocheckpoint"]) == ("default", "NORMAL", 1000)
+    with pytest.raises(ValueError):
+        with DBManager.use_profile("legacy"):
+            pass
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_wal_reader_not_blocked_by_open_transaction(tmp_db):
+    PostingEngine().post(_sale("2025-01-10", 10.0), user_id="tester")
+    service, seen = LedgerService(), []
+    with DBManager.transaction() as cur:
+        cur.execute("INSERT INTO entries(date, description) VALUES ('2025-01-11', 'pendente')")
+        # in WAL un altro thread legge l'ultimo stato committato senza attendere il commit
+        t = threading.Thread(target=lambda: seen.append(
+            service.get_account_balance("1431", "2025-01-01", "2025-01-31")["dare"]))
+        t.start()
+        t.join(timeout=5)
+        assert not t.is_alive()
+    assert seen == [1000]
@@ -0,0 +1,64 @@
+# --- tests/test_frontend_startup.py ------------------------------------------
+import threading
+import time
+import pytest
+
+pytest.importorskip("PySide6")
+
+from backend import db as backend_db
+from db.db_manager import DBManager
+from frontend.frontend import ContaIDE
+from frontend.startup_timing import FIRST_PAINT, INTERACTIVE
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def init_threads(monkeypatch):
+    threads = []
+    init_db = backend_db.init_db
+
+    def record(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return init_db(*args, **kwargs)
+    monkeypatch.setattr(backend_db, "init_db", record)
+    return threads
+
+@pytest.fixture
+def window(qt_app, tmp_path, init_threads):
+    w = ContaIDE(db_path=str(tmp_path / "avvio.db"))
+    yield w
+    w.close()
+    w.deleteLater()
+    qt_app.processEvents()
+    DBManager.close()
+    DBManager.configure()
+
+def _wait(qt_app, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "avvio non completato"
+        qt_app.processEvents()
+        time.sleep(0.005)
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_staged_startup(qt_app, window, init_threads):
+    # shell: nessun tab costruito, terminale in attesa del DB
+    assert window.ledger_async is None
+    assert not window.terminal.input_line.isEnabled()
+    assert not any(tab.is_built() for _, tab in window.default_tabs)
+
+    window.show()
+    _wait(qt_app, lambda: window.timer.done(INTERACTIVE))
+    assert window.timer.elapsed(FIRST_PAINT) < window.timer.elapsed("db") <= window.timer.elapsed(INTERACTIVE)
+    assert window.terminal.input_line.isEnabled()
+    # apertura e migrazioni nel thread di avvio, non in quello della GUI
+    assert len(init_threads) == 1 and init_threads[0] is not threading.main_thread()
+    assert window.journal_tab.is_built() and not window.mastrini_tab.is_built()
+    assert window.searchbar.suggestions_model.rowCount() > 0
+    assert "time-to-interactive" in window.timer.report()
+
+    # tab costruito alla prima apertura
+    window.main_panel.setCurrentWidget(window.mastrini_tab)
+    qt_app.processEvents()
+    assert window.mastrini_tab.is_built()
@@ -0,0 +1,103 @@
+# --- tests/test_journal.py ---------------------------------------------------
+import pytest
+from backend import db as backend_db
+from core.journal import get_journal_page, get_journal_since, last_entry_id
+from core.ledger_service import LedgerService
+from core.models import EntryDTO, JournalCursor, LineDTO
+from core.posting_engine import PostingEngine
+from core.period_service import PeriodService
+from db.db_manager import DBManager
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def journal(tmp_db):
+    """Dieci vendite (due righe ciascuna), date non in ordine di inserimento."""
+    days = [f"2025-01-{d:02d}" for d in (5, 3, 9, 1, 7, 2, 8, 4, 10, 6)]
+    return PostingEngine().post_many([_sale(day, 10.0 + i) for i, day in enumerate(days)],
+                                     user_id="tester")
+
+def _sale(day, amount):
+    return EntryDTO(date=day, documento=f"FAT-{day}", cliente_fornitore="Rossi Srl",
+                    lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _all_pages(limit, **kwargs):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = get_journal_page(after=cursor, limit=limit, **kwargs)
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows, pages
+
+def _key(row):
+    return row["date"], row["entry_id"], row["line_id"]
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_first_page(journal):
+    rows, cursor = get_journal_page(limit=3)
+    assert [r["date"] for r in rows] == ["2025-01-01", "2025-01-01", "2025-01-02"]
+    assert cursor == JournalCursor(*_key(rows[-1]))
+    first = rows[0]
+    assert first["account_code"] == "1431" and first["account_name"]
+    assert first["importo"] == 1300 and rows[1]["importo"] == -1300
+    assert first["party"] == "Rossi Srl" and first["protocol"]
+
+def test_pages_cover_journal_in_order(journal):
+    rows, pages = _all_pages(limit=3)
+    assert len(rows) == 20 and pages == 7
+    assert [_key(r) for r in rows] == sorted(_key(r) for r in rows)
+    assert len({(r["entry_id"], r["line_id"]) for r in rows}) == 20
+
+def test_backend_pages_match_core(journal):
+    rows, _ = _all_pages(limit=7)
+    first, cursor = backend_db.get_journal_page(limit=7)
+    assert first == rows[:7]
+    assert backend_db.get_journal_page(after=cursor, limit=7)[0] == rows[7:14]
+
+def test_since_returns_only_new_entries(journal):
+    last = last_entry_id()
+    assert last == journal[-1].entry_id and get_journal_since(last) == []
+    new = PostingEngine().post(_sale("2024-12-31", 5.0), user_id="tester")   # retrodatata
+    rows = get_journal_since(last)
+    assert [(r["entry_id"], r["date"]) for r in rows] == [(new.entry_id, "2024-12-31")] * 2
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_empty_journal(tmp_db):
+    assert get_journal_page() == ([], None)
+
+def test_exact_multiple_ends_with_empty_page(journal):
+    rows, cursor = get_journal_page(limit=20)
+    assert len(rows) == 20 and cursor is not None
+    assert get_journal_page(after=cursor, limit=20) == ([], None)
+
+def test_date_range(journal):
+    rows, _ = _all_pages(limit=4, from_date="2025-01-03", to_date="2025-01-04")
+    assert {r["date"] for r in rows} == {"2025-01-03", "2025-01-04"} and len(rows) == 4
+
+def test_reversal_rows_point_to_original(journal):
+    original = journal[0].entry_id
+    LedgerService().reverse_entry(original, user_id="tester")
+    rows, _ = _all_pages(limit=50)
+    lines = [r["importo"] for r in rows if r["entry_id"] == original]
+    storno = [r["importo"] for r in rows if r["reversal_of"] == original]
+    assert storno == [-x for x in lines]
+    assert all(r["reversed"] for r in rows if r["entry_id"] == original)
+    assert not any(r["reversed"] for r in rows if r["reversal_of"] == original)
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_pages_cross_archived_year(tmp_db):
+    engine, periods = PostingEngine(), PeriodService()
+    engine.post_many([_sale(f"{y}-{m:02d}-15", 1.0 * m) for y in (2023, 2024) for m in range(1, 13)],
+                     user_id="tester")
+    for m in range(1, 13):
+        periods.close_month(2023, m, user_id="tester")
+    periods.close_year(2023, user_id="tester")
+    before, _ = _all_pages(limit=5)
+    assert DBManager.archive_year(2023).entries == 12
+    after, _ = _all_pages(limit=5)
+    assert [_key(r) for r in after] == [_key(r) for r in before]
+    assert len(after) == 48
@@ -0,0 +1,108 @@
+# --- tests/test_journal_model.py ---------------------------------------------
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt
+from core.ledger_service import LedgerService
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from frontend.journal_model import JournalModel
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def journal(tmp_db, qt_app):
+    """Cinque vendite dal 2 al 10 gennaio (giorni pari), due righe ciascuna."""
+    return PostingEngine().post_many([_sale(f"2025-01-{d:02d}", 10.0) for d in (2, 4, 6, 8, 10)],
+                                     user_id="tester")
+
+def _sale(day, amount):
+    return EntryDTO(date=day, documento=f"FAT-{day}",
+                    lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _post(day):
+    return PostingEngine().post(_sale(day, 1.0), user_id="tester")
+
+def _load_all(model):
+    while model.canFetchMore():
+        model.fetchMore()
+    return model
+
+def _keys(model):
+    rows = [model.row(i) for i in range(model.rowCount())]
+    return [(r["date"], r["entry_id"], r["line_id"]) for r in rows]
+
+def _inserted(model):
+    positions = []
+    model.rowsInserted.connect(lambda parent, first, last: positions.append((first, last)))
+    return positions
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_pages_load_on_fetch_more(journal):
+    model = JournalModel(page_size=4)
+    assert model.rowCount() == 0 and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 4
+    _load_all(model)
+    assert model.rowCount() == 10 and not model.canFetchMore()
+    assert _keys(model) == sorted(_keys(model))
+
+def test_refresh_inserts_in_date_order(journal):
+    model = _load_all(JournalModel(page_size=4))
+    positions = _inserted(model)
+    _post("2025-01-05")
+    _post("2025-01-01")                 # retrodatata: finisce in testa
+    _post("2025-01-12")                 # in coda: tutte le pagine sono già caricate
+    assert model.refresh() == 6
+    assert _keys(model) == sorted(_keys(model)) and model.rowCount() == 16
+    dates = [model.row(i)["date"] for i in range(model.rowCount())]
+    assert dates[:2] == ["2025-01-01"] * 2 and dates[-2:] == ["2025-01-12"] * 2
+    assert dates[6:8] == ["2025-01-05"] * 2
+    # una riga alla volta, nella posizione per data
+    assert positions == [(4, 4), (5, 5), (0, 0), (1, 1), (14, 14), (15, 15)]
+    assert model.refresh() == 0
+
+def test_refresh_marks_reversals(journal):
+    model = _load_all(JournalModel())
+    LedgerService().reverse_entry(journal[0].entry_id, user_id="tester")
+    assert model.refresh() == 2
+    original = next(i for i in range(model.rowCount()) if model.row(i)["entry_id"] == journal[0].entry_id)
+    storno = next(i for i in range(model.rowCount()) if model.row(i)["reversal_of"] is not None)
+    assert model.data(model.index(original, 0), Qt.FontRole).strikeOut()
+    assert model.data(model.index(storno, 0), Qt.ForegroundRole) is not None
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_refresh_leaves_rows_past_last_page_to_fetch_more(journal):
+    model = JournalModel(page_size=4)
+    model.fetchMore()                   # 2 e 4 gennaio
+    _post("2025-01-03")
+    _post("2025-01-11")
+    assert model.refresh() == 2         # solo la retrodatata, dentro la pagina caricata
+    assert [model.row(i)["date"] for i in range(model.rowCount())][2:4] == ["2025-01-03"] * 2
+    _load_all(model)
+    assert model.rowCount() == 14 and _keys(model) == sorted(_keys(model))
+    assert len(set(_keys(model))) == 14
+
+def test_refresh_before_first_page_is_noop(journal):
+    model = JournalModel(page_size=4)
+    _post("2025-01-01")
+    assert model.refresh() == 0 and model.rowCount() == 0
+    _load_all(model)
+    assert model.rowCount() == 12
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_background_first_page_keeps_postings_in_between(journal):
+    model = JournalModel(page_size=4)
+    model.begin_loading()
+    assert model.loading and not model.canFetchMore()
+    page = model.first_page()           # nel worker, all'avvio
+    _post("2025-01-01")                 # registrata prima che la pagina arrivi
+    assert model.refresh() == 0         # sospeso durante la lettura
+    model.prime(*page)
+    assert not model.loading and model.rowCount() == 4
+    assert model.refresh() == 2
+    assert [model.row(i)["date"] for i in range(2)] == ["2025-01-01"] * 2
@@ -125,3 +125,82 @@ def test_audit_log_created(tmp_db, ledger_service):
     row = cur.fetchone()
     assert row is not None
     assert row["action"].lower() == "post"
+
+# --- Mastrino paginato ----------------------------------------------------------
+
+def _post_sales(ledger_service, dates_amounts):
+    for day, amount in dates_amounts:
+        ledger_service.engine.post(
+            EntryDTO(date=day, lines=[LineDTO("4100", avere=amount), LineDTO("1431", dare=amount)]),
+            user_id="tester")
+
+def test_ledger_starts_from_opening_balance(tmp_db, ledger_service):
+    _post_sales(ledger_service, [("2025-01-10", 100.0), ("2025-03-05", 40.0), ("2025-06-20", 10.0)])
+    ledger = ledger_service.get_account_ledger("1431", "2025-03-01", "2025-12-31")
+    assert [r["saldo"] for r in ledger] == [14000, 15000]   # centesimi
+
+def test_ledger_pages_match_full_ledger(tmp_db, ledger_service):
+    _post_sales(ledger_service, [(f"2025-{m:02d}-{d:02d}", float(m + d))
+                                 for m in range(1, 5) for d in (3, 12, 25)])
+    full = ledger_service.get_account_ledger("1431", "2025-01-01", "2025-12-31")
+    pages = list(ledger_service.iter_account_ledger("1431", "2025-01-01", "2025-12-31", page_size=5))
+    assert [len(p) for p in pages] == [5, 5, 2]
+    assert [r for p in pages for r in p] == full
+
+def test_ledger_resumes_from_cursor(tmp_db, ledger_service):
+    _post_sales(ledger_service, [("2025-02-01", 10.0), ("2025-02-02", 20.0), ("2025-02-03", 30.0)])
+    first, cursor = ledger_service.get_account_ledger_page("1431", "2025-01-01", "2025-12-31", limit=2)
+    assert cursor.saldo == 3000
+    rest, end = ledger_service.get_account_ledger_page("1431", "2025-01-01", "2025-12-31", after=cursor)
+    assert [r["saldo"] for r in rest] == [6000]
+    assert end is None
+
+# --- Storno in blocco -----------------------------------------------------------
+
+def _post_refs(ledger_service, refs, day="2025-11-10"):
+    return [ledger_service.engine.post(
+        EntryDTO(date=day, client_reference_id=ref,
+                 lines=[LineDTO("4100", avere=10.0), LineDTO("1431", dare=10.0)]),
+        user_id="tester").entry_id for ref in refs]
+
+def test_reverse_entries_by_ids(tmp_db, ledger_service):
+    ids = _post_refs(ledger_service, ["A-1", "A-2", "A-3"])
+    report = ledger_service.reverse_entries("tester", entry_ids=ids[:2] + [9999])
+    assert list(report) == [ids[0], ids[1], 9999]
+    assert report[ids[0]].success and report[ids[1]].success
+    assert not report[9999].success
+
+    cur = DBManager.connect().cursor()
+    cur.execute("SELECT reversal_of FROM entries WHERE reversal_of IS NOT NULL ORDER BY reversal_of")
+    assert [r[0] for r in cur.fetchall()] == ids[:2]
+
+def test_reverse_entries_by_prefix_and_range(tmp_db, ledger_service):
+    imported = _post_refs(ledger_service, ["IMP-1", "IMP-2"])
+    other = _post_refs(ledger_service, ["MAN-1"], day="2025-11-20")
+    report = ledger_service.reverse_entries("tester", client_reference_prefix="IMP-")
+    assert list(report) == imported and all(r.success for r in report.values())
+
+    # gli storni hanno la stessa data ma non vengono riselezionati
+    report = ledger_service.reverse_entries("tester", from_date="2025-11-01", to_date="2025-11-30")
+    assert report[other[0]].success
+    assert all(not report[i].success for i in imported)
+    assert all(e.code.name == "ALREADY_REVERSED" for i in imported for e in report[i].error_details)
+
+def test_reverse_entries_single_transaction(tmp_db, ledger_service):
+    ids = _post_refs(ledger_service, [f"B-{n}" for n in range(20)])
+    conn = DBManager.connect()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        report = ledger_service.reverse_entries("tester", entry_ids=ids)
+    finally:
+        conn.set_trace_callback(None)
+    assert all(r.success for r in report.values())
+    assert sum(s.startswith("BEGIN") for s in statements) == 1
+    assert ledger_service.get_account_balance("1431", "2025-11-01", "2025-11-30")["saldo"] == 0
+
+def test_reverse_entries_requires_one_selector(tmp_db, ledger_service):
+    with pytest.raises(ValueError):
+        ledger_service.reverse_entries("tester")
+    with pytest.raises(ValueError):
+        ledger_service.reverse_entries("tester", entry_ids=[1], client_reference_prefix="X")
@@ -0,0 +1,148 @@
+# --- tests/test_migrations.py ------------------------------------------------
+import sqlite3
+import pytest
+from db.db_manager import DBManager
+from db import migrator
+from backend import db as backend_db
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def real_layout(tmp_db):
+    """File alla versione 1 con entry_lines ancora in REAL (prima dei centesimi)."""
+    conn = DBManager.connect()
+    conn.executescript("""
+        DROP TABLE entry_lines;
+        CREATE TABLE entry_lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            account_code TEXT NOT NULL,
+            dare REAL DEFAULT 0,
+            avere REAL DEFAULT 0
+        );
+        INSERT INTO entries(id, date) VALUES (1, '2025-01-10');
+        PRAGMA user_version = 1;
+    """)
+    conn.executemany("INSERT INTO entry_lines(entry_id, account_code, dare, avere) VALUES (1, ?, ?, ?)",
+                     [("1431", 0.1, 0.0), ("4100", 0.0, 0.1)] * 10)
+    return conn
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_discover_orders_migrations():
+    versions = [m.version for m in migrator.discover()]
+    assert versions == sorted(versions) and versions[:2] == [1, 2]
+
+def test_new_file_at_latest_version(tmp_db):
+    assert DBManager.schema_version() == migrator.latest_version()
+    assert DBManager.upgrade() == []          # niente da rifare al riavvio
+    count = DBManager.connect().execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+    DBManager.initialize()
+    assert DBManager.connect().execute("SELECT COUNT(*) FROM accounts").fetchone()[0] == count > 0
+
+def test_reopen_skips_scripts(tmp_db):
+    conn = DBManager.connect()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        assert DBManager.initialize() is False
+    finally:
+        conn.set_trace_callback(None)
+    assert len(statements) == 2 and not any("CREATE" in s or "INSERT" in s for s in statements)
+
+def test_fingerprint_mismatch_reapplies(tmp_db):
+    conn = DBManager.connect()
+    conn.execute("UPDATE schema_meta SET value = 'vecchia' WHERE key = 'fingerprint'")
+    conn.execute("INSERT INTO accounts(code, name, class) VALUES ('9999', 'Conto utente', 'C')")
+    assert DBManager.initialize() is True
+    assert conn.execute("SELECT value FROM schema_meta WHERE key = 'fingerprint'").fetchone()[0] \
+        == migrator.bundled_fingerprint()
+    assert conn.execute("SELECT name FROM accounts WHERE code = '9999'").fetchone()[0] == "Conto utente"
+    assert DBManager.initialize() is False
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_interrupted_backfill_resumes(real_layout):
+    migration = migrator.discover()[1].load()
+
+    def crash(step, done=0, total=None):
+        if step == "copy":
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        migration.upgrade(real_layout, batch_size=8, progress=crash)
+    assert DBManager.schema_version() == 1
+    assert real_layout.execute("SELECT COUNT(*) FROM entry_lines_cents").fetchone()[0] == 8
+
+    events = []
+    DBManager.upgrade(progress=events.append)
+    assert DBManager.schema_version() == migrator.latest_version()
+    assert real_layout.execute("SELECT SUM(dare_cents) FROM entry_lines").fetchone()[0] == 100
+    copies = [(p.done, p.total) for p in events if p.step == "copy"]
+    assert copies == [(20, 20)]                # riparte dalle 8 righe già copiate
+    assert [p.step for p in events][0] == "start" and events[-1].step == "done"
+
+def test_legacy_backend_tables_renamed(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE accounts (id INTEGER PRIMARY KEY, code TEXT UNIQUE, name TEXT, type TEXT);
+        CREATE TABLE entries (id INTEGER PRIMARY KEY, date TEXT, causale TEXT, description TEXT);
+        CREATE TABLE entry_lines (id INTEGER PRIMARY KEY, entry_id INTEGER, account_id INTEGER,
+                                  dare REAL, avere REAL);
+        CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, data TEXT, importo REAL);
+        INSERT INTO accounts(code, name) VALUES ('X1', 'Vecchio conto');
+        INSERT INTO journal_entries(data, importo) VALUES ('2025-01-01', 1000.0);
+    """)
+    conn.close()
+    try:
+        backend_db.init_db(str(path))
+        conn = DBManager.connect()
+        assert conn.execute("SELECT name FROM legacy_accounts").fetchone()[0] == "Vecchio conto"
+        assert conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0] == 1
+        assert conn.execute("SELECT class FROM accounts WHERE code = '1431'").fetchone()[0] == "A"
+        assert DBManager.schema_version() == migrator.latest_version()
+    finally:
+        DBManager.close()
+
+def test_new_year_creates_default_period(tmp_db):
+    conn = DBManager.connect()
+    conn.execute("DELETE FROM periods")
+    conn.execute("UPDATE schema_meta SET value = '1999' WHERE key = 'default_period_year'")
+    assert DBManager.initialize() is True
+    assert conn.execute("SELECT COUNT(*) FROM periods WHERE month IS NULL").fetchone()[0] == 1
+
+def test_audit_index_added_to_older_files(tmp_db):
+    conn = DBManager.connect()
+    conn.executescript("DROP INDEX idx_audit_log_entry; PRAGMA user_version = 5;")
+    DBManager.upgrade()
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_audit_log_entry'").fetchone()
+    assert DBManager.schema_version() == migrator.latest_version()
+
+def test_period_generation_triggers_added(tmp_db):
+    conn = DBManager.connect()
+    conn.executescript("""
+        DROP TRIGGER trg_periods_insert_generation;
+        DROP TRIGGER trg_periods_update_generation;
+        DROP TRIGGER trg_periods_delete_generation;
+        DELETE FROM cache_generations WHERE name = 'periods';
+        PRAGMA user_version = 6;
+    """)
+    DBManager.upgrade()
+    conn.execute("UPDATE periods SET status = status")
+    assert conn.execute("SELECT generation FROM cache_generations WHERE name = 'periods'").fetchone()[0] > 0
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_journal_entries_from_ledger(tmp_db):
+    PostingEngine().post(EntryDTO(date="2025-01-10", documento="FAT-1", cliente_fornitore="Rossi",
+                                  descrizione="Vendita",
+                                  lines=[LineDTO("1431", dare=12.5), LineDTO("4100", avere=12.5)]),
+                         user_id="tester")
+    rows, cursor = backend_db.get_journal_page()
+    assert cursor is None
+    assert [(r["document"], r["party"], f"{r['account_code']} {r['account_name']}", r["importo"])
+            for r in rows] == [
+        ("FAT-1", "Rossi", "1431 Cassa", 1250), ("FAT-1", "Rossi", "4100 Vendite e prestazioni", -1250)]
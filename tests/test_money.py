@@ -0,0 +1,93 @@
+# --- tests/test_money.py -----------------------------------------------------
+import importlib
+from decimal import Decimal
+import pytest
+from db.db_manager import DBManager
+from core.money import Money
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core import validator
+
+migration = importlib.import_module("db.migrations.002_integer_cents")
+
+# --- Test granulari -----------------------------------------------------------
+
+@pytest.mark.parametrize("value,cents", [
+    (12.3, 1230), ("12.30", 1230), (Decimal("0.015"), 2), (1.005, 101), (12, 1200), (None, 0),
+])
+def test_money_of(value, cents):
+    assert Money.of(value) == cents
+
+def test_money_display():
+    assert str(Money(-1234567)) == "-12345.67"
+    assert f"{Money(1234567):,.2f}" == "12,345.67"
+    assert repr(Money(5)) == "Money.of('0.05')"
+
+def test_line_dto_converts_once():
+    line = LineDTO("1431", dare=0.1)
+    assert type(line.dare) is Money and line.dare == 10
+    assert LineDTO("1431", dare=line.dare).dare is line.dare
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_line_dto_rejects_bare_int():
+    total = Money(100) + Money(50)          # somma di Money: int semplice in centesimi
+    with pytest.raises(TypeError, match="dare"):
+        LineDTO("1431", dare=total)
+    with pytest.raises(TypeError, match="avere"):
+        LineDTO("1431", avere=True)
+    assert LineDTO("1431", dare=Money(total)).dare == 150
+    assert LineDTO("1431", dare=Money(sum([Money(100), Money(50)]))).dare == 150
+    assert LineDTO("1431", dare=Decimal("12"), avere="0").dare == 1200
+
+def test_no_float_drift_in_balance_check(tmp_db):
+    dto = EntryDTO(date="2025-12-01", lines=[
+        LineDTO("1431", dare=0.1), LineDTO("1431", dare=0.2), LineDTO("4100", avere=0.3)])
+    assert validator.validate(dto) == []
+
+def test_amounts_stored_as_integers(tmp_db):
+    res = PostingEngine().post(
+        EntryDTO(date="2025-12-01", lines=[LineDTO("1431", dare=19.99), LineDTO("4100", avere=19.99)]),
+        user_id="tester")
+    cur = DBManager.connect().cursor()
+    cur.execute("SELECT typeof(dare_cents), dare_cents, dare FROM entry_lines WHERE entry_id = ? AND dare_cents > 0",
+                (res.entry_id,))
+    assert tuple(cur.fetchone()) == ("integer", 1999, 19.99)
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_migration_converts_real_amounts(tmp_db):
+    conn = DBManager.connect()
+    conn.executescript("""
+        DROP TABLE entry_lines;
+        CREATE TABLE entry_lines (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            account_code TEXT NOT NULL,
+            dare REAL DEFAULT 0,
+            avere REAL DEFAULT 0
+        );
+        INSERT INTO entries(id, date) VALUES (1, '2025-01-10'), (2, '2025-02-10');
+    """)
+    rows = []
+    for entry_id in (1, 2):
+        for _ in range(5):
+            rows += [(entry_id, "1431", 0.29, 0.0), (entry_id, "4100", 0.0, 0.29)]
+    conn.executemany("INSERT INTO entry_lines(entry_id, account_code, dare, avere) VALUES (?,?,?,?)", rows)
+    conn.commit()
+
+    assert migration.needs_upgrade(conn)
+    migration.upgrade(conn, batch_size=3)
+    assert not migration.needs_upgrade(conn)
+
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*), SUM(dare_cents), SUM(avere_cents) FROM entry_lines")
+    assert tuple(cur.fetchone()) == (20, 290, 290)
+    cur.execute("SELECT period, dare_cents FROM account_period_balances WHERE account_code = '1431' ORDER BY period")
+    assert [tuple(r) for r in cur.fetchall()] == [("2025-01", 145), ("2025-02", 145)]
+
+    # il nuovo entry_lines accetta nuove registrazioni
+    res = PostingEngine().post(
+        EntryDTO(date="2025-03-01", lines=[LineDTO("1431", dare=1.0), LineDTO("4100", avere=1.0)]),
+        user_id="tester")
+    assert res.success
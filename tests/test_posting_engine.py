@@ -1,6 +1,8 @@
 # --- tests/test_posting_engine.py --------------------------------------------
+import threading
 import pytest
 from db.db_manager import DBManager
+from core.audit import get_audit_records
 from core.posting_engine import PostingEngine
 from core.models import EntryDTO, LineDTO
 
@@ -94,9 +96,117 @@ def test_audit_log_contains_payload(tmp_db, engine):
     )
     res = engine.post(dto, user_id="tester")
     assert res.success
+    (record,) = get_audit_records(res.entry_id)
+    assert record.entry["descrizione"] == "Audit test"
+    assert record.entry["cliente_fornitore"] == "Cliente A"
+    assert [(l["account"], l["dare"], l["avere"]) for l in record.lines] == [
+        ("4100", 0, 5000), ("1431", 5000, 0)]
+
+# --- Bulk posting -------------------------------------------------------------
+
+def _sale(day, amount, ref=None):
+    return EntryDTO(
+        date=f"2025-12-{day:02d}",
+        lines=[LineDTO("4100", avere=amount), LineDTO("1431", dare=amount)],
+        client_reference_id=ref
+    )
+
+def test_post_many_returns_one_result_per_entry(tmp_db, engine):
+    entries = [_sale(d, 10.0 * d) for d in range(1, 8)]
+    results = engine.post_many(entries, user_id="tester", batch_size=3)
+    assert len(results) == 7
+    assert all(r.success for r in results)
+    assert [r.protocol for r in results] == [f"2025/{n:06d}" for n in range(1, 8)]
+
+    cur = DBManager.connect().cursor()
+    for entry, res in zip(entries, results):
+        cur.execute("SELECT date FROM entries WHERE id = ?", (res.entry_id,))
+        assert cur.fetchone()["date"] == entry.date
+        cur.execute("SELECT COUNT(*) FROM entry_lines WHERE entry_id = ?", (res.entry_id,))
+        assert cur.fetchone()[0] == 2
+        cur.execute("SELECT COUNT(*) FROM audit_log WHERE entry_id = ?", (res.entry_id,))
+        assert cur.fetchone()[0] == 1
+
+def test_post_many_keeps_idempotency(tmp_db, engine):
+    first = engine.post(_sale(1, 50.0, ref="REF-1"), user_id="tester")
+    results = engine.post_many(
+        [_sale(1, 50.0, ref="REF-1"), _sale(2, 60.0, ref="REF-2"), _sale(2, 60.0, ref="REF-2")],
+        user_id="tester"
+    )
+    assert results[0].entry_id == first.entry_id
+    assert results[1].entry_id == results[2].entry_id
+    assert results[1].protocol == "2025/000002"
+
+    cur = DBManager.connect().cursor()
+    cur.execute("SELECT COUNT(*) FROM entries")
+    assert cur.fetchone()[0] == 2
+
+def test_post_many_atomic_batch_rolls_back(tmp_db, engine):
+    bad = EntryDTO(date="2025-12-03",
+                   lines=[LineDTO("1431", dare=5.0), LineDTO("UNKNOWN_ACCOUNT", avere=5.0)])
+    results = engine.post_many([_sale(1, 10.0), bad, _sale(4, 20.0)],
+                               user_id="tester", batch_size=2)
+    assert [r.success for r in results] == [False, False, True]
+    assert "integrity" in results[0].errors[0].lower()
+    # il batch fallito non consuma numeri di protocollo
+    assert results[2].protocol == "2025/000001"
+
     cur = DBManager.connect().cursor()
-    cur.execute("SELECT payload FROM audit_log WHERE entry_id = ?", (res.entry_id,))
-    payload = cur.fetchone()[0]
-    assert "Audit test" in payload
-    assert "Cliente A" in payload
-# --- Test granulari -----------------------------------------------------------
\ No newline at end of file
+    cur.execute("SELECT COUNT(*) FROM entries")
+    assert cur.fetchone()[0] == 1
+
+def test_post_many_savepoint_mode_skips_only_failed(tmp_db, engine):
+    bad = EntryDTO(date="2025-12-03",
+                   lines=[LineDTO("1431", dare=5.0), LineDTO("UNKNOWN_ACCOUNT", avere=5.0)])
+    results = engine.post_many([_sale(1, 10.0), bad, _sale(4, 20.0)],
+                               user_id="tester", atomic=False)
+    assert [r.success for r in results] == [True, False, True]
+    assert [results[0].protocol, results[2].protocol] == ["2025/000001", "2025/000002"]
+
+    cur = DBManager.connect().cursor()
+    cur.execute("SELECT COUNT(*) FROM entry_lines")
+    assert cur.fetchone()[0] == 4
+
+# --- Protocolli ---------------------------------------------------------------
+
+def _protocol_statements(run):
+    conn = DBManager.connect()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        result = run()
+    finally:
+        conn.set_trace_callback(None)
+    return result, [s for s in statements if "protocol_counters" in s]
+
+def test_post_allocates_protocol_in_one_statement(tmp_db, engine):
+    res, statements = _protocol_statements(lambda: engine.post(_sale(1, 10.0), user_id="tester"))
+    assert res.protocol == "2025/000001"
+    assert len(statements) == 1 and "RETURNING" in statements[0]
+
+def test_post_many_reserves_one_block_per_year(tmp_db, engine):
+    next_year = EntryDTO(date="2026-01-05", lines=[LineDTO("1431", dare=1.0), LineDTO("4100", avere=1.0)])
+    entries = [_sale(1, 10.0), next_year, _sale(2, 10.0), _sale(3, 10.0)]
+    results, statements = _protocol_statements(lambda: engine.post_many(entries, user_id="tester"))
+    assert len(statements) == 2
+    assert [r.protocol for r in results] == ["2025/000001", "2026/000001", "2025/000002", "2025/000003"]
+    assert engine.post(_sale(4, 10.0), user_id="tester").protocol == "2025/000004"
+
+def test_concurrent_posts_stay_gapless(tmp_db, engine):
+    bad = EntryDTO(date="2025-12-03", lines=[LineDTO("1431", dare=5.0), LineDTO("UNKNOWN_ACCOUNT", avere=5.0)])
+    protocols, lock = [], threading.Lock()
+
+    def worker(n):
+        for i in range(10):
+            results = engine.post_many([_sale(1, 1.0), _sale(2, 2.0)] + ([bad] if i % 3 == n % 3 else []),
+                                       user_id="tester")
+            with lock:
+                protocols.extend(r.protocol for r in results if r.success)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    numbers = sorted(int(p.split("/")[1]) for p in protocols)
+    assert numbers == list(range(1, len(numbers) + 1))
@@ -0,0 +1,86 @@
+# --- tests/test_query_plans.py -----------------------------------------------
+import os
+import pytest
+from db.db_manager import DBManager
+from core import query_catalog
+from core import account_index, audit, balances, journal, ledger_service, period_index, period_service
+from core import posting_engine, validator
+
+# righe del DB di prova; CONTAIDE_PLAN_LINES=50000 per un giro veloce
+PLAN_LINES = int(os.environ.get("CONTAIDE_PLAN_LINES", "1000000"))
+
+SEED_SQL = """
+    BEGIN;
+    CREATE TEMP TABLE leaf(k INTEGER PRIMARY KEY, code TEXT);
+    INSERT INTO leaf
+        SELECT row_number() OVER (ORDER BY code) - 1, code FROM accounts
+        WHERE code NOT IN (SELECT parent_code FROM accounts WHERE parent_code IS NOT NULL);
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :entries)
+    INSERT INTO entries(id, date, protocol, client_reference_id, reversal_of)
+        SELECT i, date('2015-01-01', '+' || (i * 3653 / :entries) || ' days'), 'P' || i,
+               CASE WHEN i % 2 = 0 THEN 'imp-' || i END,
+               CASE WHEN i % 100 = 0 THEN i - 1 END
+        FROM n;
+    WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < :lines - 1)
+    INSERT INTO entry_lines(entry_id, account_code, dare_cents, avere_cents)
+        SELECT i / 4 + 1, leaf.code,
+               CASE WHEN i % 2 = 0 THEN 1000 + i % 97 ELSE 0 END,
+               CASE WHEN i % 2 = 1 THEN 1000 + (i - 1) % 97 ELSE 0 END
+        FROM n JOIN leaf ON leaf.k = (i * 7919) % (SELECT COUNT(*) FROM leaf);
+    COMMIT;
+"""
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def seeded_db(tmp_path_factory):
+    DBManager.close()
+    DBManager.configure(str(tmp_path_factory.mktemp("plans") / "seeded.db"), profile="bulk-load")
+    DBManager.initialize()
+    conn = DBManager.connect()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    script = SEED_SQL.replace(":entries", str(PLAN_LINES // 4)).replace(":lines", str(PLAN_LINES))
+    conn.executescript(script)
+    conn.execute("PRAGMA foreign_keys = ON")
+    with DBManager.transaction() as cur:
+        balances.rebuild(cur)
+    # niente ANALYZE: i piani devono reggere anche senza statistiche (file appena creati)
+    yield conn
+    DBManager.close()
+    DBManager.configure()
+
+def _catalog_sql():
+    return {q.sql for q in query_catalog.catalog()}
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_catalog_covers_core_statements():
+    """Ogni costante *_SQL di core/ con una lettura è nel catalogo."""
+    catalogued = _catalog_sql()
+    missing = []
+    for module in (account_index, audit, balances, journal, ledger_service, period_index, period_service,
+                   posting_engine, validator):
+        for name, value in vars(module).items():
+            if not (name.endswith("_SQL") and isinstance(value, str)):
+                continue
+            sql = value.format(marks="?,?,?") if "{marks}" in value else value
+            if ("WHERE" in sql or "SELECT" in sql) and sql not in catalogued:
+                missing.append(f"{module.__name__}.{name}")
+    assert missing == []
+
+def test_checker_flags_scans_and_sorts(seeded_db):
+    bad = query_catalog.CatalogQuery("bad", "SELECT * FROM entry_lines WHERE dare_cents > ? ORDER BY avere_cents", (0,))
+    problems = query_catalog.check(seeded_db, bad)
+    assert any("SCAN entry_lines" in p for p in problems)
+    assert any("TEMP B-TREE" in p for p in problems)
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_seeded_size(seeded_db):
+    assert seeded_db.execute("SELECT COUNT(*) FROM entry_lines").fetchone()[0] == PLAN_LINES
+
+# --- Test integrati -----------------------------------------------------------
+
+@pytest.mark.parametrize("query", [q for q in query_catalog.catalog() if q.hot], ids=lambda q: q.name)
+def test_hot_query_plan(seeded_db, query):
+    assert query_catalog.check(seeded_db, query) == []
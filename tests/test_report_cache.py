@@ -0,0 +1,66 @@
+# --- tests/test_report_cache.py ----------------------------------------------
+import pytest
+from core.report_cache import ReportCache, ledger_version
+from core.ledger_service import LedgerService
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def cache():
+    return ReportCache(max_entries=2)
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_hit_and_miss(cache):
+    assert cache.get("1431", 1) is None
+    cache.put("1431", 1, ["riga"])
+    assert cache.get("1431", 1) == ["riga"]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+def test_other_version_is_stale(cache):
+    cache.put("1431", 1, ["vecchia"])
+    assert cache.get("1431", 2) is None
+    assert "1431" not in cache
+    assert cache.stats().stale == 1
+
+def test_lru_eviction(cache):
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    cache.get("a", 1)                  # b diventa il meno recente
+    cache.put("c", 1, 3)
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.stats().evictions == 1
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        ReportCache(max_entries=0)
+
+def test_discard_and_clear(cache):
+    cache.put("a", 1, 1)
+    cache.put("b", 1, 2)
+    cache.discard("a")
+    cache.discard("manca")
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_posting_and_reversal_change_version(tmp_db, cache):
+    empty = ledger_version()
+    posted = PostingEngine().post(_sale("2025-01-10", 10.0), user_id="tester")
+    v1 = ledger_version()
+    assert v1 != empty
+    key = ("1431", "2025-01-01", "2025-12-31")
+    cache.put(key, v1, LedgerService().get_account_ledger(*key))
+    assert len(cache.get(key, ledger_version())) == 1
+    LedgerService().reverse_entry(posted.entry_id, user_id="tester")
+    assert cache.get(key, ledger_version()) is None
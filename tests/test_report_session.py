@@ -0,0 +1,77 @@
+# --- tests/test_report_session.py --------------------------------------------
+import sqlite3
+import threading
+import pytest
+from db.db_manager import DBManager
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.ledger_service import LedgerService
+from core.trial_balance import TrialBalanceService
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def service(tmp_db):
+    PostingEngine().post(_sale("2025-01-10", 100.0), user_id="tester")
+    return LedgerService()
+
+def _sale(day, amount):
+    return EntryDTO(date=day, lines=[LineDTO("1431", dare=amount), LineDTO("4100", avere=amount)])
+
+def _dare(service):
+    return service.get_account_balance("1431", "2025-01-01", "2025-12-31")["dare"]
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_session_sees_fixed_snapshot(service):
+    engine = PostingEngine()
+    with DBManager.report_session():
+        assert _dare(service) == 10000
+        assert engine.post(_sale("2025-02-10", 50.0), user_id="tester").success   # writer non bloccato
+        assert _dare(service) == 10000
+        assert len(service.get_account_ledger("1431", "2025-01-01", "2025-12-31")) == 1
+    assert _dare(service) == 15000
+
+def test_session_is_read_only(service):
+    with DBManager.report_session() as session:
+        with session.connection() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM entries")
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_closed_session_rejected(service):
+    session = DBManager.report_session()
+    session.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with session.bind():
+            _dare(service)
+
+def test_unbound_thread_reads_latest(service):
+    seen = []
+    with DBManager.report_session():
+        PostingEngine().post(_sale("2025-02-10", 50.0), user_id="tester")
+        t = threading.Thread(target=lambda: seen.append(_dare(service)))
+        t.start()
+        t.join()
+    assert seen == [15000]
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_workers_share_snapshot(service):
+    engine, seen = PostingEngine(), []
+    with DBManager.report_session() as session:
+        engine.post_many([_sale("2025-03-01", 1.0)] * 10, user_id="tester")
+
+        def worker():
+            with session.bind():
+                tb = TrialBalanceService().compute("2025-01-01", "2025-12-31")
+                seen.append((_dare(service), tb.total_dare))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert seen == [(10000, 10000)] * 4
+    assert session.closed
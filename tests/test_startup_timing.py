@@ -0,0 +1,97 @@
+# --- tests/test_startup_timing.py --------------------------------------------
+import threading
+import pytest
+from backend.modules import help_logic
+from frontend.startup_timing import (FIRST_PAINT, INTERACTIVE, REPORT_ENV, StartupTimer,
+                                     report_requested)
+
+# --- Fixtures -----------------------------------------------------------------
+
+class _Clock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+@pytest.fixture
+def timer(clock):
+    return StartupTimer(clock=clock)
+
+@pytest.fixture
+def fresh_tips(monkeypatch):
+    tips = help_logic._LazyTips()
+    monkeypatch.setattr(help_logic, "TIPS", tips)
+    return tips
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_marks_are_relative_to_start(timer, clock):
+    clock.advance(120)
+    assert timer.mark("shell") == pytest.approx(120)
+    clock.advance(30)
+    timer.mark(FIRST_PAINT)
+    clock.advance(200)
+    timer.mark(INTERACTIVE)
+    assert [(s, round(t), round(d)) for s, t, d in timer.stages()] == [
+        ("shell", 120, 120), (FIRST_PAINT, 150, 30), (INTERACTIVE, 350, 200)]
+
+def test_report_has_first_paint_and_interactive(timer, clock):
+    clock.advance(80)
+    timer.mark(FIRST_PAINT)
+    clock.advance(420)
+    timer.mark("db")
+    report = timer.report()
+    assert "primo disegno" in report and "apertura DB" in report
+    assert "time-to-first-paint: 80.0 ms" in report
+    assert "time-to-interactive: n/d" in report
+
+def test_tips_load_on_first_access(fresh_tips):
+    assert not fresh_tips.loaded
+    assert help_logic.get_help_text("fatture").startswith("📗")
+    assert fresh_tips.loaded
+    assert dict(fresh_tips) == help_logic.load_tips()
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_first_mark_wins(timer, clock):
+    clock.advance(10)
+    timer.mark("first_tab")
+    clock.advance(500)
+    assert timer.mark("first_tab") == pytest.approx(10)
+    assert timer.done("first_tab") and not timer.done("first_tab", INTERACTIVE)
+    assert timer.elapsed("help_tips") is None
+
+def test_report_requested():
+    assert report_requested(["main.py", "--startup-report"], environ={})
+    assert report_requested(["main.py"], environ={REPORT_ENV: "1"})
+    assert not report_requested(["main.py"], environ={REPORT_ENV: "0"})
+    assert not report_requested(["main.py"], environ={})
+
+def test_unknown_help_term(fresh_tips):
+    assert help_logic.get_help_text("").startswith("💡")
+    assert help_logic.get_help_text("acq") == "🔍 Forse cercavi: acquisto"
+    assert help_logic.get_help_text("zzz").startswith("❌")
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_preload_tips_from_threads(fresh_tips, monkeypatch):
+    calls = []
+    original = help_logic.load_tips
+    monkeypatch.setattr(help_logic, "load_tips", lambda: calls.append(1) or original())
+    keys = []
+    threads = [threading.Thread(target=lambda: keys.append(help_logic.preload_tips()))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert all(k == list(original()) for k in keys) and len(keys) == 4
@@ -0,0 +1,77 @@
+# --- tests/test_terminal_output.py -------------------------------------------
+import os
+import pytest
+from backend.dsl_parser import execute_command
+from frontend.terminal_output import OutputSpool
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def spool(tmp_path):
+    s = OutputSpool(spill_lines=50, page_lines=10, spill_dir=str(tmp_path))
+    yield s
+    s.discard_spill()
+
+def _lines(n, prefix="riga"):
+    return "\n".join(f"{prefix} {i}" for i in range(1, n + 1))
+
+def _drain(spool, batch):
+    chunks = []
+    chunk = spool.take(batch)
+    while chunk is not None:
+        chunks.append(chunk)
+        chunk = spool.take(batch)
+    return chunks
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_batches_keep_order(spool):
+    spool.write("> movimenti")
+    spool.write(_lines(25))
+    spool.write("")
+    chunks = _drain(spool, batch=10)
+    assert len(chunks) == 3
+    assert "\n".join(chunks).split("\n") == ["> movimenti"] + _lines(25).split("\n") + [""]
+    assert spool.take() is None and spool.pending() == 0
+
+def test_large_output_spills_to_file(spool):
+    spool.write(_lines(95))
+    shown = "\n".join(_drain(spool, batch=100)).split("\n")
+    assert shown[:10] == _lines(10).split("\n") and len(shown) == 11
+    assert "'output 2'" in shown[-1] and spool.spill_path in shown[-1]
+    assert spool.page_count() == 10
+    assert spool.page(2) == [f"riga {i}" for i in range(11, 21)]
+    assert spool.page(10) == [f"riga {i}" for i in range(91, 96)]
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_threshold_is_inclusive(spool):
+    spool.write(_lines(50))
+    assert spool.pending() == 50 and spool.spill_path is None
+    assert spool.page(1) == [] and spool.page_count() == 0
+
+def test_only_last_spill_is_kept(spool):
+    spool.write(_lines(60, "prima"))
+    first = spool.spill_path
+    spool.write(_lines(60, "seconda"))
+    assert not os.path.exists(first) and os.path.exists(spool.spill_path)
+    assert spool.page(1)[0] == "seconda 1"
+    spool.discard_spill()
+    assert spool.spill_path is None and spool.page_count() == 0
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        OutputSpool(spill_lines=5, page_lines=10)
+    with pytest.raises(ValueError):
+        OutputSpool(page_lines=0)
+
+def test_page_out_of_range(spool):
+    spool.write(_lines(60))
+    assert spool.page(0) == [] and spool.page(7) == []
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_dsl_output_command():
+    assert execute_command("output") == {"action": "output", "page": None}
+    assert execute_command("output 3") == {"action": "output", "page": 3}
+    assert execute_command("output tre").startswith("❌")
@@ -0,0 +1,77 @@
+# --- tests/test_trial_balance.py ---------------------------------------------
+import pytest
+from db.db_manager import DBManager
+from core.models import EntryDTO, LineDTO
+from core.posting_engine import PostingEngine
+from core.trial_balance import TrialBalanceService, format_trial_balance
+from backend.dsl_parser import execute_command
+
+# --- Fixtures -----------------------------------------------------------------
+
+@pytest.fixture
+def service(tmp_db):
+    engine = PostingEngine()
+    engine.post_many([
+        EntryDTO(date="2025-01-10", lines=[LineDTO("1431", dare=100.0), LineDTO("4100", avere=100.0)]),
+        EntryDTO(date="2025-02-15", lines=[LineDTO("1432", dare=300.0), LineDTO("4100", avere=300.0)]),
+        EntryDTO(date="2025-02-20", lines=[LineDTO("3200", dare=50.0), LineDTO("1431", avere=50.0)]),
+        EntryDTO(date="2026-01-05", lines=[LineDTO("1431", dare=999.0), LineDTO("4100", avere=999.0)]),
+    ], user_id="tester")
+    return TrialBalanceService()
+
+def _rows(tb):
+    return {r.code: r for r in tb.rows}
+
+# --- Test granulari -----------------------------------------------------------
+
+def test_leaf_totals(service):
+    rows = _rows(service.compute("2025-01-01", "2025-12-31"))
+    # importi in centesimi
+    assert (rows["1431"].dare, rows["1431"].avere) == (10000, 5000)
+    assert rows["4100"].saldo == -40000
+
+def test_rollup_to_parents(service):
+    rows = _rows(service.compute("2025-01-01", "2025-12-31"))
+    assert rows["1430"].saldo == 35000       # Cassa + Banca
+    assert rows["1400"].saldo == 35000
+    assert rows["1000"].saldo == 35000
+    assert rows["1000"].depth == 0 and rows["1431"].depth == 3
+
+def test_class_subtotals_and_totals(service):
+    tb = service.compute("2025-01-01", "2025-12-31")
+    assert tb.class_totals["A"].saldo == 35000
+    assert tb.class_totals["C"].saldo == 5000
+    assert tb.class_totals["R"].saldo == -40000
+    assert tb.total_dare == tb.total_avere == 45000
+    assert tb.is_balanced
+
+# --- Edge cases ---------------------------------------------------------------
+
+def test_partial_range_uses_edges(service):
+    rows = _rows(service.compute("2025-02-16", "2025-02-28"))
+    assert set(rows) == {"1000", "1400", "1430", "1431", "3000", "3200"}
+    assert rows["1431"].avere == 5000
+
+def test_rows_in_hierarchical_order(service):
+    codes = [r.code for r in service.compute("2025-01-01", "2025-12-31").rows]
+    assert codes.index("1000") < codes.index("1400") < codes.index("1430") < codes.index("1431")
+    assert codes.index("1432") < codes.index("3000")
+
+def test_single_grouped_query(service):
+    statements = []
+    with DBManager.reader() as conn:      # stesso thread -> stessa connessione
+        conn.set_trace_callback(statements.append)
+        try:
+            service.compute("2025-01-15", "2025-11-20")
+        finally:
+            conn.set_trace_callback(None)
+    assert sum("GROUP BY" in s for s in statements) == 1
+
+# --- Test integrati -----------------------------------------------------------
+
+def test_bilancio_command(service):
+    out = execute_command("bilancio 2025-01-01 2025-12-31")
+    assert "Totale Ricavi" in out
+    assert "Cassa" in out
+    assert out == format_trial_balance(service.compute("2025-01-01", "2025-12-31"))
+    assert execute_command("bilancio 2025-13-01").startswith("❌")